@@ -0,0 +1,308 @@
+### This file contains the scheduler that spreads enemy decision making and path finding over several frames.
+
+## Imports
+import pygame # our game-centeric Python module and GUI class for dealing with visual elements.
+from config import * # configuration file with all out settings and constants.
+from pathfinding import * # grid and search used by the path finding workers.
+import time # used to measure how much of the frame's AI budget has been spent.
+import atexit # used to release the worker pool and its shared memory when the game exits.
+import struct # used to read and write the map version stored in shared memory.
+from collections import deque # used as the queue of pending planning requests.
+from concurrent.futures import ProcessPoolExecutor, Future # used to run path searches on other cores.
+from concurrent.futures.process import BrokenProcessPool # raised once a worker process died, after which the pool can't run searches.
+from multiprocessing import shared_memory # used to share the walkability and cost grids with the workers without copying.
+from typing import Iterable, Hashable, Callable, Dict, Tuple, List, Optional # used for more efficient type hinting
+
+## Global variables
+# Size in bytes of the shared grid's header, which holds the map version as a signed 64-bit integer
+GRID_HEADER = 8
+# Ring of the latest terrain changes, stored after the header: the map version each change made and the
+# changed cell's flat index, so workers can bring what they derived from the grid up to date cell by cell
+CHANGE_LOG = struct.Struct('qq')
+CHANGE_LOG_SIZE = 256
+# Byte offset of the walkability grid, after the header and the change log
+GRID_CELLS = GRID_HEADER + CHANGE_LOG_SIZE * CHANGE_LOG.size
+# Inside a worker process: the attached shared memory block and the tile map viewing it
+_worker_state: Optional[Tuple[shared_memory.SharedMemory, TileMap]] = None
+
+# This class is for running enemy planning within a fixed time budget each frame
+class AIScheduler:
+    """
+    Queues planning requests (aggro checks, path lookups) and runs as many as fit in a
+    per-frame time budget. Enemies are split into AI_REPLAN_STAGGER groups and only one
+    group asks to re-plan each frame, so a room full of enemies aggroing at once costs
+    the same per frame as a few. Between plans, enemies keep following their last one.
+    """
+    def __init__(self, budget_us: int = AI_FRAME_BUDGET_US, stagger: int = AI_REPLAN_STAGGER):
+        """
+        Initializes an empty scheduler.
+
+        Arguments:
+            budget_us (int): Microseconds of planning allowed per frame.
+            stagger (int): Number of frames it takes for every enemy to get a re-plan request.
+        """
+        self.budget_ns = budget_us * 1000
+        self.stagger = stagger
+        # Pending requests, oldest first, and the same sprites as a set to avoid queueing one twice
+        self.queue: deque = deque()
+        self.queued = set()
+        # Frames scheduled so far, used to pick which group of enemies re-plans
+        self.frame = 0
+
+    def clear(self):
+        """Drops every pending request (e.g. when changing stages)."""
+        self.queue.clear()
+        self.queued.clear()
+        self.frame = 0
+
+    # Queues a sprite's plan() to run in an upcoming frame
+    def request(self, sprite: pygame.sprite.Sprite):
+        """
+        Asks for a sprite to re-plan. Does nothing if it is already waiting.
+
+        Arguments:
+            sprite (pygame.sprite.Sprite): Any sprite with a plan() method, usually an Enemy.
+        """
+        if sprite not in self.queued:
+            self.queued.add(sprite)
+            self.queue.append(sprite)
+
+    # Queues this frame's share of the enemies for re-planning
+    def schedule(self, sprites: Iterable[pygame.sprite.Sprite]):
+        """
+        Requests a re-plan for every stagger-th sprite, rotating through them over the frames.
+
+        Arguments:
+            sprites (Iterable[pygame.sprite.Sprite]): The sprites to spread over the frames, e.g. game.enemies.
+        """
+        slot = self.frame % self.stagger
+        for index, sprite in enumerate(sprites):
+            if index % self.stagger == slot:
+                self.request(sprite)
+        self.frame += 1
+
+    # Runs pending requests until the frame's budget is spent
+    def run(self) -> int:
+        """
+        Runs queued plans in order until the queue is empty or the budget runs out.
+        At least one plan runs every frame so the queue always drains.
+
+        Returns:
+            int: The number of plans run this frame.
+        """
+        deadline = time.perf_counter_ns() + self.budget_ns
+        planned = 0
+        while self.queue:
+            if planned and time.perf_counter_ns() >= deadline:
+                break
+            sprite = self.queue.popleft()
+            self.queued.discard(sprite)
+            # Sprites killed while waiting don't need a plan any more
+            if sprite.alive():
+                sprite.plan()
+                planned += 1
+        return planned
+
+# Runs once in each worker process: attaches to the shared grid
+def _init_path_worker(name: str, width: int, height: int, costs_offset: int):
+    """
+    Attaches a worker process to the shared grid and wraps it in a tile map.
+
+    Arguments:
+        name (str): The shared memory block's name.
+        width (int): The grid width, in tiles.
+        height (int): The grid height, in tiles.
+        costs_offset (int): Byte offset of the cost grid inside the block.
+    """
+    global _worker_state
+    shared = shared_memory.SharedMemory(name=name)
+    size = width * height
+    walkable = shared.buf[GRID_CELLS:GRID_CELLS + size]
+    costs = shared.buf[costs_offset:costs_offset + 4 * size].cast('f')
+    tilemap = TileMap.from_grids(width, height, walkable, costs)
+    tilemap.version = struct.unpack_from('q', shared.buf, 0)[0]
+    _worker_state = (shared, tilemap)
+
+# Runs in a worker process before each search: catches up with the terrain changes made since the last one
+def _sync_worker_map(shared: shared_memory.SharedMemory, tilemap: TileMap):
+    """
+    Replays the changed cells from the shared change log on the worker's tile map, updating
+    its region labels for just those cells. Only if more changes were made than the log
+    holds are the labels thrown away.
+
+    Arguments:
+        shared (shared_memory.SharedMemory): The shared grid block.
+        tilemap (TileMap): The worker's tile map over that block.
+    """
+    version = struct.unpack_from('q', shared.buf, 0)[0]
+    if version == tilemap.version:
+        return
+    changes: Optional[List[int]] = []
+    if version - tilemap.version > CHANGE_LOG_SIZE:
+        changes = None
+    else:
+        for changed in range(tilemap.version + 1, version + 1):
+            logged, index = CHANGE_LOG.unpack_from(shared.buf, GRID_HEADER + changed % CHANGE_LOG_SIZE * CHANGE_LOG.size)
+            if logged != changed:
+                # Overwritten by a newer change before this worker got to it
+                changes = None
+                break
+            changes.append(index)
+    tilemap.version = version
+    if changes is None:
+        # Too far behind: relabel from scratch on the next reachability check
+        tilemap.regions = None
+        return
+    if tilemap.regions is not None:
+        tilemap.update_regions_batch(changes)
+
+# Runs in a worker process for each path request
+def _find_path_in_worker(start_node: GridNode, end_node: GridNode) -> Tuple[int, Optional[List[GridNode]]]:
+    """
+    Searches a path on the shared grid with find_path.
+
+    Arguments:
+        start_node (GridNode): The (x, y) node the path starts from.
+        end_node (GridNode): The (x, y) node the path leads to.
+
+    Returns:
+        Tuple[int, Optional[List[GridNode]]]: The map version searched, and the path (or None if no path exists).
+    """
+    shared, tilemap = _worker_state
+    _sync_worker_map(shared, tilemap)
+    return tilemap.version, find_path(tilemap, start_node, end_node)
+
+# This class is for searching paths on other processes, for maps too large to search within a frame
+class PathWorkerPool:
+    """
+    Runs path searches on a pool of worker processes. The map's walkability and cost grids
+    live in one shared memory block, which the workers read directly: requests only send
+    two cells and results only send the path back. Terrain changes are written into the
+    block as they happen. Finished requests are handed to their callbacks by poll(),
+    once per frame on the main thread.
+    """
+    def __init__(self, tilemap: TileMap, workers: int = PATH_WORKERS):
+        """
+        Copies the tile map into shared memory and starts the workers.
+
+        Arguments:
+            tilemap (TileMap): The map to search.
+            workers (int): The number of worker processes.
+        """
+        self.tilemap = tilemap
+        size = tilemap.width * tilemap.height
+        # Block layout: version header, change log, one byte of walkability per cell, then (4-byte aligned) one float cost per cell
+        self.costs_offset = GRID_CELLS + (size + 3) // 4 * 4
+        self.shared = shared_memory.SharedMemory(create=True, size=self.costs_offset + 4 * size)
+        self.shared.buf[GRID_CELLS:GRID_CELLS + size] = tilemap.walkable
+        self.costs = self.shared.buf[self.costs_offset:self.costs_offset + 4 * size].cast('f')
+        self.costs[:] = tilemap.costs
+        struct.pack_into('q', self.shared.buf, 0, tilemap.version)
+        tilemap.add_listener(self.on_cell_changed)
+
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_path_worker,
+            initargs=(self.shared.name, tilemap.width, tilemap.height, self.costs_offset),
+        )
+        # {request key: (future, callback)} for requests still running
+        self.pending: Dict[Hashable, Tuple[Future, Callable[[Optional[List[GridNode]]], None]]] = {}
+        self.closed = False
+        # Don't leave worker processes or the shared block behind if the game quits mid-stage
+        atexit.register(self.close)
+
+    # Called by the tile map after a cell's walkability or cost changed
+    def on_cell_changed(self, x: int, y: int):
+        """
+        Writes a changed cell, its change log entry and the new map version into shared memory.
+
+        Arguments:
+            x (int): The grid column index.
+            y (int): The grid row index.
+        """
+        index = y * self.tilemap.width + x
+        version = self.tilemap.version
+        self.shared.buf[GRID_CELLS + index] = self.tilemap.walkable[index]
+        self.costs[index] = self.tilemap.costs[index]
+        CHANGE_LOG.pack_into(self.shared.buf, GRID_HEADER + version % CHANGE_LOG_SIZE * CHANGE_LOG.size, version, index)
+        # The version goes in last, so a worker that sees it also sees the cell and the log entry
+        struct.pack_into('q', self.shared.buf, 0, version)
+
+    # Submits a path request, unless the same requester already has one running
+    def request(self, key: Hashable, start_node: GridNode, end_node: GridNode, callback: Callable[[Optional[List[GridNode]]], None]) -> bool:
+        """
+        Starts searching a path on a worker.
+
+        Arguments:
+            key (Hashable): Identifies the requester (e.g. the enemy); one request per key runs at a time.
+            start_node (GridNode): The (x, y) node the path starts from.
+            end_node (GridNode): The (x, y) node the path leads to.
+            callback (Callable[[Optional[List[GridNode]]], None]): Called by poll() with the path, or None if there is none.
+
+        Returns:
+            bool: True if the request was submitted, False if one for this key is still running or the pool is closed.
+        """
+        if key in self.pending or self.closed:
+            return False
+        try:
+            self.pending[key] = (self.executor.submit(_find_path_in_worker, start_node, end_node), callback)
+        except BrokenProcessPool as error:
+            self.close_broken(error)
+            return False
+        return True
+
+    # Hands finished searches to their callbacks; run once per frame
+    def poll(self) -> int:
+        """
+        Delivers the results of finished requests. Results searched on an older version of
+        the map, and results for sprites killed in the meantime, are dropped (a live requester
+        asks again on its next plan). A search that failed raises its error here, except for
+        a dead worker process: then the pool is closed and requesters search on the main thread.
+
+        Returns:
+            int: The number of results delivered.
+        """
+        delivered = 0
+        for key, (future, callback) in list(self.pending.items()):
+            if not future.done():
+                continue
+            del self.pending[key]
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if isinstance(error, BrokenProcessPool):
+                self.close_broken(error)
+                return delivered
+            if error is not None:
+                raise error
+            if isinstance(key, pygame.sprite.Sprite) and not key.alive():
+                continue
+            version, path = future.result()
+            if version == self.tilemap.version:
+                callback(path)
+                delivered += 1
+        return delivered
+
+    # Gives up on the workers after one of them died
+    def close_broken(self, error: BrokenProcessPool):
+        """
+        Reports a broken pool and closes it. Callers then see the pool as closed and plan without it.
+
+        Arguments:
+            error (BrokenProcessPool): The error the pool failed with.
+        """
+        print(f"Path workers stopped ({error}). Searching paths on the main thread instead.")
+        self.close()
+
+    # Stops the workers and frees the shared memory
+    def close(self):
+        """Shuts the pool down. Safe to call more than once."""
+        if self.closed:
+            return
+        self.closed = True
+        atexit.unregister(self.close)
+        self.pending.clear()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.costs.release()
+        self.shared.close()
+        self.shared.unlink()
@@ -0,0 +1,370 @@
+### This file contains the collision structures shared by the game's sprites, such as the spatial hash used for broadphase queries.
+
+## Imports
+import pygame # our game-centeric Python module and GUI class for dealing with visual elements.
+from config import * # configuration file with all out settings and constants.
+import math # used for vector lengths when separating sprites.
+from typing import List, Tuple, Dict, Optional, Callable # used for more efficient type hinting
+
+## Global variables
+# Represents a cell of the spatial hash (x_index, y_index)
+CellKey = Tuple[int, int]
+# Represents the inclusive range of cells a rect covers (first_x, first_y, last_x, last_y)
+CellSpan = Tuple[int, int, int, int]
+# Represents a named collision category and the sprite group that defines it, e.g. ('solid', game.blocks)
+Category = Tuple[str, pygame.sprite.AbstractGroup]
+
+# This class buckets sprites into tile-sized cells so collision queries only look at nearby sprites
+class SpatialHash:
+    """
+    A uniform grid of tile-sized cells, keyed by world coordinates, that tracks which
+    sprites overlap which cells. Dynamic sprites re-bucket themselves as they move,
+    so a query for everything overlapping a rect only visits the few cells under it.
+    """
+    def __init__(self, cell_size: int = TILESIZE):
+        """
+        Initializes an empty spatial hash.
+
+        Arguments:
+            cell_size (int): The width and height of each cell in pixels. Defaults to the tile size.
+        """
+        self.cell_size = cell_size
+        # {cell: {sprite: None}}. Dicts are used as ordered sets so query results are deterministic.
+        self.cells: Dict[CellKey, Dict[pygame.sprite.Sprite, None]] = {}
+        # {sprite: span of cells it currently occupies}
+        self.spans: Dict[pygame.sprite.Sprite, CellSpan] = {}
+
+    # Converts a rect into the range of cells it overlaps
+    def get_span(self, rect: pygame.Rect) -> CellSpan:
+        """
+        Calculates the inclusive range of cells covered by a rect.
+
+        Arguments:
+            rect (pygame.Rect): The rect, in world coordinates.
+
+        Returns:
+            CellSpan: The (first_x, first_y, last_x, last_y) cell indices.
+        """
+        size = self.cell_size
+        return (rect.left // size, rect.top // size, (rect.right - 1) // size, (rect.bottom - 1) // size)
+
+    # Adds a sprite to every cell its rect overlaps
+    def insert(self, sprite: pygame.sprite.Sprite):
+        """
+        Adds a sprite to the hash, bucketing it by its current rect.
+
+        Arguments:
+            sprite (pygame.sprite.Sprite): The sprite to track. Must have a world-space rect.
+        """
+        if sprite in self.spans:
+            self.move(sprite)
+            return
+        span = self.get_span(sprite.rect)
+        self.spans[sprite] = span
+        self._add_to_cells(sprite, span)
+
+    # Re-buckets a sprite after it has moved
+    def move(self, sprite: pygame.sprite.Sprite):
+        """
+        Updates a sprite's cells after it moved. Does nothing if it is still in the
+        same cells, which is the case for most frames.
+
+        Arguments:
+            sprite (pygame.sprite.Sprite): The tracked sprite that moved.
+        """
+        old_span = self.spans.get(sprite)
+        if old_span is None:
+            return
+        new_span = self.get_span(sprite.rect)
+        if new_span == old_span:
+            return
+        self._remove_from_cells(sprite, old_span)
+        self.spans[sprite] = new_span
+        self._add_to_cells(sprite, new_span)
+
+    # Removes a sprite from the hash entirely
+    def remove(self, sprite: pygame.sprite.Sprite):
+        """
+        Stops tracking a sprite, e.g. when it is killed.
+
+        Arguments:
+            sprite (pygame.sprite.Sprite): The sprite to remove. Untracked sprites are ignored.
+        """
+        span = self.spans.pop(sprite, None)
+        if span is not None:
+            self._remove_from_cells(sprite, span)
+
+    # Finds all tracked sprites overlapping a rect, optionally limited to a sprite group
+    def query(self, rect: pygame.Rect, group: Optional[pygame.sprite.AbstractGroup] = None) -> List[pygame.sprite.Sprite]:
+        """
+        Returns every tracked sprite whose rect overlaps the given rect. Only the cells
+        under the rect are visited, so the cost depends on the number of nearby sprites.
+
+        Arguments:
+            rect (pygame.Rect): The area to test, in world coordinates.
+            group (AbstractGroup, optional): If given, only sprites belonging to this group are returned.
+
+        Returns:
+            List[pygame.sprite.Sprite]: The overlapping sprites.
+        """
+        first_x, first_y, last_x, last_y = self.get_span(rect)
+        cells = self.cells
+        candidates: Dict[pygame.sprite.Sprite, None] = {}
+        for cell_x in range(first_x, last_x + 1):
+            for cell_y in range(first_y, last_y + 1):
+                bucket = cells.get((cell_x, cell_y))
+                if bucket:
+                    candidates.update(bucket)
+        # Narrow down the candidates to those actually overlapping the rect
+        colliderect = rect.colliderect
+        if group is None:
+            return [sprite for sprite in candidates if colliderect(sprite.rect)]
+        return [sprite for sprite in candidates if sprite in group and colliderect(sprite.rect)]
+
+    # Finds the first tracked sprite a rect would hit while moving by (dx, dy)
+    def sweep(self, rect: pygame.Rect, dx: float, dy: float, group: Optional[pygame.sprite.AbstractGroup] = None) -> Tuple[float, Tuple[int, int], Optional[pygame.sprite.Sprite]]:
+        """
+        Sweeps a rect along a movement vector and returns the earliest contact. Looks up
+        the whole swept area at once, so steps of any length are safe.
+
+        Arguments:
+            rect (pygame.Rect): The moving rect at the start of the step, in world coordinates.
+            dx (float): Horizontal movement for the step, in pixels.
+            dy (float): Vertical movement for the step, in pixels.
+            group (AbstractGroup, optional): If given, only sprites of this group can be hit.
+
+        Returns:
+            Tuple[float, Tuple[int, int], Optional[Sprite]]: See sweep().
+        """
+        area = rect.union(rect.move(math.floor(dx), math.floor(dy))).inflate(2, 2)
+        return sweep(rect, dx, dy, self.query(area, group))
+
+    def _add_to_cells(self, sprite: pygame.sprite.Sprite, span: CellSpan):
+        """Adds a sprite to every cell in a span."""
+        first_x, first_y, last_x, last_y = span
+        cells = self.cells
+        for cell_x in range(first_x, last_x + 1):
+            for cell_y in range(first_y, last_y + 1):
+                bucket = cells.get((cell_x, cell_y))
+                if bucket is None:
+                    bucket = cells[(cell_x, cell_y)] = {}
+                bucket[sprite] = None
+
+    def _remove_from_cells(self, sprite: pygame.sprite.Sprite, span: CellSpan):
+        """Removes a sprite from every cell in a span, dropping cells that become empty."""
+        first_x, first_y, last_x, last_y = span
+        cells = self.cells
+        for cell_x in range(first_x, last_x + 1):
+            for cell_y in range(first_y, last_y + 1):
+                bucket = cells.get((cell_x, cell_y))
+                if bucket is not None:
+                    bucket.pop(sprite, None)
+                    if not bucket:
+                        del cells[(cell_x, cell_y)]
+
+# Calculates when a moving rect first touches a still rect during one step (swept AABB)
+def swept_aabb(rect: pygame.Rect, dx: float, dy: float, obstacle: pygame.Rect) -> Optional[Tuple[float, Tuple[int, int]]]:
+    """
+    Continuous collision test between a rect moving by (dx, dy) and a still rect. Unlike
+    colliderect() on the end position, this cannot miss an obstacle that the step jumps over.
+
+    Arguments:
+        rect (pygame.Rect): The moving rect at the start of the step.
+        dx (float): Horizontal movement for the step, in pixels.
+        dy (float): Vertical movement for the step, in pixels.
+        obstacle (pygame.Rect): The still rect.
+
+    Returns:
+        Optional[Tuple[float, Tuple[int, int]]]: (time_of_impact, normal) if they touch during the step,
+        else None. time_of_impact is the fraction of the step (0 to 1) taken before contact, and
+        normal is the obstacle face that was hit, e.g. (-1, 0) for its left face.
+    """
+    # Entry and exit times on the x axis
+    if dx > 0:
+        x_entry = (obstacle.left - rect.right) / dx
+        x_exit = (obstacle.right - rect.left) / dx
+    elif dx < 0:
+        x_entry = (obstacle.right - rect.left) / dx
+        x_exit = (obstacle.left - rect.right) / dx
+    elif rect.right <= obstacle.left or rect.left >= obstacle.right:
+        # Not moving horizontally and never overlapping on this axis
+        return None
+    else:
+        x_entry, x_exit = -math.inf, math.inf
+
+    # Entry and exit times on the y axis
+    if dy > 0:
+        y_entry = (obstacle.top - rect.bottom) / dy
+        y_exit = (obstacle.bottom - rect.top) / dy
+    elif dy < 0:
+        y_entry = (obstacle.bottom - rect.top) / dy
+        y_exit = (obstacle.top - rect.bottom) / dy
+    elif rect.bottom <= obstacle.top or rect.top >= obstacle.bottom:
+        # Not moving vertically and never overlapping on this axis
+        return None
+    else:
+        y_entry, y_exit = -math.inf, math.inf
+
+    # The rects touch once they overlap on both axes, and stop touching once they separate on either
+    entry = max(x_entry, y_entry)
+    exit = min(x_exit, y_exit)
+    if entry > exit or entry >= 1 or exit <= 0:
+        return None
+
+    # The axis that entered last is the face that was hit
+    if x_entry > y_entry:
+        normal = (-1 if dx > 0 else 1, 0)
+    elif y_entry > x_entry:
+        normal = (0, -1 if dy > 0 else 1)
+    elif dx != 0:
+        normal = (-1 if dx > 0 else 1, 0)
+    else:
+        normal = (0, -1 if dy > 0 else 1)
+    # Already overlapping at the start of the step counts as an immediate hit
+    return (max(entry, 0.0), normal)
+
+# Finds the first obstacle, out of a list of candidates, that a moving rect would hit
+def sweep(rect: pygame.Rect, dx: float, dy: float, obstacles: List[pygame.sprite.Sprite]) -> Tuple[float, Tuple[int, int], Optional[pygame.sprite.Sprite]]:
+    """
+    Sweeps a rect along a movement vector against candidate sprites (e.g. from a broadphase query)
+    and returns the earliest contact. On ties, the candidate listed first wins.
+
+    Arguments:
+        rect (pygame.Rect): The moving rect at the start of the step.
+        dx (float): Horizontal movement for the step, in pixels.
+        dy (float): Vertical movement for the step, in pixels.
+        obstacles (List[pygame.sprite.Sprite]): The candidates to test.
+
+    Returns:
+        Tuple[float, Tuple[int, int], Optional[Sprite]]: (time_of_impact, normal, obstacle). If nothing
+        is hit, time_of_impact is 1.0, normal is (0, 0) and obstacle is None.
+    """
+    first_time = 1.0
+    first_normal = (0, 0)
+    first_obstacle = None
+    if dx == 0 and dy == 0:
+        return (first_time, first_normal, first_obstacle)
+    for obstacle in obstacles:
+        if not obstacle.alive():
+            continue
+        contact = swept_aabb(rect, dx, dy, obstacle.rect)
+        if contact is not None and (first_obstacle is None or contact[0] < first_time):
+            first_time, first_normal = contact
+            first_obstacle = obstacle
+    return (first_time, first_normal, first_obstacle)
+
+# Runs a single broadphase query and sorts the results into named categories
+def query_categories(spatial_hash: SpatialHash, rect: pygame.Rect, categories: List[Category]) -> Dict[str, List[pygame.sprite.Sprite]]:
+    """
+    Looks up everything overlapping a rect once, then splits the hits by category
+    (e.g. solid, door, hole). A sprite belonging to several categories appears in each.
+
+    Arguments:
+        spatial_hash (SpatialHash): The hash to query.
+        rect (pygame.Rect): The area to test, in world coordinates.
+        categories (List[Category]): Ordered (name, group) pairs to sort the hits into.
+
+    Returns:
+        Dict[str, List[pygame.sprite.Sprite]]: The hits for each category name, possibly empty.
+    """
+    hits: Dict[str, List[pygame.sprite.Sprite]] = {name: [] for name, _ in categories}
+    for sprite in spatial_hash.query(rect):
+        for name, group in categories:
+            if sprite in group:
+                hits[name].append(sprite)
+    return hits
+
+# Narrows a list of broadphase candidates down to those overlapping a rect
+def overlapping(rect: pygame.Rect, sprites: List[pygame.sprite.Sprite]) -> List[pygame.sprite.Sprite]:
+    """
+    Filters candidate sprites (usually from query_categories) to those whose rect overlaps the given one.
+
+    Arguments:
+        rect (pygame.Rect): The rect to test, in world coordinates.
+        sprites (List[pygame.sprite.Sprite]): The candidates.
+
+    Returns:
+        List[pygame.sprite.Sprite]: The candidates that actually overlap the rect, in the same order.
+    """
+    colliderect = rect.colliderect
+    return [sprite for sprite in sprites if sprite.alive() and colliderect(sprite.rect)]
+
+# Tells whether a rect overlaps any sprite of the given groups
+def overlaps_any(spatial_hash: SpatialHash, rect: pygame.Rect, groups: Tuple[pygame.sprite.AbstractGroup, ...]) -> bool:
+    """
+    Checks a rect against the sprites of some groups, looking only at the cells under it.
+
+    Arguments:
+        spatial_hash (SpatialHash): The hash to query.
+        rect (pygame.Rect): The rect to test, in world coordinates.
+        groups (Tuple[AbstractGroup, ...]): The groups whose sprites count, e.g. the ones enemies can't walk through.
+
+    Returns:
+        bool: True if the rect overlaps at least one sprite of the groups.
+    """
+    for sprite in spatial_hash.query(rect):
+        for group in groups:
+            if sprite in group:
+                return True
+    return False
+
+# Pushes overlapping sprites of a group apart, handling each overlapping pair once per frame
+def separate_overlaps(spatial_hash: SpatialHash, group: pygame.sprite.AbstractGroup, blockers: Tuple[pygame.sprite.AbstractGroup, ...] = (),
+                      movable: Optional[Callable[[pygame.sprite.Sprite], bool]] = None):
+    """
+    Runs one separation pass over a group (e.g. all enemies). Overlapping pairs are found
+    through the spatial hash, and each unordered pair is visited exactly once. Both sprites get
+    pushed away from each other along the line between them, scaled by their own speed.
+    All pushes are summed first and then applied in bulk, so the result does not depend on
+    the order sprites are visited in. Each axis of a push is dropped if it would move the
+    sprite into one of the blockers, since nothing corrects a push that isn't movement.
+
+    Arguments:
+        spatial_hash (SpatialHash): The hash tracking the group's sprites.
+        group (AbstractGroup): The sprites to separate. Each must have a rect and a speed.
+        blockers (Tuple[AbstractGroup, ...]): Groups the sprites must not be pushed into (walls, holes, etc.).
+        movable (Optional[Callable[[Sprite], bool]]): Sprites it returns False for (e.g. sleeping ones) still push
+            the others away but don't move themselves. None moves every sprite.
+    """
+    sprites = group.sprites()
+    # Position of each sprite in the pass, used to visit each unordered pair once
+    order = {sprite: index for index, sprite in enumerate(sprites)}
+    # Accumulated [x, y] push for each sprite, only for sprites that overlap something
+    pushes: Dict[pygame.sprite.Sprite, List[float]] = {}
+
+    for sprite in sprites:
+        index = order[sprite]
+        for other in spatial_hash.query(sprite.rect, group):
+            # Skip itself, and pairs that were already handled from the other sprite's side
+            if order.get(other, -1) <= index:
+                continue
+            # Unit vector pointing from the other sprite to this one
+            dx = sprite.rect.x - other.rect.x
+            dy = sprite.rect.y - other.rect.y
+            length = math.hypot(dx, dy)
+            if length == 0:
+                continue
+            dx /= length
+            dy /= length
+            # Push this sprite away from the other, and the other away from this one
+            push = pushes.setdefault(sprite, [0.0, 0.0])
+            push[0] += dx * sprite.speed
+            push[1] += dy * sprite.speed
+            push = pushes.setdefault(other, [0.0, 0.0])
+            push[0] -= dx * other.speed
+            push[1] -= dy * other.speed
+
+    # Apply all pushes at once, one axis at a time and only where the sprite stays clear of the blockers, then re-bucket the moved sprites
+    for sprite, (push_x, push_y) in pushes.items():
+        if movable is not None and not movable(sprite):
+            continue
+        rect = sprite.rect
+        moved = rect.copy()
+        moved.x += push_x
+        if not overlaps_any(spatial_hash, moved, blockers):
+            rect.x = moved.x
+        moved = rect.copy()
+        moved.y += push_y
+        if not overlaps_any(spatial_hash, moved, blockers):
+            rect.y = moved.y
+        spatial_hash.move(sprite)
@@ -15,6 +15,7 @@ SMALL_WIN_HEIGHT = 300
 TILESIZE = 32
 BTN_FONT_SIZE = 18
 FPS = 60
+MAX_FRAME_TIME = 100  # Most a single frame advances the simulation clock, in milliseconds (so stage loads don't run timers down)
 FADE_DURATION = 1500  # Fade duration in milliseconds
 SPLASH_SCREEN_DURATION = 3000  # How long the logo stays on screen (3 seconds max)
 SCROLLING_TEXT_DURATION = 100000  # How long the scrolling text screen lasts (100 secs max)
@@ -123,12 +124,32 @@ ELITE_ENEMY_HP = 100
 ENEMY_COLLISION_DAMAGE = 25
 ENEMY_HIT_DAMAGE = 25
 MIASAMA_DAMAGE = 10
+MIASMA_DAMAGE_COOLDOWN = 1000 # 1 second between two miasma hits
 ENEMY_IFRAME_TIME = 1000   # 1 second
+TIMED_SWITCH_WINDOW = 1000 # 1 second: how long a timed switch stays on after a hit, so all of a door's timed switches must be hit within it
 ENEMY_AGGRO_DISTANCE = 4 * TILESIZE
+AI_FRAME_BUDGET_US = 2000 # Microseconds of enemy planning allowed per frame
+AI_REPLAN_STAGGER = 4 # Enemies are split into this many groups, one of which re-plans each frame
+# Enemy AI level of detail, by distance to the player: enemies within the near distance (about the screen's reach) update
+# every frame, those within the far distance update every AI_LOD_MID_INTERVAL frames, and those further away sleep
+AI_LOD_NEAR_DISTANCE = 14 * TILESIZE
+AI_LOD_FAR_DISTANCE = 24 * TILESIZE
+AI_LOD_MID_INTERVAL = 4
+# Cooperative chasing: frames per reservation tick (about the time an enemy takes to cross a tile), and ticks planned ahead
+RESERVATION_TICK_FRAMES = 16
+COOPERATIVE_WINDOW = 8
+# How strongly chasing enemies touching a wall are pushed away from it, relative to their heading (see ClearanceField)
+CLEARANCE_STEER_WEIGHT = 0.5
+# Grid step for each facing direction
+FACING_STEPS = {'left': (-1, 0), 'right': (1, 0), 'up': (0, -1), 'down': (0, 1)}
+# Patrolling enemies pick a new random facing every ENEMY_PATROL_TURN_FRAMES frames, and wander between these many tiles from their start
+ENEMY_PATROL_TURN_FRAMES = FPS
+ENEMY_PATROL_MIN_TILES = 7
+ENEMY_PATROL_MAX_TILES = 30
 PLAYER_SPEED = 3
 PLAYER_SPEED_BOOSTED = 6
 PLAYER_SPEED_SLIDING = 8
-ENEMY_SPEED = 1
+ENEMY_SPEED = 2
 FIREBALL_SPEED = 5
 ATTACK_FRAME_LIMIT = 5
 FIREBALL_FRAME_INCREMENT = 0.5
@@ -153,6 +174,9 @@ SWITCH_SCALE= 20
 TELEPORT_SPEED = 9
 TELEPORT_DISTANCE = 4 * TILESIZE
 TELEPORT_DURATION = 15
+COLLISION_QUERY_MARGIN = TILESIZE // 2 # Extra pixels around a sprite covered by its per-frame collision query (must exceed the largest step per frame)
+MAX_PROJECTILES = 256 # Maximum number of spell projectiles in flight at once
+PROJECTILE_LIFETIME = 3 * FPS # Frames a spell projectile flies before fizzling out
 
 # Colors
 RED = (255,0,0)
@@ -432,5 +456,27 @@ tilemap5 = (
 "WWWWWWWWWWWWWWWWWWWWWWWWWW"
 )
 
+# Which switches open each door, per stage: {stage: {door (x, y): [switch (x, y), ...]}}. 'S' is a normal switch and 'T' a timed one.
+# Doors that aren't listed need every switch of their stage (stage 5's door has none, so it starts open).
+DOOR_SWITCH_LINKS = {
+    1: {(19, 4): [(19, 12), (27, 19), (24, 24)]},
+    2: {(20, 1): [(9, 4), (13, 15), (26, 15)]},
+    3: {(18, 1): [(1, 10), (38, 10), (1, 18), (38, 18)]},
+    4: {(1, 4): [(37, 5), (1, 12), (21, 18)]},
+}
+
 # Define which characters are NOT walkable (obstacles)
-NON_WALKABLE_CHARS = {'W', 'D', 'H', '-', 'S', 'B'} 
+NON_WALKABLE_CHARS = {'W', 'D', 'H', '-', 'S', 'T', 'B'}
+# Path finding cost of stepping onto a cell, by terrain (plain ground is the cheapest)
+PATH_COST_DEFAULT = 1
+PATH_COST_SLIPPERY = 2 # slippery ice: enemies lose footing
+PATH_COST_MIASMA = 4 # miasma: avoid when a clean route exists
+# Precomputed all-pairs route tables for maps with at most this many walkable tiles (0 disables them), built over several
+# frames with this many microseconds per frame, and cached in the user's cache folder (outside the game's files)
+PATH_ORACLE_MAX_CELLS = 1500
+PATH_ORACLE_BUILD_BUDGET_US = 3000
+PATH_ORACLE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                               os.path.basename(os.path.abspath(ROOT_PATH)), "path_tables")
+# Worker processes searching paths on maps with at least PATH_WORKER_MIN_TILES tiles; 0 keeps all path finding on the main thread
+PATH_WORKERS = 2
+PATH_WORKER_MIN_TILES = 64 * 64
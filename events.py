@@ -0,0 +1,65 @@
+### This file contains the event bus that gameplay systems use to tell each other about state changes, instead of checking for them every frame.
+
+## Imports
+from typing import Callable, Dict, List # used for more efficient type hinting
+
+## Event names, with the arguments their handlers receive
+SWITCH_ACTIVATED = 'switch_activated' # (switch): a switch was turned on for good
+ENEMY_KILLED = 'enemy_killed' # (enemy): an enemy's health ran out
+PLAYER_ENTERED_TILE = 'player_entered_tile' # (player, span): the player's hitbox moved onto a different set of cells, given as (first_x, first_y, last_x, last_y)
+STAGE_CLEARED = 'stage_cleared' # (stage_number): the player walked through the stage's unlocked door
+
+# This class is for passing gameplay events from the systems that cause them to the systems that react to them
+class EventBus:
+    """
+    A simple in-process publish/subscribe bus. Systems subscribe handlers to the events
+    they care about, and whoever causes an event publishes it once, when it happens.
+    Handlers run immediately, in the order they subscribed. Sprites that subscribe
+    unsubscribe again when they are killed.
+    """
+    def __init__(self):
+        """Initializes a bus with no subscribers."""
+        # {event name: handlers}
+        self.handlers: Dict[str, List[Callable[..., None]]] = {}
+
+    # Registers a handler for an event
+    def subscribe(self, event: str, handler: Callable[..., None]):
+        """
+        Calls a handler every time an event is published.
+
+        Arguments:
+            event (str): The event name, e.g. SWITCH_ACTIVATED.
+            handler (Callable[..., None]): Called with the event's arguments.
+        """
+        self.handlers.setdefault(event, []).append(handler)
+
+    # Removes a handler from an event
+    def unsubscribe(self, event: str, handler: Callable[..., None]):
+        """
+        Stops calling a handler for an event. Does nothing if it wasn't subscribed.
+
+        Arguments:
+            event (str): The event name.
+            handler (Callable[..., None]): The handler passed to subscribe().
+        """
+        handlers = self.handlers.get(event)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+
+    # Tells every subscriber that an event happened
+    def publish(self, event: str, *args):
+        """
+        Calls every handler subscribed to an event with the given arguments.
+        Handlers may subscribe or unsubscribe while it runs (e.g. when an event loads
+        a new stage): handlers added during a publish wait for the next one, and
+        handlers removed during it are not called any more.
+
+        Arguments:
+            event (str): The event name.
+            *args: The event's arguments, passed on to each handler.
+        """
+        handlers = self.handlers.get(event, [])
+        for handler in tuple(handlers):
+            # Skip handlers an earlier one unsubscribed (e.g. a portal killed by a stage load)
+            if handler in handlers:
+                handler(*args)
@@ -5,7 +5,13 @@ import pygame
 import sys
 from sprites import *
 from config import *
+from collision import *
+from ai import * # scheduler spreading enemy planning over frames.
+from events import * # event bus for gameplay state changes (switches, enemy deaths, player movement, stage clears).
+from timers import * # timer service running callbacks at deadlines on the simulation clock (iframes, cooldowns, timed switches).
 import json # Used for handling jason data in save file I/O
+import bisect # Used to find where the ground layer ends in the layered sprite list when drawing
+from typing import Dict, List, Iterable # Used for more efficient type hinting
 
 class Game:
     """
@@ -32,8 +38,41 @@ class Game:
         self.showing_hint = False
         self.hint_not_shown = True
         self.credits_shown = False
+        # Sprites of the current stage (replaced by set_stage)
+        self.all_sprites = pygame.sprite.LayeredUpdates()
         # Tile object
         self.tilemap = None
+        # Flow field toward the player, shared by every chasing enemy (built per stage)
+        self.flow_field = None
+        # Distance from every cell to the nearest obstacle, used for enemy steering (built per stage)
+        self.clearance = None
+        # Cells chasing enemies reserved over the next few ticks, so they plan around each other (per stage)
+        self.reservations = None
+        # Worker processes searching enemy paths on large maps (None on maps small enough to search in a frame)
+        self.path_pool = None
+        # All-pairs route table of the current stage, if it is small enough (None otherwise), and one still being built
+        self.path_oracle = None
+        self.path_oracle_build = None
+        # Simulation clock in milliseconds: the time of every unpaused frame played, added up (see update)
+        self.sim_time = 0
+        # Deadlines on the simulation clock (invincibility frames, cooldowns, timed switch resets), advanced once per frame
+        self.timers = TimerService(self.sim_time)
+        # Gameplay events (switches activated, enemies killed, player entering cells, stages cleared) and who reacts to them
+        self.event_bus = EventBus()
+        self.event_bus.subscribe(ENEMY_KILLED, self.on_enemy_killed)
+        self.event_bus.subscribe(STAGE_CLEARED, lambda stage_number: self.stage_clear())
+        self.event_bus.subscribe(SWITCH_ACTIVATED, self.on_switch_activated)
+        # Ground tiles of the current stage, drawn by cell so only the ones on screen are visited
+        self.tiles = TileLayer()
+        # Spatial hash used for collision queries, rebuilt on every stage
+        self.spatial_hash = SpatialHash()
+        # Runs enemy planning within a per-frame time budget
+        self.ai_scheduler = AIScheduler()
+        # Hot state of every enemy in parallel arrays, with the per-frame logic run for all of them at once (emptied per stage)
+        self.enemy_store = EnemyStore(self.timers)
+        # Camera offset: added to a sprite's world position to get its position on screen
+        self.camera_x = 0
+        self.camera_y = 0
 
         # Load in all sprites and images to be used
         # Player and terrain
@@ -60,6 +99,8 @@ class Game:
         self.attack_spritesheet = Spritesheet(PLAYER_ATTACK_SPRITE)
         self.fireball_spritesheet = Spritesheet(PLAYER_FIREBALL_SPRITE)
         self.explosion_spritesheet = Spritesheet(PLAYER_EXPLOSION_SPRITE)
+        # Spell projectiles (fireballs and explosions) are simulated together, outside the sprite groups
+        self.projectiles = ProjectileSystem(self)
         # Misc
         self.menu_background = pygame.image.load(MENU)
         self.menu_background = pygame.transform.scale(self.menu_background, (WIN_WIDTH, WIN_HEIGHT))
@@ -132,9 +173,8 @@ class Game:
         # Assign the tile map to the TileMap object for path finding.
         self.tilemap = TileMap(curr_tilemap)
 
-        # Remove all sprites from all groups before transitioning.
-        for sprite in self.all_sprites:
-            sprite.kill()
+        # Remove all ground tiles before transitioning (the previous stage's sprites were removed by set_stage).
+        self.tiles.reset(self.tilemap.width, self.tilemap.height)
         # Explicitly clear the screen and update the display to remove old sprites.
         self.screen.fill(BLACK)
         pygame.display.flip() 
@@ -200,8 +240,11 @@ class Game:
                 if column == "S":
                     # Place a switch sprite at x=j and y=i coordinates
                     Ground(self, j, i, stage_type)
-                    switch = Switch(self, j, i, 'normal')
-                    self.switches_list.append(switch)
+                    self.switches_by_coord[(j, i)] = Switch(self, j, i, 'normal')
+                if column == "T":
+                    # Place a timed switch sprite at x=j and y=i coordinates
+                    Ground(self, j, i, stage_type)
+                    self.switches_by_coord[(j, i)] = Switch(self, j, i, 'timed')
                 if column == "_":
                     # Place a ground_layer type-0 geo sprite at x=j and y=i coordinates
                         Geo(self, j, i, stage_type, 2, GROUND_LAYER)
@@ -231,8 +274,11 @@ class Game:
                     # Place a portal for stage 5 sprite at x=j and y=i coordinates
                         Portal(self, j, i, 5, self.player.stages_locked[4])
                 if column == "D":
-                    # Door + Find all switches linked to this door's coordinates
-                    linked_switches = self.switches_list
+                    # Door + Find all switches linked to this door's coordinates (every switch of the stage, unless configured otherwise)
+                    linked_switches = DOOR_SWITCH_LINKS.get(stage_type, {}).get((j, i), list(self.switches_by_coord))
+                    for coord in linked_switches:
+                        if coord not in self.switches_by_coord:
+                            raise ValueError(f"DOOR_SWITCH_LINKS: the door at {(j, i)} on stage {stage_type} is linked to {coord}, which is not a switch.")
                     Door(self, j, i, linked_switches)
                 if column == "=":
                     # Place a block_layer type-2 geo sprite at x=j and y=i coordinates, on top of another Geo
@@ -243,46 +289,76 @@ class Game:
                             Geo(self, j, i, stage_type, 2, BLOCK_LAYER)
                         elif stage_type == 4:
                             Geo(self, j, i, stage_type, 1, BLOCK_LAYER)
+
+        # Every configured door must exist, or its links would be silently ignored
+        for coord in DOOR_SWITCH_LINKS.get(stage_type, {}):
+            if not any((door.x // TILESIZE, door.y // TILESIZE) == coord for door in self.doors):
+                raise ValueError(f"DOOR_SWITCH_LINKS: stage {stage_type} has no door at {coord}.")
+
+        # Let the path finding grid reflect the terrain that was actually placed
+        for group in (self.blocks, self.holes, self.ice_blocks, self.waters, self.doors):
+            for sprite in group:
+                self.tilemap.set_walkable(sprite.x // TILESIZE, sprite.y // TILESIZE, False)
+        for group, cost in ((self.slippery_ice, PATH_COST_SLIPPERY), (self.miasmas, PATH_COST_MIASMA)):
+            for sprite in group:
+                self.tilemap.set_cost(sprite.x // TILESIZE, sprite.y // TILESIZE, cost)
+        # One flow field per stage; it rebuilds itself lazily when the player changes tile
+        self.flow_field = FlowField(self.tilemap)
+        # Obstacle distance field for steering; rebuilt lazily whenever the terrain changes
+        self.clearance = ClearanceField(self.tilemap)
+        # Fresh space-time reservations for cooperative chasing
+        self.reservations = ReservationTable()
+        # Small maps load a table of every route from the cache, so chasing needs no search. On a miss it is
+        # built a little every frame (see update), and chasing searches with the flow field until it's done.
+        self.path_oracle = None
+        self.path_oracle_build = None
+        if 0 < sum(self.tilemap.walkable) <= PATH_ORACLE_MAX_CELLS:
+            oracle = DistanceOracle(self.tilemap)
+            if oracle.supports():
+                if oracle.load(oracle.get_cache_path(PATH_ORACLE_DIR)):
+                    self.path_oracle = oracle
+                else:
+                    self.path_oracle_build = oracle
+        # Stop the previous stage's path workers, if any
+        if self.path_pool is not None:
+            self.path_pool.close()
+            self.path_pool = None
+        # Large maps move enemy path searches onto worker processes
+        if self.tilemap.width * self.tilemap.height >= PATH_WORKER_MIN_TILES and PATH_WORKERS > 0:
+            self.path_pool = PathWorkerPool(self.tilemap)
                 
-    # Check for timed switches every 1 second
-    def timed_switches_check(self):
+    # Called by the event bus whenever a switch is turned on for good
+    def on_switch_activated(self, switch: Switch):
         """
-        Iterates through doors and checks if any are linked to timed switches. 
-        If a sequence of timed switches is hit within 1 second, the door is unlocked permanently.
+        Tells only the doors linked to the switch, each of which counts down its remaining switches.
+
+        Arguments:
+            switch (Switch): The switch that was just turned on.
         """
-        for door in self.doors:
+        for door in self.doors_by_switch.get(switch.coord, ()):
+            door.on_switch_activated()
+
+    # Check the timed switches of some doors, run when one of their timed switches is hit
+    def timed_switches_check(self, doors: Iterable[Door]):
+        """
+        Checks the given doors' timed switches. If all of a door's timed switches were hit 
+        within TIMED_SWITCH_WINDOW, they are turned on permanently.
+
+        Arguments:
+            doors (Iterable[Door]): The doors to check, e.g. the ones linked to the switch just hit.
+        """
+        for door in doors:
             if not door.locked:
                 continue
-            timed_switches = [self.switches_by_coord.get(coord) for coord in door.linked_switches if self.switches_by_coord.get(coord).switch_type == 'timed']
+            timed_switches = door.timed_switches
             if not timed_switches:
                 continue
             
-            last_hit = 0 # First timed switch hit
-            all_hit = True # Set to False if the timing is off
-
-            for switch in timed_switches: 
-                 # if the switch has been hit 
-                if switch.last_hit_time > 0:
-                    if last_hit == 0: # If this is the first switch being checked, record hit time
-                        last_hit = switch.last_hit_time
-                    elif abs(switch.last_hit_time - last_hit) > 1.0: # If it's not the first, calculate absolute (to ensure positive value) difference between current switch's hit time and the last_hit time
-                        # If difference is greater than 1 second, player was too slow: set all_hit to False and break out of loop
-                        all_hit = False
-                        break
-                 # if the switch has not been hit, set all_hit = False by default
-                else:
-                    all_hit = False
-                    break
-            # player hit all the timed switches within the 1-second window
-            if all_hit:
+            # A timed switch stays on for exactly TIMED_SWITCH_WINDOW after its last hit (its reset is scheduled on the timer service),
+            # so they are all on at once only if the player hit all of them within the window
+            if all(switch.is_on for switch in timed_switches):
                 for switch in timed_switches:
                     switch.set_permanent_on()
-            # player failed the timing
-            else:
-                for switch in timed_switches:
-                    # Check if a timed switch needs to be reset due to being hit in the attempt
-                    if time.time() - switch.last_hit_time > 1.0: 
-                        switch.reset()
     # This method runs whenever we start a new game
     def set_stage(self, current_stage: int, player: Player = None):
         """
@@ -295,8 +371,17 @@ class Game:
         """
         #indicates that the player is currently alive and playing
         self.playing = True
-        #this object contains all game sprites, including environment, player and enemies, etc., allowing sprite update
+        # Remove the previous stage's sprites before their groups are replaced: the event bus outlives the stage,
+        # and sprites listening on it (unlocked portals) only unsubscribe when they are killed
+        for sprite in self.all_sprites:
+            sprite.kill()
+        # Nothing from the previous stage may still be listening for the player
+        assert not self.event_bus.handlers.get(PLAYER_ENTERED_TILE), "stale PLAYER_ENTERED_TILE handlers"
+        #this object contains all game sprites, including environment, player and enemies, etc., allowing sprite drawing
         self.all_sprites = pygame.sprite.LayeredUpdates()
+        # the sprites that need their update method run every frame (player, enemies, attacks, miasma and portals).
+        # Static terrain, switches and doors (which wait for switch events) are left out, so the update pass doesn't call them for nothing.
+        self.active_sprites = pygame.sprite.LayeredUpdates()
         self.players = pygame.sprite.LayeredUpdates()
         self.blocks = pygame.sprite.LayeredUpdates()
         self.geos = pygame.sprite.LayeredUpdates()
@@ -307,13 +392,35 @@ class Game:
         self.holes = pygame.sprite.LayeredUpdates()
         self.enemies = pygame.sprite.LayeredUpdates()
         self.attacks = pygame.sprite.LayeredUpdates()
-        self.fireballs = pygame.sprite.LayeredUpdates()
-        self.explosions = pygame.sprite.LayeredUpdates()
         self.doors = pygame.sprite.LayeredUpdates()
         self.switches = pygame.sprite.LayeredUpdates()
         self.portals = pygame.sprite.LayeredUpdates()
         self.portals_locked = pygame.sprite.LayeredUpdates()
-        self.switches_list = []
+        # Switch-to-door dependency graph of the stage: switches by grid coordinate, and the doors each switch helps open
+        self.switches_by_coord: Dict[GridNode, Switch] = {}
+        self.doors_by_switch: Dict[GridNode, List[Door]] = {}
+        # Named collision categories, each backed by a sprite group. Sorted out of a single spatial hash query.
+        self.collision_categories = [
+            ('solid', self.blocks),
+            ('door', self.doors),
+            ('hole', self.holes),
+            ('water', self.waters),
+            ('ice', self.ice_blocks),
+            ('hazard', self.miasmas),
+            ('slippery', self.slippery_ice),
+            ('enemy', self.enemies),
+            ('switch', self.switches),
+        ]
+        # No spells or pending enemy plans carry over between stages
+        self.projectiles.clear()
+        self.ai_scheduler.clear()
+        self.enemy_store.clear()
+        # Nor any pending timers; the new stage's start from the current time
+        self.timers.clear(self.sim_time)
+        # Fresh spatial hash and camera for the new stage; sprites are placed in world coordinates
+        self.spatial_hash = SpatialHash()
+        self.camera_x = 0
+        self.camera_y = 0
 
         # Setup the game's tilemap, depending on stage entered
         if current_stage == 1:
@@ -354,12 +461,35 @@ class Game:
         # On entering any stage, save progress
         self.save_progress()
         
-        # Find the player sprite's position in current map, and offset all sprites make it the center of attention.
-        initial_offset_x = (WIN_WIDTH // 2) - self.player.rect.centerx
-        initial_offset_y = (WIN_HEIGHT // 2) - self.player.rect.centery
-        for sprite in self.all_sprites:
-            sprite.rect.x += initial_offset_x
-            sprite.rect.y += initial_offset_y    
+        # Find the player sprite's position in current map, and offset the camera to make it the center of attention.
+        self.center_camera(self.player)
+
+    # Gathers everything a sprite could touch this frame with one spatial hash lookup
+    def query_collisions(self, rect: pygame.Rect) -> dict[str, list]:
+        """
+        Runs one broadphase query around a rect, padded by COLLISION_QUERY_MARGIN to cover
+        a full frame of movement, and sorts the hits into the game's collision categories.
+
+        Arguments:
+            rect (pygame.Rect): The sprite's current rect, in world coordinates.
+
+        Returns:
+            dict[str, list]: Candidate sprites for each category name ('solid', 'door', 'hole', etc.).
+        """
+        area = rect.inflate(COLLISION_QUERY_MARGIN * 2, COLLISION_QUERY_MARGIN * 2)
+        return query_categories(self.spatial_hash, area, self.collision_categories)
+
+    # Scrolls the view of the world so a sprite is centered. Sprites keep their world coordinates; only the draw offset changes.
+    def center_camera(self, sprite: pygame.sprite.Sprite):
+        """
+        Sets the camera offset used when drawing so the given sprite sits in the middle of the screen.
+        Replaces moving every sprite's rect, so scrolling costs the same regardless of sprite count.
+
+        Arguments:
+            sprite (pygame.sprite.Sprite): The sprite to follow, usually the player.
+        """
+        self.camera_x = (WIN_WIDTH // 2) - sprite.rect.centerx
+        self.camera_y = (WIN_HEIGHT // 2) - sprite.rect.centery
 
     # Game loop events, e.g. clicks and keyboard presses
     def events(self):
@@ -399,26 +529,28 @@ class Game:
                 elif event.key == pygame.K_x and not self.player.is_shielded and not self.player.is_dead:
                     if self.player.mana >= FIREBALL_MANA_COST:
                         if self.player.facing == 'up':
-                            Fireball(self, self.player.rect.x, self.player.rect.y - TILESIZE, self.player.facing)
+                            self.projectiles.spawn(ProjectileSystem.FIREBALL, self.player.rect.x, self.player.rect.y - TILESIZE, self.player.facing)
                         if self.player.facing == 'down':
-                            Fireball(self, self.player.rect.x, self.player.rect.y + TILESIZE, self.player.facing)
+                            self.projectiles.spawn(ProjectileSystem.FIREBALL, self.player.rect.x, self.player.rect.y + TILESIZE, self.player.facing)
                         if self.player.facing == 'left':
-                            Fireball(self, self.player.rect.x - TILESIZE, self.player.rect.y, self.player.facing)
+                            self.projectiles.spawn(ProjectileSystem.FIREBALL, self.player.rect.x - TILESIZE, self.player.rect.y, self.player.facing)
                         if self.player.facing == 'right':
-                            Fireball(self, self.player.rect.x + TILESIZE, self.player.rect.y, self.player.facing)
+                            self.projectiles.spawn(ProjectileSystem.FIREBALL, self.player.rect.x + TILESIZE, self.player.rect.y, self.player.facing)
+                        self.sfxs['fireball'].play()
                         self.player.mana -= FIREBALL_MANA_COST
                         self.player.is_attacking = True
                 # If C has been pressed, cast explosion if player has enough mana
                 elif event.key == pygame.K_c and not self.player.is_shielded and not self.player.is_dead:
                     if self.player.mana >= EXPLOSION_MANA_COST:
                         if self.player.facing == 'up':
-                            Explosion(self, self.player.rect.x, self.player.rect.y - TILESIZE)
+                            self.projectiles.spawn(ProjectileSystem.EXPLOSION, self.player.rect.x, self.player.rect.y - TILESIZE, self.player.facing)
                         if self.player.facing == 'down':
-                            Explosion(self, self.player.rect.x, self.player.rect.y + TILESIZE)
+                            self.projectiles.spawn(ProjectileSystem.EXPLOSION, self.player.rect.x, self.player.rect.y + TILESIZE, self.player.facing)
                         if self.player.facing == 'left':
-                            Explosion(self, self.player.rect.x - TILESIZE, self.player.rect.y)
+                            self.projectiles.spawn(ProjectileSystem.EXPLOSION, self.player.rect.x - TILESIZE, self.player.rect.y, self.player.facing)
                         if self.player.facing == 'right':
-                            Explosion(self, self.player.rect.x + TILESIZE, self.player.rect.y)
+                            self.projectiles.spawn(ProjectileSystem.EXPLOSION, self.player.rect.x + TILESIZE, self.player.rect.y, self.player.facing)
+                        self.sfxs['explosion'].play(maxtime=2000)
                         self.player.mana -= EXPLOSION_MANA_COST
                         self.player.is_attacking = True
                 # If Space has been pressed, teleport
@@ -447,8 +579,36 @@ class Game:
         and initiates the loading screen if a stage transition is needed.
         """
         if not self.paused:
-            # find update method in each sprite in the group "all_sprites" and run it
-            self.all_sprites.update()
+            # Move the simulation clock on by the last frame's time, running the timers that came due (iframes ending, cooldowns,
+            # timed switch resets). Paused frames aren't counted, and a long frame (e.g. loading a stage) counts as MAX_FRAME_TIME.
+            self.sim_time += min(self.clock.get_time(), MAX_FRAME_TIME)
+            self.timers.advance(self.sim_time)
+            # Build some more of the stage's route table, if it wasn't cached
+            if self.path_oracle_build is not None and self.path_oracle_build.build_some(PATH_ORACLE_BUILD_BUDGET_US):
+                self.path_oracle_build.save_to_cache(PATH_ORACLE_DIR)
+                self.path_oracle = self.path_oracle_build
+                self.path_oracle_build = None
+            # Let this frame's share of the enemies re-plan, within the AI time budget
+            if not self.player.is_dead:
+                # Hand back paths the workers finished since last frame
+                if self.path_pool is not None:
+                    self.path_pool.poll()
+                self.reservations.advance()
+                # Distances to the player, aggro range checks and patrol facings for all enemies, before any of them plans or moves
+                self.enemy_store.steer(self.player.rect)
+                self.ai_scheduler.schedule(self.enemies)
+                self.ai_scheduler.run()
+            # Push overlapping enemies apart in a single batched pass, instead of every enemy scanning the others.
+            # Runs before the enemies move, never pushes one into a wall, hole, ice block or water, and leaves sleeping ones where they are.
+            if not self.player.is_dead:
+                separate_overlaps(self.spatial_hash, self.enemies, (self.blocks, self.holes, self.ice_blocks, self.waters),
+                                  lambda enemy: not enemy.is_asleep())
+            # find update method in each sprite in the group "active_sprites" and run it
+            self.active_sprites.update()
+            # Move and collide all spell projectiles in one pass
+            self.projectiles.update()
+            # Keep the camera on the player after everything has moved
+            self.center_camera(self.player)
         if self.player.stage_changed:
             current_stage = self.player.current_stage
             self.player.stage_changed = False
@@ -466,8 +626,21 @@ class Game:
     def draw(self):
         """Renders all game elements to the screen, including sprites, health/mana bars, and the pause overlay."""
         self.screen.fill(BLACK)
-        # go through each sprite in the group "all_sprites", finds image and rect, and draws that unto the window
-        self.all_sprites.draw(self.screen)
+        # go through each sprite in the group "all_sprites", finds image and rect, and draws that unto the window offset by the camera
+        camera_x = self.camera_x
+        camera_y = self.camera_y
+        blit = self.screen.blit
+        # Ground tiles on screen go under everything, except the few placed over ground-layer sprites, drawn right after that layer
+        sprites = self.all_sprites.sprites()
+        ground_layer_end = bisect.bisect_right(sprites, GROUND_LAYER, key=self.all_sprites.get_layer_of_sprite)
+        self.tiles.draw(self.screen, camera_x, camera_y)
+        for sprite in sprites[:ground_layer_end]:
+            blit(sprite.image, (sprite.rect.x + camera_x, sprite.rect.y + camera_y))
+        self.tiles.draw_overlays(self.screen, camera_x, camera_y)
+        for sprite in sprites[ground_layer_end:]:
+            blit(sprite.image, (sprite.rect.x + camera_x, sprite.rect.y + camera_y))
+        # Spell projectiles are drawn on top of every sprite
+        self.projectiles.draw(self.screen, camera_x, camera_y)
         # Draw the player's health bar
         self.player.draw_health_bar()
         # Draw the player's mana bar
@@ -644,6 +817,17 @@ class Game:
                         self.set_stage(self.player.current_stage, curr_player)
                         self.main()           
 
+    # What happens when an enemy's health runs out. Subscribed to the event bus.
+    def on_enemy_killed(self, enemy: Enemy):
+        """
+        Plays the enemy death sound and removes the enemy from the game.
+
+        Arguments:
+            enemy (Enemy): The enemy that was killed.
+        """
+        self.sfxs['enemy_death'].play()
+        enemy.kill()
+
     # What happens when a stage is cleared.
     def stage_clear(self):
         """
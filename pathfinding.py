@@ -0,0 +1,1513 @@
+### This file contains the stage grid used for path finding, and the path finding algorithms enemies use to reach the player.
+
+## Imports
+from config import * # configuration file with all out settings and constants.
+import math # used for the octile heuristic's diagonal cost.
+import heapq # used as the binary-heap open set of A*.
+from array import array # used for the compact per-cell cost grid.
+from collections import deque # used for flood fills over the grid.
+import os # used to locate the disk cache of distance tables.
+import struct # used for the distance table file header.
+import hashlib # used to name distance table cache files after the map they describe.
+import time # used to stop building distance tables once a frame's share of time is spent.
+from typing import List, Set, Tuple, Dict, Optional, Callable, Hashable, Iterator # used for more efficient type hinting
+
+## Global variables
+# Represents a coordinate on the grid (x_index, y_index)
+GridNode = Tuple[int, int]
+# Represents a heuristic: estimated cost between two grid nodes
+Heuristic = Callable[[GridNode, GridNode], float]
+
+# Cost of moving diagonally relative to a straight step
+DIAGONAL_COST = math.sqrt(2)
+
+# This class is for a tile map's stage path finding, used with enemies
+class TileMap:
+    """
+    Utility class for parsing the string-array tilemap data into a grid.
+    Provides methods for pathfinding algorithms to check tile type
+    and connectivity. Walkability and per-cell movement costs are stored
+    in flat grids so they can be updated when terrain changes mid-stage.
+    """
+    def __init__(self, tilemap_data: tuple[str]):
+        """
+        Initializes the TileMap with map data and calculates grid dimensions.
+
+        Arguments:
+            tilemap_data (tuple[str]): The grid data.
+        """
+        self.data = tilemap_data
+        # Map dimensions based on provided tile map data
+        self.height = len(tilemap_data)
+        self.width = len(tilemap_data[0]) if self.height > 0 else 0
+        # Flat grids indexed by y * width + x: 1 if the cell can be walked on, and the cost of stepping onto it
+        self.walkable = bytearray(
+            0 if char in NON_WALKABLE_CHARS else 1
+            for row in tilemap_data for char in row.ljust(self.width, 'W')[:self.width]
+        )
+        self.costs = array('f', [PATH_COST_DEFAULT]) * (self.width * self.height)
+        # Bumped every time walkability or costs change, so cached results can tell they are stale
+        self.version = 0
+        # Connected regions of walkable cells, computed lazily then kept up to date: region id per cell index (-1 if blocked)
+        self.regions: Optional[List[int]] = None
+        # Number of cells in each region, and the next unused region id
+        self.region_sizes: Dict[int, int] = {}
+        self.next_region = 0
+        # Callbacks told about every changed cell as listener(x, y), e.g. planners repairing themselves
+        self.listeners: List[Callable[[int, int], None]] = []
+        # Whether every cell costs PATH_COST_DEFAULT, cached for the map version it was checked at
+        self.uniform: Tuple[int, bool] = (-1, True)
+
+    # Builds a tile map over existing grids, e.g. views of shared memory in a worker process
+    @classmethod
+    def from_grids(cls, width: int, height: int, walkable, costs) -> 'TileMap':
+        """
+        Creates a tile map that searches over the given flat grids instead of parsing tile
+        characters. The grids are used as they are, not copied; the map has no tile characters.
+
+        Arguments:
+            width (int): The grid width, in tiles.
+            height (int): The grid height, in tiles.
+            walkable: A flat grid of 1 (walkable) and 0 (blocked) per cell, indexed by y * width + x.
+            costs: A flat grid of movement costs per cell, indexed the same way.
+
+        Returns:
+            TileMap: The new tile map.
+        """
+        tilemap = cls(())
+        tilemap.width, tilemap.height = width, height
+        tilemap.walkable, tilemap.costs = walkable, costs
+        return tilemap
+
+    def get_tile_char(self, x: int, y: int) -> Optional[str]:
+        """
+        Gets the character at the given grid coordinates.
+
+        Arguments:
+            x (int): The grid column index.
+            y (int): The grid row index.
+
+        Returns:
+            Optional[str]: The tile character ('W', 'P', '.') or None if out of bounds.
+        """
+        # Get the character at the given grid coordinates, or None if out of bounds.
+        if 0 <= y < self.height and 0 <= x < self.width:
+            return self.data[y][x]
+        return None
+
+    def is_walkable(self, x: int, y: int) -> bool:
+        """
+        Checks if a given grid coordinate is within bounds and not an obstacle.
+        Starts out from the NON_WALKABLE_CHARS list in config.py, and follows
+        later terrain changes made through set_walkable().
+
+        Arguments:
+            x (int): The grid column index.
+            y (int): The grid row index.
+
+        Returns:
+            bool: True if the tile is safe to walk on, False if it is an obstacle or out of bounds.
+        """
+        # Check if coordinate is out of bound
+        if not (0 <= y < self.height and 0 <= x < self.width):
+            return False
+        return self.walkable[y * self.width + x] == 1
+
+    def get_cost(self, x: int, y: int) -> float:
+        """
+        Gets the cost of stepping onto a cell (PATH_COST_DEFAULT for plain ground).
+
+        Arguments:
+            x (int): The grid column index.
+            y (int): The grid row index.
+
+        Returns:
+            float: The movement cost of the cell.
+        """
+        return self.costs[y * self.width + x]
+
+    # Marks a cell as walkable or blocked, e.g. when terrain is placed or destroyed
+    def set_walkable(self, x: int, y: int, walkable: bool):
+        """
+        Updates the walkability of a cell. Does nothing for out of bounds cells or if nothing changed.
+
+        Arguments:
+            x (int): The grid column index.
+            y (int): The grid row index.
+            walkable (bool): Whether the cell can now be walked on.
+        """
+        if not (0 <= y < self.height and 0 <= x < self.width):
+            return
+        index = y * self.width + x
+        value = 1 if walkable else 0
+        if self.walkable[index] != value:
+            self.walkable[index] = value
+            self.version += 1
+            if self.regions is not None:
+                self.update_regions(index)
+            self.notify(x, y)
+
+    # Sets how expensive it is to walk over a cell, e.g. slippery ice or miasma
+    def set_cost(self, x: int, y: int, cost: float):
+        """
+        Updates the movement cost of a cell. Costs must be at least PATH_COST_DEFAULT
+        so the A* heuristics stay admissible.
+
+        Arguments:
+            x (int): The grid column index.
+            y (int): The grid row index.
+            cost (float): The new cost of stepping onto the cell.
+        """
+        if not (0 <= y < self.height and 0 <= x < self.width):
+            return
+        index = y * self.width + x
+        cost = max(cost, PATH_COST_DEFAULT)
+        if self.costs[index] != cost:
+            self.costs[index] = cost
+            self.version += 1
+            self.notify(x, y)
+
+    # Checks whether every cell costs the same to step on, which jump point search relies on
+    def is_uniform(self) -> bool:
+        """
+        Checks whether all cells have the default movement cost.
+
+        Returns:
+            bool: True if no cell is weighted, False otherwise.
+        """
+        if self.uniform[0] != self.version:
+            self.uniform = (self.version, max(self.costs, default=PATH_COST_DEFAULT) <= PATH_COST_DEFAULT)
+        return self.uniform[1]
+
+    # Registers a callback to be told about terrain changes
+    def add_listener(self, listener: Callable[[int, int], None]):
+        """
+        Registers a callback called as listener(x, y) after a cell's walkability or cost changes.
+
+        Arguments:
+            listener (Callable[[int, int], None]): The callback to register.
+        """
+        self.listeners.append(listener)
+
+    def notify(self, x: int, y: int):
+        """
+        Tells every listener that a cell changed.
+
+        Arguments:
+            x (int): The grid column index.
+            y (int): The grid row index.
+        """
+        for listener in self.listeners:
+            listener(x, y)
+
+    # Gets valid neighboring grids (up, down, left, right) that are walkable
+    def get_neighbors(self, node: GridNode) -> List[GridNode]:
+        """
+        Returns a list of valid, walkable neighboring grid nodes (up, down, left, right).
+
+        Arguments:
+            node (GridNode): The starting (x, y) grid coordinates.
+
+        Returns:
+            List[GridNode]: A list of reachable neighbor coordinates.
+        """
+        x, y = node
+        potential_neighbors = [
+            (x + 1, y),  # Right
+            (x - 1, y),  # Left
+            (x, y + 1),  # Down
+            (x, y - 1)   # Up
+        ]
+
+        # Filter out neighbors that are obstacles or out of bounds
+        return [
+            neighbor for neighbor in potential_neighbors
+            if self.is_walkable(neighbor[0], neighbor[1])
+        ]
+
+    # Gets walkable neighbors along with the cost of stepping onto each
+    def get_weighted_neighbors(self, node: GridNode, diagonal: bool = False) -> List[Tuple[GridNode, float]]:
+        """
+        Returns walkable neighbors and their step costs (cell cost, times sqrt(2) for diagonals).
+        Diagonal steps are only allowed when both cells they cut past are walkable, so paths never clip corners.
+
+        Arguments:
+            node (GridNode): The starting (x, y) grid coordinates.
+            diagonal (bool): Whether diagonal steps are allowed.
+
+        Returns:
+            List[Tuple[GridNode, float]]: (neighbor, step cost) pairs.
+        """
+        x, y = node
+        width = self.width
+        walkable = self.walkable
+        costs = self.costs
+        neighbors = []
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if 0 <= ny < self.height and 0 <= nx < width and walkable[ny * width + nx]:
+                neighbors.append(((nx, ny), costs[ny * width + nx]))
+        if diagonal:
+            for dx, dy in ((1, 1), (1, -1), (-1, 1), (-1, -1)):
+                nx, ny = x + dx, y + dy
+                if self.is_walkable(nx, ny) and self.is_walkable(nx, y) and self.is_walkable(x, ny):
+                    neighbors.append(((nx, ny), costs[ny * width + nx] * DIAGONAL_COST))
+        return neighbors
+
+    # Labels every group of connected walkable cells, so unreachable targets can be detected without a search
+    def get_region(self, node: GridNode) -> int:
+        """
+        Returns the id of the connected walkable region a cell belongs to. Two cells can only
+        reach each other if they share a region. Regions are labeled on first use, then
+        updated cell by cell as terrain changes.
+
+        Arguments:
+            node (GridNode): The (x, y) grid coordinates.
+
+        Returns:
+            int: The region id, or -1 if the cell is not walkable or out of bounds.
+        """
+        x, y = node
+        if not self.is_walkable(x, y):
+            return -1
+        if self.regions is None:
+            self.label_regions()
+        return self.regions[y * self.width + x]
+
+    def label_regions(self):
+        """Flood fills every walkable region of the grid (4-connected) and stores its id and size."""
+        width, height = self.width, self.height
+        walkable = self.walkable
+        regions = [-1] * (width * height)
+        self.region_sizes = {}
+        region_id = 0
+        for start in range(width * height):
+            if not walkable[start] or regions[start] != -1:
+                continue
+            regions[start] = region_id
+            size = 1
+            queue = deque([start])
+            while queue:
+                index = queue.popleft()
+                x, y = index % width, index // width
+                for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                    if 0 <= ny < height and 0 <= nx < width:
+                        neighbor = ny * width + nx
+                        if walkable[neighbor] and regions[neighbor] == -1:
+                            regions[neighbor] = region_id
+                            size += 1
+                            queue.append(neighbor)
+            self.region_sizes[region_id] = size
+            region_id += 1
+        self.regions = regions
+        self.next_region = region_id
+
+    # Checks whether one cell can reach another, in O(1) once regions are labeled
+    def is_reachable(self, start_node: GridNode, end_node: GridNode) -> bool:
+        """
+        Checks whether two cells are walkable and connected.
+
+        Arguments:
+            start_node (GridNode): The (x, y) cell to start from.
+            end_node (GridNode): The (x, y) cell to reach.
+
+        Returns:
+            bool: True if a path between the cells exists, False otherwise.
+        """
+        region = self.get_region(start_node)
+        return region != -1 and region == self.get_region(end_node)
+
+    def get_index_neighbors(self, index: int) -> List[int]:
+        """
+        Returns the flat indexes of a cell's in-bounds 4-directional neighbors, walkable or not.
+
+        Arguments:
+            index (int): The cell's flat index.
+
+        Returns:
+            List[int]: The neighbors' flat indexes.
+        """
+        width = self.width
+        x, y = index % width, index // width
+        neighbors = []
+        if x > 0: neighbors.append(index - 1)
+        if x < width - 1: neighbors.append(index + 1)
+        if y > 0: neighbors.append(index - width)
+        if y < self.height - 1: neighbors.append(index + width)
+        return neighbors
+
+    # Keeps the region labels right after one cell's walkability flipped, without relabeling the map
+    def update_regions(self, index: int):
+        """
+        Updates the region labels after a cell became walkable (joining, and maybe merging, the
+        regions around it) or blocked (maybe splitting its region in pieces).
+
+        Arguments:
+            index (int): The flat index of the changed cell.
+        """
+        regions, sizes = self.regions, self.region_sizes
+        neighbors = [neighbor for neighbor in self.get_index_neighbors(index) if regions[neighbor] != -1]
+        if self.walkable[index]:
+            labels = {regions[neighbor] for neighbor in neighbors}
+            if not labels:
+                # An isolated cell is a region of its own
+                regions[index] = self.next_region
+                sizes[self.next_region] = 1
+                self.next_region += 1
+                return
+            # Join the largest neighboring region and pour the others into it
+            keep = max(labels, key=lambda label: (sizes[label], -label))
+            regions[index] = keep
+            sizes[keep] += 1
+            for neighbor in neighbors:
+                label = regions[neighbor]
+                if label != keep:
+                    sizes[keep] += sizes.pop(label)
+                    self.relabel(neighbor, label, keep)
+            return
+
+        label = regions[index]
+        regions[index] = -1
+        sizes[label] -= 1
+        if sizes[label] == 0:
+            del sizes[label]
+        if len(neighbors) > 1:
+            self.split_region(label, neighbors)
+
+    # Same as update_regions, for several cells that changed since the labels were last updated
+    def update_regions_batch(self, indexes: List[int]):
+        """
+        Updates the region labels after a batch of cells changed at once: the newly blocked
+        cells are taken out first and every region they bordered is checked for splits in one
+        go, then the newly walkable cells are joined in one at a time.
+
+        Arguments:
+            indexes (List[int]): The flat indexes of the changed cells, in any order (repeats are fine).
+        """
+        regions, sizes, walkable = self.regions, self.region_sizes, self.walkable
+        blocked = {index for index in indexes if not walkable[index] and regions[index] != -1}
+        opened = {index for index in indexes if walkable[index] and regions[index] == -1}
+        for index in blocked:
+            label = regions[index]
+            regions[index] = -1
+            sizes[label] -= 1
+            if sizes[label] == 0:
+                del sizes[label]
+        # The cells left around the blocked ones, by region: each region is split at most once
+        starts: Dict[int, Set[int]] = {}
+        for index in blocked:
+            for neighbor in self.get_index_neighbors(index):
+                if regions[neighbor] != -1:
+                    starts.setdefault(regions[neighbor], set()).add(neighbor)
+        for label, cells in starts.items():
+            if len(cells) > 1:
+                self.split_region(label, sorted(cells))
+        for index in sorted(opened):
+            self.update_regions(index)
+
+    def relabel(self, start: int, old_label: int, new_label: int):
+        """
+        Flood fills a region with a new label.
+
+        Arguments:
+            start (int): The flat index of a cell in the region.
+            old_label (int): The region's current label.
+            new_label (int): The label to give it.
+        """
+        regions = self.regions
+        regions[start] = new_label
+        queue = deque([start])
+        while queue:
+            for neighbor in self.get_index_neighbors(queue.popleft()):
+                if regions[neighbor] == old_label:
+                    regions[neighbor] = new_label
+                    queue.append(neighbor)
+
+    def split_region(self, label: int, starts: List[int]):
+        """
+        Checks whether blocking a cell cut its region apart, and gives every piece cut off its own label.
+        Flood fills from each of the blocked cell's neighbors in turn, one cell at a time: fills that
+        meet belong to the same piece, and as soon as only one piece is still growing, the others are
+        known in full. The cost is proportional to the pieces cut off, not to the whole region.
+
+        Arguments:
+            label (int): The label of the region the blocked cell was in.
+            starts (List[int]): The flat indexes of the blocked cell's walkable neighbors.
+        """
+        regions = self.regions
+        count = len(starts)
+        # Union-find over the fills, merged whenever two of them meet
+        groups = list(range(count))
+        def find(fill: int) -> int:
+            while groups[fill] != fill:
+                groups[fill] = groups[groups[fill]]
+                fill = groups[fill]
+            return fill
+
+        owner = {start: fill for fill, start in enumerate(starts)}
+        visited = [[start] for start in starts]
+        queues = [deque([start]) for start in starts]
+        while True:
+            roots = {find(fill) for fill in range(count)}
+            if len(roots) == 1:
+                # Every fill met the others: the region is still in one piece
+                return
+            growing = {find(fill) for fill in range(count) if queues[fill]}
+            if len(growing) <= 1:
+                break
+            for fill in range(count):
+                if not queues[fill]:
+                    continue
+                for neighbor in self.get_index_neighbors(queues[fill].popleft()):
+                    if regions[neighbor] != label:
+                        continue
+                    other = owner.get(neighbor)
+                    if other is None:
+                        owner[neighbor] = fill
+                        visited[fill].append(neighbor)
+                        queues[fill].append(neighbor)
+                    elif find(other) != find(fill):
+                        groups[find(other)] = find(fill)
+
+        # Every piece that stopped growing is complete: give it a new label. If they all stopped,
+        # the largest keeps the old label; otherwise the one still growing does.
+        pieces: Dict[int, List[int]] = {}
+        for fill in range(count):
+            pieces.setdefault(find(fill), []).extend(visited[fill])
+        if not growing:
+            growing = {max(pieces, key=lambda root: len(pieces[root]))}
+        for root, cells in pieces.items():
+            if root in growing:
+                continue
+            new_label = self.next_region
+            self.next_region += 1
+            for cell in cells:
+                regions[cell] = new_label
+            self.region_sizes[new_label] = len(cells)
+            self.region_sizes[label] -= len(cells)
+
+# Heuristic for 4-directional movement: number of straight steps between two nodes
+def manhattan(node: GridNode, goal: GridNode) -> float:
+    """
+    Manhattan distance heuristic, admissible for up/down/left/right movement.
+
+    Arguments:
+        node (GridNode): The node being estimated.
+        goal (GridNode): The target node.
+
+    Returns:
+        float: The estimated remaining cost.
+    """
+    return abs(node[0] - goal[0]) + abs(node[1] - goal[1])
+
+# Heuristic for 8-directional movement: straight steps plus diagonal steps
+def octile(node: GridNode, goal: GridNode) -> float:
+    """
+    Octile distance heuristic, admissible when diagonal steps cost sqrt(2).
+
+    Arguments:
+        node (GridNode): The node being estimated.
+        goal (GridNode): The target node.
+
+    Returns:
+        float: The estimated remaining cost.
+    """
+    dx = abs(node[0] - goal[0])
+    dy = abs(node[1] - goal[1])
+    return max(dx, dy) + (DIAGONAL_COST - 1) * min(dx, dy)
+
+# Finds the cheapest path between two grid nodes with A*, using a binary heap as the open set
+def astar(tilemap: TileMap, start_node: GridNode, end_node: GridNode, heuristic: Heuristic = manhattan, diagonal: bool = False) -> Optional[List[GridNode]]:
+    """
+    Finds the cheapest path between two grid nodes using the A* algorithm,
+    weighting each step by the terrain cost of the cell stepped onto.
+
+    Arguments:
+        tilemap (TileMap): The map structure used to check walkability and costs.
+        start_node (GridNode): The starting (x, y) grid position.
+        end_node (GridNode): The target (x, y) grid position.
+        heuristic (Heuristic): Estimate of the remaining cost. Use manhattan for 4-directional and octile for diagonal movement.
+        diagonal (bool): Whether diagonal steps are allowed.
+
+    Returns:
+        Optional[List[GridNode]]: The path from start_node to end_node (both included), or None if no path exists.
+    """
+    if start_node == end_node:
+        return [start_node]
+    if not tilemap.is_walkable(start_node[0], start_node[1]) or \
+       not tilemap.is_walkable(end_node[0], end_node[1]):
+        return None
+    # Early unreachable check: different regions can never be connected, so don't flood the map looking
+    if tilemap.get_region(start_node) != tilemap.get_region(end_node):
+        return None
+
+    # Open set entries are (estimated total cost, estimated remaining cost, node); ties favour nodes closer to the goal
+    open_heap = [(heuristic(start_node, end_node), 0.0, start_node)]
+    # Cheapest known cost to reach each node, and the node we came from on that path
+    cost_so_far: Dict[GridNode, float] = {start_node: 0.0}
+    came_from: Dict[GridNode, Optional[GridNode]] = {start_node: None}
+    closed = set()
+
+    while open_heap:
+        _, _, current_node = heapq.heappop(open_heap)
+        if current_node == end_node:
+            return reconstruct_path(came_from, end_node)
+        if current_node in closed:
+            # Stale heap entry, a cheaper one was already expanded
+            continue
+        closed.add(current_node)
+
+        current_cost = cost_so_far[current_node]
+        for next_node, step_cost in tilemap.get_weighted_neighbors(current_node, diagonal):
+            new_cost = current_cost + step_cost
+            if new_cost < cost_so_far.get(next_node, math.inf):
+                cost_so_far[next_node] = new_cost
+                came_from[next_node] = current_node
+                remaining = heuristic(next_node, end_node)
+                heapq.heappush(open_heap, (new_cost + remaining, remaining, next_node))
+    # No path found
+    return None
+
+# Walks the came_from links back from the goal to rebuild a path
+def reconstruct_path(came_from: Dict[GridNode, Optional[GridNode]], end_node: GridNode) -> List[GridNode]:
+    """
+    Rebuilds a path from a search's came_from links.
+
+    Arguments:
+        came_from (Dict[GridNode, Optional[GridNode]]): {node: node we came from}, with the start mapped to None.
+        end_node (GridNode): The node to trace back from.
+
+    Returns:
+        List[GridNode]: The path from the start to end_node.
+    """
+    current = end_node
+    path: List[GridNode] = []
+    while current is not None:
+        path.append(current)
+        current = came_from[current]
+    return path[::-1] # Reverse path to go start -> end
+
+# Scans horizontally from a cell until hitting a wall, the goal, or a forced turn
+def _jump_horizontal(tilemap: TileMap, x: int, y: int, dx: int, end_node: GridNode) -> Optional[GridNode]:
+    """
+    Jumps along a row for jump point search.
+
+    Arguments:
+        tilemap (TileMap): The map to search.
+        x (int): The column to jump from.
+        y (int): The row to jump along.
+        dx (int): The direction, 1 (right) or -1 (left).
+        end_node (GridNode): The goal.
+
+    Returns:
+        Optional[GridNode]: The jump point found, or None if the row ends in a wall first.
+    """
+    walkable, width, height = tilemap.walkable, tilemap.width, tilemap.height
+    # Flat indexes of the start of this row and the rows above and below (-1 if off the map)
+    row = y * width
+    above = row - width if y > 0 else -1
+    below = row + width if y < height - 1 else -1
+    while True:
+        x += dx
+        if not (0 <= x < width and walkable[row + x]):
+            return None
+        if x == end_node[0] and y == end_node[1]:
+            return (x, y)
+        # A cell above or below that opens up right here can't be reached as cheaply by turning earlier
+        behind = x - dx
+        if above >= 0 and walkable[above + x] and not walkable[above + behind]:
+            return (x, y)
+        if below >= 0 and walkable[below + x] and not walkable[below + behind]:
+            return (x, y)
+
+# Scans vertically from a cell, checking both horizontal directions at every step
+def _jump_vertical(tilemap: TileMap, x: int, y: int, dy: int, end_node: GridNode) -> Optional[GridNode]:
+    """
+    Jumps along a column for jump point search.
+
+    Arguments:
+        tilemap (TileMap): The map to search.
+        x (int): The column to jump along.
+        y (int): The row to jump from.
+        dy (int): The direction, 1 (down) or -1 (up).
+        end_node (GridNode): The goal.
+
+    Returns:
+        Optional[GridNode]: The jump point found, or None if the column ends in a wall first.
+    """
+    walkable, width, height = tilemap.walkable, tilemap.width, tilemap.height
+    has_left, has_right = x > 0, x < width - 1
+    while True:
+        y += dy
+        if not (0 <= y < height and walkable[y * width + x]):
+            return None
+        if x == end_node[0] and y == end_node[1]:
+            return (x, y)
+        index, behind = y * width + x, (y - dy) * width + x
+        if has_left and walkable[index - 1] and not walkable[behind - 1]:
+            return (x, y)
+        if has_right and walkable[index + 1] and not walkable[behind + 1]:
+            return (x, y)
+        # Turning here is worth keeping if a row scan from here finds something
+        if _jump_horizontal(tilemap, x, y, 1, end_node) or _jump_horizontal(tilemap, x, y, -1, end_node):
+            return (x, y)
+
+# Finds a path with 4-directional jump point search (uniform costs only)
+def jump_point_search(tilemap: TileMap, start_node: GridNode, end_node: GridNode) -> Optional[List[GridNode]]:
+    """
+    Finds a shortest 4-directional path by only expanding jump points: cells where a path
+    has to turn. Runs of equivalent paths through open rooms are skipped instead of
+    being expanded cell by cell. Falls back to A* when the map has weighted cells.
+
+    Arguments:
+        tilemap (TileMap): The map to search.
+        start_node (GridNode): The (x, y) node the path starts from.
+        end_node (GridNode): The (x, y) node the path leads to.
+
+    Returns:
+        Optional[List[GridNode]]: The path from start_node to end_node as a list of nodes, or None if no path exists.
+    """
+    if not tilemap.is_uniform():
+        return astar(tilemap, start_node, end_node, manhattan)
+    if not tilemap.is_walkable(*start_node) or not tilemap.is_walkable(*end_node):
+        return None
+    if tilemap.get_region(start_node) != tilemap.get_region(end_node):
+        return None
+
+    is_walkable = tilemap.is_walkable
+    open_heap = [(manhattan(start_node, end_node), 0, start_node)]
+    came_from: Dict[GridNode, Optional[GridNode]] = {start_node: None}
+    cost_so_far: Dict[GridNode, float] = {start_node: 0}
+    while open_heap:
+        _, _, node = heapq.heappop(open_heap)
+        if node == end_node:
+            # Fill in the straight runs between jump points
+            jump_points = reconstruct_path(came_from, end_node)
+            path = [start_node]
+            for next_x, next_y in jump_points[1:]:
+                x, y = path[-1]
+                step_x, step_y = (next_x > x) - (next_x < x), (next_y > y) - (next_y < y)
+                while (x, y) != (next_x, next_y):
+                    x, y = x + step_x, y + step_y
+                    path.append((x, y))
+            return path
+
+        x, y = node
+        parent = came_from[node]
+        # Prune the directions a cheaper, canonical path would already cover
+        if parent is None:
+            directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+        elif parent[1] == y:
+            dx = 1 if x > parent[0] else -1
+            directions = [(dx, 0)]
+            for dy in (-1, 1):
+                if is_walkable(x, y + dy) and not is_walkable(x - dx, y + dy):
+                    directions.append((0, dy))
+        else:
+            dy = 1 if y > parent[1] else -1
+            directions = [(0, dy), (1, 0), (-1, 0)]
+
+        for dx, dy in directions:
+            if dx:
+                jump_point = _jump_horizontal(tilemap, x, y, dx, end_node)
+            else:
+                jump_point = _jump_vertical(tilemap, x, y, dy, end_node)
+            if jump_point is None:
+                continue
+            new_cost = cost_so_far[node] + abs(jump_point[0] - x) + abs(jump_point[1] - y)
+            if new_cost < cost_so_far.get(jump_point, math.inf):
+                cost_so_far[jump_point] = new_cost
+                came_from[jump_point] = node
+                remaining = manhattan(jump_point, end_node)
+                heapq.heappush(open_heap, (new_cost + remaining, remaining, jump_point))
+    # No path found
+    return None
+
+# Finds a path from the enemy grid to the player grid.
+def find_path(tilemap: TileMap, start_node: GridNode, end_node: GridNode) -> Optional[List[GridNode]]:
+    """
+    Finds the cheapest 4-directional path between two grid nodes with jump point search (which
+    runs A* instead on maps with weighted cells).
+
+    Arguments:
+        tilemap (TileMap): The map structure used to check walkability.
+        start_node (GridNode): The enemy's starting (x, y) grid position.
+        end_node (GridNode): The player's target (x, y) grid position.
+
+    Returns:
+        Optional[List[GridNode]]: The path from start_node to end_node as a list of nodes, or None if no path exists.
+    """
+    return jump_point_search(tilemap, start_node, end_node)
+
+# This class is for a flow field toward one target (the player), shared by every enemy chasing it
+class FlowField:
+    """
+    Stores, for every cell of the grid, the cost to reach a target cell and the next cell
+    to step onto to get there. It is built with one Dijkstra search outward from the target,
+    so any number of enemies can follow it by just reading their own cell. The field is only
+    rebuilt when the target moves to another cell. When terrain changes (e.g. an ice block
+    melts) the field repairs itself LPA*-style, only touching the cells whose cost changed.
+    """
+    def __init__(self, tilemap: TileMap):
+        """
+        Initializes an empty flow field for a tile map.
+
+        Arguments:
+            tilemap (TileMap): The map the field is built over.
+        """
+        self.tilemap = tilemap
+        size = tilemap.width * tilemap.height
+        # Cost to reach the target from each cell (infinity if unreachable)
+        self.distance = array('f', [math.inf]) * size
+        # One-step lookahead cost of each cell (LPA*'s rhs): equal to distance wherever the field is up to date
+        self.lookahead = array('f', [math.inf]) * size
+        # Index of the next cell toward the target for each cell (-1 if none)
+        self.next_index = array('i', [-1]) * size
+        # Target and map version the current field was built for
+        self.target: Optional[GridNode] = None
+        self.target_index = -1
+        self.version = -1
+        # Repair the field in place whenever a cell of the map changes
+        tilemap.add_listener(self.on_cell_changed)
+
+    # Rebuilds the field if the target cell or the terrain changed since the last build
+    def set_target(self, target: GridNode) -> bool:
+        """
+        Makes sure the field leads to the given target cell.
+
+        Arguments:
+            target (GridNode): The (x, y) cell to flow toward.
+
+        Returns:
+            bool: True if the field had to be rebuilt, False if it was already up to date.
+        """
+        if target == self.target and self.version == self.tilemap.version:
+            return False
+        self.target = target
+        self.version = self.tilemap.version
+        self.build(target)
+        return True
+
+    def build(self, target: GridNode):
+        """
+        Runs Dijkstra outward from the target. Stepping from a cell onto its neighbor
+        costs the neighbor's terrain cost, so the field avoids slippery ice and miasma too.
+
+        Arguments:
+            target (GridNode): The (x, y) cell to flow toward.
+        """
+        tilemap = self.tilemap
+        width, height = tilemap.width, tilemap.height
+        walkable, costs = tilemap.walkable, tilemap.costs
+        distance = self.distance
+        next_index = self.next_index
+        self.target_index = target[1] * width + target[0]
+        for index in range(width * height):
+            distance[index] = math.inf
+            next_index[index] = -1
+        if not tilemap.is_walkable(target[0], target[1]):
+            self.lookahead[:] = distance
+            return
+
+        target_index = target[1] * width + target[0]
+        distance[target_index] = 0.0
+        open_heap = [(0.0, target_index)]
+        while open_heap:
+            current_distance, index = heapq.heappop(open_heap)
+            if current_distance > distance[index]:
+                # Stale heap entry
+                continue
+            x, y = index % width, index // width
+            # Moving from a neighbor onto this cell costs this cell's terrain cost
+            step_cost = current_distance + costs[index]
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if 0 <= ny < height and 0 <= nx < width:
+                    neighbor = ny * width + nx
+                    if walkable[neighbor] and step_cost < distance[neighbor]:
+                        distance[neighbor] = step_cost
+                        next_index[neighbor] = index
+                        heapq.heappush(open_heap, (step_cost, neighbor))
+        # Every cell is consistent after a full build
+        self.lookahead[:] = distance
+
+    # Called by the tile map after a cell's walkability or cost changed
+    def on_cell_changed(self, x: int, y: int):
+        """
+        Repairs the field after one cell changed, if the field was up to date just before
+        the change. Otherwise it is already stale and will be rebuilt on the next query.
+
+        Arguments:
+            x (int): The grid column index of the changed cell.
+            y (int): The grid row index of the changed cell.
+        """
+        if self.target is None or self.version != self.tilemap.version - 1:
+            return
+        self.version = self.tilemap.version
+        if (x, y) == self.target:
+            # The target cell itself changed: every route ends there, so rebuild from scratch
+            self.build(self.target)
+            return
+        self.repair(y * self.tilemap.width + x)
+
+    def _neighbors(self, index: int) -> List[int]:
+        """
+        Returns the in-bounds 4-directional neighbors of a cell.
+
+        Arguments:
+            index (int): The cell's flat index.
+
+        Returns:
+            List[int]: The flat indexes of the neighboring cells.
+        """
+        width = self.tilemap.width
+        x, y = index % width, index // width
+        neighbors = []
+        if x > 0: neighbors.append(index - 1)
+        if x < width - 1: neighbors.append(index + 1)
+        if y > 0: neighbors.append(index - width)
+        if y < self.tilemap.height - 1: neighbors.append(index + width)
+        return neighbors
+
+    def _update_lookahead(self, index: int, open_heap: List[Tuple[float, int]]):
+        """
+        Recomputes a cell's one-step lookahead cost and queues it if it no longer matches its distance.
+
+        Arguments:
+            index (int): The cell's flat index.
+            open_heap (List[Tuple[float, int]]): The repair queue.
+        """
+        walkable, costs, distance = self.tilemap.walkable, self.tilemap.costs, self.distance
+        if index != self.target_index:
+            best = math.inf
+            if walkable[index]:
+                for neighbor in self._neighbors(index):
+                    if walkable[neighbor]:
+                        best = min(best, distance[neighbor] + costs[neighbor])
+            self.lookahead[index] = best
+        if distance[index] != self.lookahead[index]:
+            heapq.heappush(open_heap, (min(distance[index], self.lookahead[index]), index))
+
+    # Repairs only the part of the field affected by a changed cell (Lifelong Planning A* without a heuristic)
+    def repair(self, changed_index: int):
+        """
+        Restores the field after a cell's walkability or cost changed. Cells whose cost to the
+        target went down are lowered, cells that lost their route are raised and re-evaluated,
+        and only the cells that actually changed get a new next cell.
+
+        Arguments:
+            changed_index (int): The flat index of the changed cell.
+        """
+        walkable, costs = self.tilemap.walkable, self.tilemap.costs
+        distance, lookahead = self.distance, self.lookahead
+        open_heap: List[Tuple[float, int]] = []
+
+        # The changed cell's own lookahead and its neighbors' (which may step onto it) are affected
+        touched = {changed_index}
+        self._update_lookahead(changed_index, open_heap)
+        for neighbor in self._neighbors(changed_index):
+            self._update_lookahead(neighbor, open_heap)
+
+        # Cutting off a chokepoint can invalidate most of the field, and raising cells one by one
+        # costs more than a fresh build: past this many raised cells, just rebuild
+        raise_budget = len(distance) // 8
+        while open_heap:
+            key, index = heapq.heappop(open_heap)
+            current, best = distance[index], lookahead[index]
+            if current == best or key != min(current, best):
+                # Stale queue entry
+                continue
+            touched.add(index)
+            if current > best:
+                # Cheaper route found: settle it and offer it to the neighbors
+                distance[index] = best
+                step_cost = distance[index] + costs[index]
+                for neighbor in self._neighbors(index):
+                    if walkable[neighbor] and neighbor != self.target_index and step_cost < lookahead[neighbor]:
+                        lookahead[neighbor] = step_cost
+                        heapq.heappush(open_heap, (min(distance[neighbor], lookahead[neighbor]), neighbor))
+            else:
+                # Route got more expensive or was cut: forget it and re-evaluate this cell and its neighbors
+                raise_budget -= 1
+                if raise_budget < 0:
+                    self.build(self.target)
+                    return
+                distance[index] = math.inf
+                self._update_lookahead(index, open_heap)
+                for neighbor in self._neighbors(index):
+                    self._update_lookahead(neighbor, open_heap)
+
+        # Point the changed cells, and the cells around them, at their cheapest neighbor again
+        for index in list(touched):
+            touched.update(self._neighbors(index))
+        for index in touched:
+            self.next_index[index] = -1
+            if index == self.target_index or not walkable[index] or distance[index] == math.inf:
+                continue
+            best = math.inf
+            for neighbor in self._neighbors(index):
+                if walkable[neighbor] and distance[neighbor] + costs[neighbor] < best:
+                    best = distance[neighbor] + costs[neighbor]
+                    self.next_index[index] = neighbor
+
+    # Reads which cell to step onto next from a given cell
+    def get_next(self, node: GridNode, target: GridNode) -> Optional[GridNode]:
+        """
+        Returns the next cell on the cheapest route from a cell to the target.
+
+        Arguments:
+            node (GridNode): The (x, y) cell to start from.
+            target (GridNode): The (x, y) cell to reach.
+
+        Returns:
+            Optional[GridNode]: The next cell, the node itself if it already is the target, or None if the target can't be reached.
+        """
+        self.set_target(target)
+        if node == target:
+            return node
+        x, y = node
+        if not (0 <= y < self.tilemap.height and 0 <= x < self.tilemap.width):
+            return None
+        index = self.next_index[y * self.tilemap.width + x]
+        if index < 0:
+            return None
+        return (index % self.tilemap.width, index // self.tilemap.width)
+
+    # Reads the cost of the cheapest route from a given cell to the target
+    def get_distance(self, node: GridNode, target: GridNode) -> float:
+        """
+        Returns the cost of the cheapest route from a cell to the target.
+
+        Arguments:
+            node (GridNode): The (x, y) cell to start from.
+            target (GridNode): The (x, y) cell to reach.
+
+        Returns:
+            float: The route cost, or infinity if the target can't be reached.
+        """
+        self.set_target(target)
+        x, y = node
+        if not (0 <= y < self.tilemap.height and 0 <= x < self.tilemap.width):
+            return math.inf
+        return self.distance[y * self.tilemap.width + x]
+
+# This class is for a precomputed table of routes between every pair of cells, for small maps
+class DistanceOracle:
+    """
+    All-pairs route table for a small map: for every (from, to) pair of walkable cells it
+    stores the route cost and the direction of the first step, so chasing needs no search
+    at all at runtime. Built with one backward Dijkstra per walkable cell, which takes
+    too long for one frame, so the game builds it a few rows per frame (see build_some)
+    and caches it on disk keyed by the map's grids. Only valid for the map version it was
+    built at; callers fall back to searching until it is built, and after the terrain changes.
+    """
+    # Steps matching the stored direction codes
+    STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+    # Stored for unreachable pairs
+    NO_STEP = -1
+    UNREACHABLE = 0xFFFF
+    # File format marker, bumped if the layout ever changes
+    MAGIC = b'SOAO1'
+
+    def __init__(self, tilemap: TileMap):
+        """
+        Maps the walkable cells of a tile map to dense ids. The tables are filled by build() or load().
+
+        Arguments:
+            tilemap (TileMap): The map to answer queries for.
+        """
+        self.tilemap = tilemap
+        # Dense id of each walkable cell's flat index (-1 for blocked cells), and back
+        self.ids = array('i', [-1]) * (tilemap.width * tilemap.height)
+        self.cells = array('i')
+        for index, walkable in enumerate(tilemap.walkable):
+            if walkable:
+                self.ids[index] = len(self.cells)
+                self.cells.append(index)
+        count = len(self.cells)
+        # Row per destination, column per source: cost of the route, and direction code of its first step
+        self.distance = array('H', [self.UNREACHABLE]) * (count * count)
+        self.next_step = array('b', [self.NO_STEP]) * (count * count)
+        # Map version the tables describe (-1 until built or loaded)
+        self.version = -1
+        # The build in progress (see build_some), one step per table row
+        self.builder: Optional[Iterator[None]] = None
+
+    # Checks whether the map can be described by the table's 16-bit integer costs
+    def supports(self) -> bool:
+        """
+        Checks that every cell cost is a whole number and the longest possible route fits the table.
+
+        Returns:
+            bool: True if the oracle can be built for this map.
+        """
+        costs = self.tilemap.costs
+        return all(cost == int(cost) for cost in costs) and max(costs, default=0) * len(self.cells) < self.UNREACHABLE
+
+    def is_valid(self) -> bool:
+        """
+        Checks that the tables describe the map as it is now.
+
+        Returns:
+            bool: True if queries can be answered, False if the map changed since the tables were built.
+        """
+        return self.version == self.tilemap.version
+
+    # Fills the tables in one go
+    def build(self):
+        """Computes the route cost and first step between every pair of walkable cells."""
+        for _ in self.build_rows():
+            pass
+
+    # Fills the tables for a limited time, picking up where the last call stopped
+    def build_some(self, budget_us: int) -> bool:
+        """
+        Builds table rows until the time budget is spent or the tables are complete.
+
+        Arguments:
+            budget_us (int): Microseconds this call may spend.
+
+        Returns:
+            bool: True once the tables are complete, False if more calls are needed.
+        """
+        if self.builder is None:
+            self.builder = self.build_rows()
+        deadline = time.perf_counter_ns() + budget_us * 1000
+        for _ in self.builder:
+            if time.perf_counter_ns() >= deadline:
+                return False
+        return True
+
+    # Fills the tables, one backward Dijkstra per destination cell, yielding after each
+    def build_rows(self) -> Iterator[None]:
+        """
+        Computes the tables one destination row at a time. The tables describe the map
+        version current when the build started: if the terrain changes before it ends,
+        they are complete but not valid.
+
+        Yields:
+            None: After each row.
+        """
+        tilemap = self.tilemap
+        version = tilemap.version
+        width, height = tilemap.width, tilemap.height
+        costs, ids, cells = tilemap.costs, self.ids, self.cells
+        count = len(cells)
+        # Walkable neighbors of every cell as (neighbor id, direction code of the step from the neighbor to the cell)
+        neighbors: List[List[Tuple[int, int]]] = []
+        for index in cells:
+            x, y = index % width, index // width
+            cell_neighbors = []
+            for code, (dx, dy) in enumerate(self.STEPS):
+                nx, ny = x - dx, y - dy
+                if 0 <= nx < width and 0 <= ny < height and ids[ny * width + nx] >= 0:
+                    cell_neighbors.append((ids[ny * width + nx], code))
+            neighbors.append(cell_neighbors)
+        cell_costs = [int(costs[index]) for index in cells]
+
+        for target in range(count):
+            row = target * count
+            distance = [self.UNREACHABLE] * count
+            next_step = [self.NO_STEP] * count
+            distance[target] = 0
+            open_heap = [(0, target)]
+            while open_heap:
+                current_distance, cell = heapq.heappop(open_heap)
+                if current_distance > distance[cell]:
+                    continue
+                # Stepping from a neighbor onto this cell costs this cell's terrain cost
+                step_cost = current_distance + cell_costs[cell]
+                for neighbor, code in neighbors[cell]:
+                    if step_cost < distance[neighbor]:
+                        distance[neighbor] = step_cost
+                        next_step[neighbor] = code
+                        heapq.heappush(open_heap, (step_cost, neighbor))
+            self.distance[row:row + count] = array('H', distance)
+            self.next_step[row:row + count] = array('b', next_step)
+            yield
+        self.version = version
+
+    def get_cache_path(self, directory: str) -> str:
+        """
+        Names the cache file after a hash of the map's grids, so an edited map never loads another map's table.
+
+        Arguments:
+            directory (str): The folder holding cached tables.
+
+        Returns:
+            str: The path of this map's cache file.
+        """
+        digest = hashlib.sha1(bytes(self.tilemap.walkable) + self.tilemap.costs.tobytes())
+        digest.update(struct.pack('<ii', self.tilemap.width, self.tilemap.height))
+        return os.path.join(directory, f"oracle_{digest.hexdigest()}.bin")
+
+    # Writes the tables to disk
+    def save(self, path: str):
+        """
+        Saves the tables to a file.
+
+        Arguments:
+            path (str): The file to write.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(self.MAGIC + struct.pack('<i', len(self.cells)))
+            self.distance.tofile(file)
+            self.next_step.tofile(file)
+
+    # Reads the tables from disk, if they were saved for this exact map
+    def load(self, path: str) -> bool:
+        """
+        Loads the tables from a file written by save().
+
+        Arguments:
+            path (str): The file to read.
+
+        Returns:
+            bool: True if the tables were loaded, False if the file is missing or doesn't match this map.
+        """
+        count = len(self.cells)
+        try:
+            with open(path, 'rb') as file:
+                header = file.read(len(self.MAGIC) + 4)
+                if header != self.MAGIC + struct.pack('<i', count):
+                    return False
+                distance, next_step = array('H'), array('b')
+                distance.fromfile(file, count * count)
+                next_step.fromfile(file, count * count)
+        except (OSError, EOFError):
+            return False
+        self.distance, self.next_step = distance, next_step
+        self.version = self.tilemap.version
+        return True
+
+    # Writes the tables to the disk cache, if it can be written
+    def save_to_cache(self, directory: str) -> bool:
+        """
+        Saves the tables in the cache folder, for the next time this map is loaded.
+
+        Arguments:
+            directory (str): The folder holding cached tables.
+
+        Returns:
+            bool: True if they were saved, False if the folder can't be written to.
+        """
+        try:
+            self.save(self.get_cache_path(directory))
+        except OSError:
+            # Not fatal: the tables are simply built again the next time
+            return False
+        return True
+
+    # Reads the first step of the cheapest route between two cells
+    def get_next(self, node: GridNode, target: GridNode) -> Optional[GridNode]:
+        """
+        Returns the next cell on the cheapest route from a cell to a target, in O(1).
+
+        Arguments:
+            node (GridNode): The (x, y) cell to start from.
+            target (GridNode): The (x, y) cell to reach.
+
+        Returns:
+            Optional[GridNode]: The next cell, the node itself if it already is the target, or None if the target can't be reached.
+        """
+        source_id, target_id = self.get_id(node), self.get_id(target)
+        if source_id < 0 or target_id < 0:
+            return None
+        if source_id == target_id:
+            return node
+        code = self.next_step[target_id * len(self.cells) + source_id]
+        if code == self.NO_STEP:
+            return None
+        dx, dy = self.STEPS[code]
+        return (node[0] + dx, node[1] + dy)
+
+    # Reads the cost of the cheapest route between two cells
+    def get_distance(self, node: GridNode, target: GridNode) -> float:
+        """
+        Returns the cost of the cheapest route from a cell to a target, in O(1).
+
+        Arguments:
+            node (GridNode): The (x, y) cell to start from.
+            target (GridNode): The (x, y) cell to reach.
+
+        Returns:
+            float: The route cost, or infinity if the target can't be reached.
+        """
+        source_id, target_id = self.get_id(node), self.get_id(target)
+        if source_id < 0 or target_id < 0:
+            return math.inf
+        distance = self.distance[target_id * len(self.cells) + source_id]
+        return math.inf if distance == self.UNREACHABLE else float(distance)
+
+    def get_id(self, node: GridNode) -> int:
+        """
+        Returns a cell's dense id.
+
+        Arguments:
+            node (GridNode): The (x, y) grid coordinates.
+
+        Returns:
+            int: The cell's id, or -1 if it is out of bounds or wasn't walkable when the oracle was made.
+        """
+        x, y = node
+        if not (0 <= y < self.tilemap.height and 0 <= x < self.tilemap.width):
+            return -1
+        return self.ids[y * self.tilemap.width + x]
+
+# This class is for a distance-to-nearest-obstacle field, used to steer away from walls and check room for large sprites
+class ClearanceField:
+    """
+    Stores, for every cell, how far it is (in tiles, between cell centers) from the nearest
+    blocked cell or the map's edge. Blocked cells are 0 and cells touching one are 1. Built
+    with a two-pass chamfer distance transform, and rebuilt lazily when the terrain changes.
+    The field's gradient points away from nearby obstacles.
+    """
+    def __init__(self, tilemap: TileMap):
+        """
+        Initializes the field for a tile map. It is built on first use.
+
+        Arguments:
+            tilemap (TileMap): The map to measure.
+        """
+        self.tilemap = tilemap
+        self.clearance = array('f', [0.0]) * (tilemap.width * tilemap.height)
+        # Map version the field was built for
+        self.version = -1
+
+    # Runs the distance transform if the terrain changed since the last build
+    def refresh(self):
+        """Brings the field up to date with the tile map: a forward then a backward pass over the grid."""
+        if self.version == self.tilemap.version:
+            return
+        self.version = self.tilemap.version
+        width, height = self.tilemap.width, self.tilemap.height
+        walkable, clearance = self.tilemap.walkable, self.clearance
+        # Cells outside the map count as obstacles, one step beyond the edge
+        for y in range(height):
+            for x in range(width):
+                index = y * width + x
+                if not walkable[index]:
+                    clearance[index] = 0.0
+                    continue
+                best = min(x + 1, y + 1, width - x, height - y)
+                if x > 0:
+                    best = min(best, clearance[index - 1] + 1)
+                if y > 0:
+                    best = min(best, clearance[index - width] + 1)
+                    if x > 0:
+                        best = min(best, clearance[index - width - 1] + DIAGONAL_COST)
+                    if x < width - 1:
+                        best = min(best, clearance[index - width + 1] + DIAGONAL_COST)
+                clearance[index] = best
+        for y in range(height - 1, -1, -1):
+            for x in range(width - 1, -1, -1):
+                index = y * width + x
+                best = clearance[index]
+                if best == 0.0:
+                    continue
+                if x < width - 1:
+                    best = min(best, clearance[index + 1] + 1)
+                if y < height - 1:
+                    best = min(best, clearance[index + width] + 1)
+                    if x < width - 1:
+                        best = min(best, clearance[index + width + 1] + DIAGONAL_COST)
+                    if x > 0:
+                        best = min(best, clearance[index + width - 1] + DIAGONAL_COST)
+                clearance[index] = best
+
+    # Reads how far a cell is from the nearest obstacle
+    def get_clearance(self, node: GridNode) -> float:
+        """
+        Returns a cell's distance to the nearest obstacle.
+
+        Arguments:
+            node (GridNode): The (x, y) grid coordinates.
+
+        Returns:
+            float: The distance in tiles, 0 for blocked or out of bounds cells.
+        """
+        self.refresh()
+        x, y = node
+        if not (0 <= y < self.tilemap.height and 0 <= x < self.tilemap.width):
+            return 0.0
+        return self.clearance[y * self.tilemap.width + x]
+
+    # Checks whether a sprite of a given size fits when centered on a cell
+    def has_clearance(self, node: GridNode, radius: float) -> bool:
+        """
+        Checks whether a sprite centered on a cell stays clear of obstacles.
+
+        Arguments:
+            node (GridNode): The (x, y) grid coordinates.
+            radius (float): Half the sprite's size, in pixels.
+
+        Returns:
+            bool: True if the nearest obstacle's edge is at least radius pixels from the cell's center.
+        """
+        # The obstacle's edge is half a tile closer than its center
+        return (self.get_clearance(node) - 0.5) * TILESIZE >= radius
+
+    # Reads which way leads away from nearby obstacles
+    def get_gradient(self, node: GridNode) -> Tuple[float, float]:
+        """
+        Returns the field's gradient at a cell, from the clearance of its four neighbors.
+
+        Arguments:
+            node (GridNode): The (x, y) grid coordinates.
+
+        Returns:
+            Tuple[float, float]: The (x, y) direction clearance grows in, (0, 0) in open space or blocked cells.
+        """
+        x, y = node
+        if self.get_clearance(node) == 0.0:
+            return (0.0, 0.0)
+        return ((self.get_clearance((x + 1, y)) - self.get_clearance((x - 1, y))) / 2,
+                (self.get_clearance((x, y + 1)) - self.get_clearance((x, y - 1))) / 2)
+
+# This class is for reserving cells over time, so chasing enemies can plan around each other
+class ReservationTable:
+    """
+    Space-time reservation table for cooperative path finding (WHCA*). Time is counted in
+    ticks of RESERVATION_TICK_FRAMES frames, roughly the time an enemy takes to cross a tile.
+    Each planner reserves the (cell, tick) pairs of its next few moves, and the others
+    avoid them, including swapping places head-on in a corridor.
+    """
+    def __init__(self, tick_frames: int = RESERVATION_TICK_FRAMES):
+        """
+        Initializes an empty table at tick 0.
+
+        Arguments:
+            tick_frames (int): The number of frames in a tick.
+        """
+        self.tick_frames = tick_frames
+        self.frame = 0
+        self.tick = 0
+        # {(cell, tick): owner}, and the keys each owner holds
+        self.reserved: Dict[Tuple[GridNode, int], Hashable] = {}
+        self.owned: Dict[Hashable, List[Tuple[GridNode, int]]] = {}
+
+    # Moves time forward by a frame, forgetting reservations that are in the past
+    def advance(self):
+        """Counts a frame, and drops past reservations whenever a new tick starts."""
+        self.frame += 1
+        if self.frame % self.tick_frames:
+            return
+        self.tick += 1
+        for owner, keys in list(self.owned.items()):
+            keys = [key for key in keys if key[1] >= self.tick]
+            if keys:
+                self.owned[owner] = keys
+            else:
+                del self.owned[owner]
+        self.reserved = {key: owner for key, owner in self.reserved.items() if key[1] >= self.tick}
+
+    # Reserves a planned route from the current tick on
+    def reserve(self, owner: Hashable, path: List[GridNode]):
+        """
+        Reserves each cell of a path for the tick it will be reached at, path[0] being the current tick.
+
+        Arguments:
+            owner (Hashable): The planner (e.g. the enemy).
+            path (List[GridNode]): The planned cells, one per tick (repeated cells mean waiting).
+        """
+        keys = self.owned.setdefault(owner, [])
+        for offset, cell in enumerate(path):
+            key = (cell, self.tick + offset)
+            if key not in self.reserved:
+                self.reserved[key] = owner
+                keys.append(key)
+
+    # Frees everything an owner reserved, before it plans again or when it dies
+    def release(self, owner: Hashable):
+        """
+        Drops all of an owner's reservations.
+
+        Arguments:
+            owner (Hashable): The planner whose reservations to drop.
+        """
+        for key in self.owned.pop(owner, ()):
+            if self.reserved.get(key) is owner:
+                del self.reserved[key]
+
+    # Checks whether a planner may step (or wait) from one cell to another between two ticks
+    def can_move(self, cell: GridNode, next_cell: GridNode, tick: int, owner: Hashable) -> bool:
+        """
+        Checks that a move from cell at tick to next_cell at tick + 1 doesn't run into another planner.
+
+        Arguments:
+            cell (GridNode): The (x, y) cell moved from.
+            next_cell (GridNode): The (x, y) cell moved to (the same cell when waiting).
+            tick (int): The tick the move starts at.
+            owner (Hashable): The planner moving.
+
+        Returns:
+            bool: True if next_cell is free at tick + 1 and nobody swaps places with the planner, False otherwise.
+        """
+        other = self.reserved.get((next_cell, tick + 1), owner)
+        if other is not owner:
+            return False
+        # Two planners can't pass through each other head-on
+        other = self.reserved.get((next_cell, tick))
+        return other is None or other is owner or self.reserved.get((cell, tick + 1)) is not other
+
+# Plans a few moves ahead around other planners' reservations (windowed hierarchical cooperative A*)
+def cooperative_astar(tilemap: TileMap, start_node: GridNode, end_node: GridNode, reservations: ReservationTable,
+                      owner: Hashable, heuristic: Callable[[GridNode], float], window: int = COOPERATIVE_WINDOW) -> List[GridNode]:
+    """
+    Searches over (cell, tick) states for the next window moves toward a goal, allowing waits and
+    avoiding the moves other planners reserved. The heuristic should be the true route cost to the
+    goal ignoring other planners (e.g. a flow field's distance), which keeps the short search
+    pointed the right way beyond its window.
+
+    Arguments:
+        tilemap (TileMap): The map to search.
+        start_node (GridNode): The (x, y) cell the planner is on now.
+        end_node (GridNode): The (x, y) cell to reach.
+        reservations (ReservationTable): The moves reserved so far.
+        owner (Hashable): The planner, whose own reservations are ignored.
+        heuristic (Callable[[GridNode], float]): The remaining route cost from a cell to end_node.
+        window (int): The number of ticks to plan ahead.
+
+    Returns:
+        List[GridNode]: The planned cells from start_node, one per tick (repeated cells mean waiting).
+        Just [start_node] if every move is blocked.
+    """
+    start_tick = reservations.tick
+    # Entries are (estimated cost, -depth, cell): deeper states win ties, so the search commits to a route
+    open_heap = [(heuristic(start_node), 0, start_node)]
+    came_from: Dict[Tuple[GridNode, int], Optional[Tuple[GridNode, int]]] = {(start_node, 0): None}
+    cost_so_far: Dict[Tuple[GridNode, int], float] = {(start_node, 0): 0.0}
+    closed = set()
+    while open_heap:
+        _, negative_depth, node = heapq.heappop(open_heap)
+        depth = -negative_depth
+        if node == end_node or depth == window:
+            # Rebuild the space-time path
+            state = (node, depth)
+            path: List[GridNode] = []
+            while state is not None:
+                path.append(state[0])
+                state = came_from[state]
+            return path[::-1]
+        if (node, depth) in closed:
+            # Stale heap entry, a cheaper one for the same cell and tick was already expanded
+            continue
+        closed.add((node, depth))
+        current_cost = cost_so_far[(node, depth)]
+        moves = [(neighbor, tilemap.get_cost(*neighbor)) for neighbor in tilemap.get_neighbors(node)]
+        moves.append((node, PATH_COST_DEFAULT)) # waiting costs like a plain step
+        for next_node, step_cost in moves:
+            if not reservations.can_move(node, next_node, start_tick + depth, owner):
+                continue
+            remaining = heuristic(next_node)
+            if remaining == math.inf:
+                continue
+            state = (next_node, depth + 1)
+            if state in closed:
+                continue
+            new_cost = current_cost + step_cost
+            if new_cost < cost_so_far.get(state, math.inf):
+                cost_so_far[state] = new_cost
+                came_from[state] = (node, depth)
+                heapq.heappush(open_heap, (new_cost + remaining, -(depth + 1), next_node))
+    # Boxed in for now: stay put
+    return [start_node]
@@ -3,15 +3,14 @@
 ## Imports
 import pygame # our game-centeric Python module and GUI class for dealing with visual elements.
 from config import * # configuration file with all out settings and constants.
+from collision import * # spatial hash used for broadphase collision queries.
+from pathfinding import * # stage grid and path finding algorithms used by enemies.
+from events import * # names of the gameplay events published on the game's event bus.
 import math # used to calculate things like floors and cielings.
 import random # used to create randomized enemy path roaming
 import time # used to capture time to control flow of various events.
 from typing import List, Tuple, Dict, Optional # used for more efficient type hinting
-from collections import deque # used to import deque, which we will use for our BFS and path finding.
-
-## Global variables
-# Represents a coordinate on the grid (x_index, y_index)
-GridNode = Tuple[int, int]
+from array import array # used for the typed, parallel arrays of the projectile system and the enemy store.
 
 #This class represent all spritesheets of the game and the different associated methods of getting and cutting them from their image files
 class Spritesheet:
@@ -28,6 +27,7 @@ class Spritesheet:
             file (str): The file path to the spritesheet image.
         """
         self.sheet = pygame.image.load(file).convert_alpha() # Get the img file
+        self.tiles: Dict[Tuple, pygame.Surface] = {} # Cutouts shared between tiles, see get_tile
 
     # create a cutout from the sprites image
     def get_sprite(self, x: int, y: int, width: int, height: int) -> pygame.Surface:
@@ -46,6 +46,32 @@ class Spritesheet:
         sprite = pygame.Surface([width, height], pygame.SRCALPHA)
         sprite.blit(self.sheet, (0,0), (x, y, width, height))
         return sprite
+
+    # get a cutout shared by every tile that uses it, cut (and scaled) only the first time
+    def get_tile(self, x: int, y: int, width: int, height: int, scale: Optional[Tuple[int, int]] = None) -> pygame.Surface:
+        """
+        Returns a cached cutout of the spritesheet, optionally scaled. The same Surface is
+        handed to every caller asking for the same cutout, so it must not be modified
+        (e.g. with set_alpha); use get_sprite for images a sprite changes.
+
+        Arguments:
+            x (int): The starting X-coordinate for the cutout.
+            y (int): The starting Y-coordinate for the cutout.
+            width (int): The width of the sprite to cut out.
+            height (int): The height of the sprite to cut out.
+            scale (Optional[Tuple[int, int]]): The size to scale the cutout to, if any.
+
+        Returns:
+            pygame.Surface: The shared Surface for this cutout.
+        """
+        key = (x, y, width, height, scale)
+        tile = self.tiles.get(key)
+        if tile is None:
+            tile = self.get_sprite(x, y, width, height)
+            if scale is not None:
+                tile = pygame.transform.scale(tile, scale)
+            self.tiles[key] = tile
+        return tile
 #This class represent the player's sprite, and how they are updated throughout gameplay
 class Player(pygame.sprite.Sprite):
     """
@@ -63,7 +89,7 @@ class Player(pygame.sprite.Sprite):
         """
         self.game = game
         self._layer = PLAYER_LAYER # Control which layer on the screen the sprite is on
-        self.groups = self.game.all_sprites, self.game.players # Add sprite to these groups
+        self.groups = self.game.all_sprites, self.game.active_sprites, self.game.players # Add sprite to these groups
         pygame.sprite.Sprite.__init__(self,self.groups)
 
         # Sprite sizing relative to game's tile size
@@ -98,7 +124,6 @@ class Player(pygame.sprite.Sprite):
         self.max_mana = PLAYER_MAX_MANA
         # Invincibility frames
         self.invincible = False
-        self.invincible_timer = 0
         self.flicker_timer = 0
         self.is_shielded = False
         # Teleportation
@@ -118,9 +143,14 @@ class Player(pygame.sprite.Sprite):
         self.all_open = False # unlocked all switches in current stage
         self.all_clear = False # cleared all stages
         self.stages_locked = [False, True, True, True, True] # Portal 1, portal 2, etc.
+        self.tile_span = None # cells covered by the hitbox, as (first_x, first_y, last_x, last_y); announced on the event bus when it changes
         self.current_stage = 0 # 0:tower, 1: stage 1, etc.
         self.stage_changed = False
-        self.last_miasma_damage = pygame.time.get_ticks()
+        # Miasma only hurts once per MIASMA_DAMAGE_COOLDOWN, starting one cooldown after the player appears
+        self.miasma_cooldown = True
+        self.game.timers.schedule(MIASMA_DAMAGE_COOLDOWN, self.end_miasma_cooldown)
+        # Categorized collision candidates around the player, refreshed with one spatial hash query per frame
+        self.collision_hits = self.game.query_collisions(self.rect)
 
         # Create lists of each animation, get and store its associated sprites within
         # Walking
@@ -349,7 +379,6 @@ class Player(pygame.sprite.Sprite):
         self.max_mana = PLAYER_MAX_MANA
         # Invincibility frames
         self.invincible = False
-        self.invincible_timer = 0
         self.flicker_timer = 0
         # Teleportation
         self.teleporting = False
@@ -372,10 +401,12 @@ class Player(pygame.sprite.Sprite):
     def update(self):
         """
         Updates the player's state every frame. Handles teleportation logic, 
-        movement, collision checks, invincibility timers, flickering effects,
+        movement, collision checks, flickering effects,
         and mana regeneration/drain.
         """
         self.is_moving = False
+        # One broadphase lookup per frame: everything the player could touch while moving this frame, sorted by category
+        self.collision_hits = self.game.query_collisions(self.rect)
         # Check if we are currently teleporting
         if self.teleporting:
             # Calculate the direction vector for the teleport
@@ -391,20 +422,6 @@ class Player(pygame.sprite.Sprite):
                 # End teleport when close enough to the target
                 self.x_change = dx
                 self.y_change = dy
-                # Fix camera on collision
-                match self.facing:
-                        case 'left':
-                            for sprite in self.game.all_sprites:
-                                sprite.rect.x += TELEPORT_DISTANCE
-                        case 'up':
-                            for sprite in self.game.all_sprites:
-                                sprite.rect.y += TELEPORT_DISTANCE
-                        case 'right':
-                            for sprite in self.game.all_sprites:
-                                sprite.rect.x -= TELEPORT_DISTANCE
-                        case 'down':
-                            for sprite in self.game.all_sprites:
-                                sprite.rect.y -= TELEPORT_DISTANCE
                 self.teleporting = False
                 self.invulnerable = False
             self.is_moving = True
@@ -414,21 +431,19 @@ class Player(pygame.sprite.Sprite):
 
         self.animate() # Call the animate method to change sprites for animation effect.
 
-        # Handle invincibility timer
-        now = pygame.time.get_ticks()
-        if self.invincible and now - self.invincible_timer > PLAYER_IFRAME_TIME:
-            self.invincible = False
-            self.image.set_alpha(255) # If enough time passed, make the sprite fully visible again
-
-        # Reflect any change in coordinates, correct for collision, then reset the change values if player is still alive.
+        # Move by any change in coordinates, stopping at obstacles, then reset the change values if player is still alive.
         if not self.is_dead:
-            self.rect.x += self.x_change
             self.collide_obstacles('x')
             self.collide_enemy()
-            self.rect.y += self.y_change
             self.collide_obstacles('y')
+            self.collide_hazards()
             self.x_change = 0
             self.y_change = 0
+            # Let anything waiting for the player (e.g. portals) know when its hitbox moves onto different cells
+            span = self.game.spatial_hash.get_span(self.rect)
+            if span != self.tile_span:
+                self.tile_span = span
+                self.game.event_bus.publish(PLAYER_ENTERED_TILE, self, span)
 
         # Induce flicker effect for invincibility frames
         if self.invincible:
@@ -466,15 +481,15 @@ class Player(pygame.sprite.Sprite):
     # Method for player sprite movement. Returns bool if player is currently moving.
     def movement(self) -> bool:
         """
-        Handles player input for movement. Applies world scrolling (by moving 
-        all sprites) and updates directional state. Adjusts speed based on 
+        Handles player input for movement, recording the x/y change for update() 
+        to apply, and updates directional state. Adjusts speed based on 
         Shift key (boost) or terrain (slippery ice).
 
         Returns:
             bool: True if the player is currently pressing a movement key, False otherwise.
         """
         keys = pygame.key.get_pressed() # Capture keys that have ben pressed so far.
-        slip_hits = pygame.sprite.spritecollide(self, self.game.slippery_ice, False)
+        slip_hits = overlapping(self.rect, self.collision_hits['slippery'])
 
         # if standing on slippery ice, boost speed
         if slip_hits:
@@ -485,26 +500,18 @@ class Player(pygame.sprite.Sprite):
         
         # Increase/Decrease the x/y coordinates and sprite-facing depending on key pressed: Left, Up, Right, Down.
         if keys[pygame.K_LEFT]:
-            for sprite in self.game.all_sprites:
-                sprite.rect.x += self.speed
             self.x_change -= self.speed
             self.facing = 'left' 
             return True
         if keys[pygame.K_UP]:
-            for sprite in self.game.all_sprites:
-                sprite.rect.y += self.speed
             self.y_change -= self.speed
             self.facing = 'up'
             return True
         if keys[pygame.K_RIGHT]:
-            for sprite in self.game.all_sprites:
-                sprite.rect.x -= self.speed
             self.x_change += self.speed
             self.facing = 'right'
             return True
         if keys[pygame.K_DOWN]:
-            for sprite in self.game.all_sprites:
-                sprite.rect.y -= self.speed
             self.y_change += self.speed
             self.facing = 'down'
             return True
@@ -512,12 +519,13 @@ class Player(pygame.sprite.Sprite):
         # Player is currently not moving.
         return False
 
-    # Method for player sprite's collision detection w/ obstacle (e.g. block), depending on direction of collision. Returns True if collision occurs.
+    # Method for moving the player along one axis and stopping at obstacles (e.g. block). Returns True if collision occurs.
     def collide_obstacles(self, direction: str) -> bool:
         """
-        Checks for player collision with solid objects (Walls, Blocks, Holes, Doors, Geo).
-        Corrects player position and world scroll to prevent clipping. Also handles
-        miasma damage if not shielded.
+        Moves the player along one axis by this frame's x/y change, sweeping its hitbox
+        against solid objects (Walls, Blocks, Holes, Doors, Geo) so that even large steps
+        (sliding, teleporting, skipped frames) stop at the first obstacle instead of
+        passing through it. Uses the categorized candidates gathered once per frame in update().
 
         Arguments:
             direction (str): The axis of movement being checked ('x' or 'y').
@@ -525,157 +533,78 @@ class Player(pygame.sprite.Sprite):
         Returns:
             bool: True if a collision with a solid obstacle occurred, False otherwise.
         """
-        # checks if rectangle of one sprite is colliding with rectangle of another.
-        hits_block = pygame.sprite.spritecollide(self, self.game.blocks, False)
-        hits_door = pygame.sprite.spritecollide(self, self.game.doors, False)
-        geos_hits = pygame.sprite.spritecollide(self, self.game.ice_blocks, False)       
-        waters_hits = pygame.sprite.spritecollide(self, self.game.waters, False) 
-        miasma_hits = pygame.sprite.spritecollide(self, self.game.miasmas, False)
+        step = self.x_change if direction == "x" else self.y_change
+        dx, dy = (step, 0) if direction == "x" else (0, step)
+        if step == 0:
+            return False
+
+        hits = self.collision_hits
+        if abs(step) > COLLISION_QUERY_MARGIN:
+            # Steps longer than the query margin need a fresh lookup covering the whole swept area
+            hits = self.game.query_collisions(self.rect.union(self.rect.move(round(dx), round(dy))))
+        # Obstacles that stop the player, in priority order for simultaneous hits
+        obstacles = hits['solid'] + hits['water'] + hits['door'] + hits['ice']
+        if not self.invulnerable:
+            # If not teleporting, check for holes too
+            obstacles += hits['hole']
+
+        # Find the first obstacle along the way
+        time_of_impact, normal, obstacle = sweep(self.rect, dx, dy, obstacles)
+
+        if obstacle is None:
+            # Nothing in the way, take the full step
+            self.rect.x += dx
+            self.rect.y += dy
+            return False
+
+        if obstacle in self.game.doors and not obstacle.locked:
+            # If the door is unlocked on collide, clear the stage (Win!)
+            self.game.event_bus.publish(STAGE_CLEARED, self.current_stage)
+            return True
+
+        # Stop flush against the face of the obstacle that was hit
+        if normal[0] < 0:
+            self.rect.right = obstacle.rect.left
+        elif normal[0] > 0:
+            self.rect.left = obstacle.rect.right
+        elif normal[1] < 0:
+            self.rect.bottom = obstacle.rect.top
+        elif normal[1] > 0:
+            self.rect.top = obstacle.rect.bottom
+        if direction == "y":
+            self.teleporting = False
+        return True
+
+    # Method for player sprite's contact with hazards (e.g. miasma). Run once per frame after movement is resolved.
+    def collide_hazards(self):
+        """
+        Applies miasma damage (at most once per second) if the player is touching a hazard and is not shielded.
+        """
+        miasma_hits = overlapping(self.rect, self.collision_hits['hazard'])
         
         # If player contacts miasma and is not shielded
         if miasma_hits and not self.is_shielded:            
-            # Check if one second has passed since the last miasma damage
-            now = pygame.time.get_ticks()
-            # If more than 1 sec has passed since last dmg, incur damage
-            if now - self.last_miasma_damage > 1000:
+            # If the cooldown since the last miasma damage is over, incur damage and start it again
+            if not self.miasma_cooldown:
                 self.health -= MIASAMA_DAMAGE
-                self.last_miasma_damage = now
+                self.miasma_cooldown = True
+                self.game.timers.schedule(MIASMA_DAMAGE_COOLDOWN, self.end_miasma_cooldown)
                 self.game.sfxs['player_hit'].play()
                 if self.health <= 0:
                     self.game.sfxs['player_death'].play()
                     self.is_dead = True
 
-        if direction == "x":
-                if not self.invulnerable:
-                    # If not teleporting, check for holes too
-                    hits_block.extend(pygame.sprite.spritecollide(self, self.game.holes, False))
-
-                if hits_block:
-                     # An obstacle has been collided with, and hits[0] is that obstacle. 
-                     # If sprite is moving right, correct to left (while keeping the camera still)
-                    if self.x_change > 0:
-                        self.rect.x = hits_block[0].rect.left - self.rect.width
-                        for sprite in self.game.all_sprites:
-                            sprite.rect.x += self.speed
-                    # If sprite is moving left, correct to right
-                    if self.x_change < 0:
-                        self.rect.x = hits_block[0].rect.right 
-                        for sprite in self.game.all_sprites:
-                            sprite.rect.x -= self.speed
-                    return True
-                elif waters_hits:
-                     # An obstacle has been collided with, and hits[0] is that obstacle. 
-                     # If sprite is moving right, correct to left (while keeping the camera still)
-                    if self.x_change > 0:
-                        self.rect.x = waters_hits[0].rect.left - self.rect.width
-                        for sprite in self.game.all_sprites:
-                            sprite.rect.x += self.speed
-                    # If sprite is moving left, correct to right
-                    if self.x_change < 0:
-                        self.rect.x = waters_hits[0].rect.right 
-                        for sprite in self.game.all_sprites:
-                            sprite.rect.x -= self.speed
-                    return True
-                elif hits_door:
-                    # A door has been collided with. 
-                    if self.all_open:
-                        # If it is unlocked on collide, clear the stage (Win!)
-                        self.game.stage_clear()
-                    else:
-                        # Door is locked, treat it like an obstacle.
-                        # If sprite is moving right, correct to left (while keeping the camera still)
-                        if self.x_change > 0:
-                            self.rect.x = hits_door[0].rect.left - self.rect.width
-                            for sprite in self.game.all_sprites:
-                                sprite.rect.x += self.speed
-                        # If sprite is moving left, correct to right
-                        if self.x_change < 0:
-                            self.rect.x = hits_door[0].rect.right 
-                            for sprite in self.game.all_sprites:
-                                sprite.rect.x -= self.speed
-                    return True
-                elif geos_hits:
-                    # An obstacle has been collided with, and hits[0] is that obstacle. 
-                    # If sprite is moving right, correct to left (while keeping the camera still)
-                    if self.x_change > 0:
-                        self.rect.x = geos_hits[0].rect.left - self.rect.width
-                        for sprite in self.game.all_sprites:
-                            sprite.rect.x += self.speed
-                    # If sprite is moving left, correct to right
-                    if self.x_change < 0:
-                        self.rect.x = geos_hits[0].rect.right 
-                        for sprite in self.game.all_sprites:
-                            sprite.rect.x -= self.speed
-                    return True
-                else:
-                    return False        
-        elif direction == "y":
-                if not self.invulnerable:
-                    # If not teleporting, check for holes too
-                    hits_block.extend(pygame.sprite.spritecollide(self, self.game.holes, False))
-                if hits_block:
-                    # An obstacle has been collided with, and hits[0] is that obstacle
-                    # If sprite is moving down, correct to up
-                    if self.y_change > 0:
-                        self.rect.y = hits_block[0].rect.top - self.rect.height
-                        for sprite in self.game.all_sprites:
-                            sprite.rect.y += self.speed
-                    # If sprite is moving up, correct to down
-                    if self.y_change < 0:
-                        self.rect.y = hits_block[0].rect.bottom
-                        for sprite in self.game.all_sprites:
-                            sprite.rect.y -= self.speed
-                    self.teleporting = False
-                    return True
-                elif waters_hits:
-                     # An obstacle has been collided with, and hits[0] is that obstacle
-                    # If sprite is moving down, correct to up
-                    if self.y_change > 0:
-                        self.rect.y = waters_hits[0].rect.top - self.rect.height
-                        for sprite in self.game.all_sprites:
-                            sprite.rect.y += self.speed
-                    # If sprite is moving up, correct to down
-                    if self.y_change < 0:
-                        self.rect.y = waters_hits[0].rect.bottom
-                        for sprite in self.game.all_sprites:
-                            sprite.rect.y -= self.speed
-                    self.teleporting = False
-                    return True
-                elif geos_hits:
-                    # An ice block has been collided with, and hits[0] is that block
-                    # If sprite is moving down, correct to up
-                    if self.y_change > 0:
-                        self.rect.y = geos_hits[0].rect.top - self.rect.height
-                        for sprite in self.game.all_sprites:
-                            sprite.rect.y += self.speed
-                    # If sprite is moving up, correct to down
-                    if self.y_change < 0:
-                        self.rect.y = geos_hits[0].rect.bottom
-                        for sprite in self.game.all_sprites:
-                            sprite.rect.y -= self.speed
-                    self.teleporting = False
-                    return True
-                elif hits_door:
-                    # A door has been collided with. 
-                    if self.all_open:
-                        # If it is unlocked on collide, clear the stage (Win!)
-                        self.game.stage_clear()
-                    else:
-                        # Door is locked, treat it like an obstacle.
-                        # If sprite is moving right, correct to left (while keeping the camera still)
-                        if self.y_change > 0:
-                            self.rect.y = hits_door[0].rect.top - self.rect.height
-                            for sprite in self.game.all_sprites:
-                                sprite.rect.y += self.speed
-                        # If sprite is moving up, correct to down
-                        if self.y_change < 0:
-                            self.rect.y = hits_door[0].rect.bottom
-                            for sprite in self.game.all_sprites:
-                                sprite.rect.y -= self.speed
-                    return True
-                else:
-                    return False
-        
+    # Lets miasma hurt the player again; run by the timer service
+    def end_miasma_cooldown(self):
+        """Ends the cooldown between two miasma hits."""
+        self.miasma_cooldown = False
+
+    # Ends the player's invincibility frames; run by the timer service PLAYER_IFRAME_TIME after a hit
+    def end_iframes(self):
+        """Ends the player's invincibility and makes the sprite fully visible again."""
+        self.invincible = False
+        self.image.set_alpha(255)
+
     # Method for player sprite's collision detection w/ enemies. Returns True if valid enemy collision occurs.
     def collide_enemy(self):
         """
@@ -688,15 +617,15 @@ class Player(pygame.sprite.Sprite):
         # Ignore the collision and don't take damage if invincible or invulnerable (teleporting)
         if self.invincible or self.invulnerable or self.is_shielded:
             return False
-        # checks if rectangle of one sprite is colliding with rectangle of another.
-        hits = pygame.sprite.spritecollide(self, self.game.enemies, False)
+        # checks if rectangle of one sprite is colliding with rectangle of another, narrowing down this frame's enemy candidates.
+        hits = overlapping(self.rect, self.collision_hits['enemy'])
         if hits:
             # An enemy has been collided with while not invincible. Take damage.
             self.health -= ENEMY_COLLISION_DAMAGE
             self.game.sfxs['player_hit'].play()
-            # Set invincibility and start the timer
+            # Set invincibility and have the timer service end it
             self.invincible = True
-            self.invincible_timer = pygame.time.get_ticks()
+            self.game.timers.schedule(PLAYER_IFRAME_TIME, self.end_iframes)
             if self.health <= 0:
                 self.game.sfxs['player_death'].play()
                 self.is_dead = True
@@ -915,6 +844,185 @@ class Player(pygame.sprite.Sprite):
         self.teleport_target_x = target_x
         self.teleport_target_y = target_y
 
+# This class holds the hot state of every enemy in parallel arrays, and runs the per-frame logic that applies to all of them at once
+class EnemyStore:
+    """
+    Keeps the state every enemy touches each frame in parallel typed arrays (struct of
+    arrays), indexed by a slot each enemy holds: velocity, health, invincibility,
+    facing, animation position and threat level, plus the patrol state (start
+    point, squared travel radius, turn timer) and the distance checks against the
+    player. Enemy sprites read and write their slot through properties; their
+    position stays in their rect, which collisions resolve against. Logic that
+    applies to every enemy runs here in one pass per frame: distances to the player,
+    aggro range checks and patrol decisions. Invincibility frames are ended by the
+    game's timer service, so only the enemies whose frames run out cost anything.
+    """
+    # Facings, as stored in the heading array
+    DIRECTIONS = ('left', 'right', 'up', 'down')
+    HEADINGS = {direction: index for index, direction in enumerate(DIRECTIONS)}
+
+    def __init__(self, timers: 'TimerService'):
+        """
+        Initializes an empty store.
+
+        Arguments:
+            timers (TimerService): The game's timer service, used to end invincibility frames.
+        """
+        self.timers = timers
+        # Active enemies are kept packed in slots [0, count); sprites[slot] is the enemy in a slot
+        self.sprites: List[pygame.sprite.Sprite] = []
+        self.vx = array('f') # movement this frame (the sprite's x_change/y_change)
+        self.vy = array('f')
+        self.health = array('i')
+        self.threat_level = array('b') # 1 for simple enemies, 2 for elites
+        self.invincible = bytearray() # 1 while the enemy has invincibility frames
+        self.heading = array('b') # facing, as an index into DIRECTIONS
+        self.animation = array('f') # animation loop position
+        self.start_x = array('i')
+        self.start_y = array('i')
+        self.radius_squared = array('i') # squared distance from the start beyond which the enemy heads back
+        self.turn_timer = array('i') # frames left before the next random facing
+        self.distance_squared = array('q') # squared distance between the enemy's and the player's centers, on the last steer
+        self.in_range = bytearray() # 1 if the player was within ENEMY_AGGRO_DISTANCE on the last steer
+        # Every per-slot column, moved together when a slot is freed
+        self.columns = (self.sprites, self.vx, self.vy, self.health, self.threat_level, self.invincible,
+                        self.heading, self.animation, self.start_x, self.start_y,
+                        self.radius_squared, self.turn_timer, self.distance_squared, self.in_range)
+
+    # Removes every enemy, e.g. when a new stage is loaded
+    def clear(self):
+        """Removes all enemies from the store."""
+        for column in self.columns:
+            del column[:]
+
+    # Adds an enemy, starting from where it stands
+    def add(self, sprite: pygame.sprite.Sprite, facing: str, threat_level: int, health: int, travel_pixels: int) -> int:
+        """
+        Adds an enemy to the store. Its current position becomes its patrol start point.
+
+        Arguments:
+            sprite (pygame.sprite.Sprite): The enemy, with its rect already placed.
+            facing (str): The direction it starts facing ('left', 'right', 'up' or 'down').
+            threat_level (int): 1 for simple enemies, 2 for elites.
+            health (int): Its starting health.
+            travel_pixels (int): How far it may wander from its start before heading back.
+
+        Returns:
+            int: The enemy's slot.
+        """
+        self.sprites.append(sprite)
+        self.vx.append(0.0)
+        self.vy.append(0.0)
+        self.health.append(health)
+        self.threat_level.append(threat_level)
+        self.invincible.append(0)
+        self.heading.append(self.HEADINGS[facing])
+        self.animation.append(1.0)
+        self.start_x.append(sprite.rect.x)
+        self.start_y.append(sprite.rect.y)
+        self.radius_squared.append(travel_pixels * travel_pixels)
+        self.turn_timer.append(ENEMY_PATROL_TURN_FRAMES)
+        self.distance_squared.append(0)
+        self.in_range.append(0)
+        return len(self.sprites) - 1
+
+    # Removes an enemy by moving the last one into its slot
+    def remove(self, sprite: pygame.sprite.Sprite):
+        """
+        Removes an enemy from the store, keeping the others packed. Does nothing if it isn't in the store.
+
+        Arguments:
+            sprite (pygame.sprite.Sprite): The enemy to remove.
+        """
+        slot = sprite.store_slot
+        if slot >= len(self.sprites) or self.sprites[slot] is not sprite:
+            return
+        for column in self.columns:
+            column[slot] = column[-1]
+            column.pop()
+        if slot < len(self.sprites):
+            self.sprites[slot].store_slot = slot
+
+    # Deals damage to an enemy, unless it still has invincibility frames
+    def hit(self, sprite: pygame.sprite.Sprite, damage: int) -> bool:
+        """
+        Reduces an enemy's health and gives it invincibility frames for ENEMY_IFRAME_TIME.
+
+        Arguments:
+            sprite (pygame.sprite.Sprite): The enemy hit.
+            damage (int): The health to take away.
+
+        Returns:
+            bool: True if the hit landed, False if the enemy was invincible.
+        """
+        slot = sprite.store_slot
+        if self.invincible[slot]:
+            return False
+        self.health[slot] -= damage
+        self.invincible[slot] = 1
+        self.timers.schedule(ENEMY_IFRAME_TIME, self.end_iframes, sprite)
+        return True
+
+    # Ends an enemy's invincibility frames; run by the timer service ENEMY_IFRAME_TIME after a hit
+    def end_iframes(self, sprite: pygame.sprite.Sprite):
+        """
+        Clears an enemy's invincibility and makes it fully visible again. Does nothing if it has left the store.
+
+        Arguments:
+            sprite (pygame.sprite.Sprite): The enemy whose invincibility frames are over.
+        """
+        slot = sprite.store_slot
+        if slot >= len(self.sprites) or self.sprites[slot] is not sprite:
+            return
+        self.invincible[slot] = 0
+        sprite.image.set_alpha(255)
+
+    # Makes this frame's distance checks and patrol decisions for every enemy; run once per frame
+    def steer(self, player_rect: pygame.Rect):
+        """
+        Measures every enemy's distance to the player (for the AI level of detail and the
+        aggro range checks), then gives each patrolling one its facing: a new random one
+        every ENEMY_PATROL_TURN_FRAMES frames, or the way back to its start point (along
+        the axis it strayed furthest on) while it is out of its travel radius. Enemies
+        chasing the player along a plan keep their facing.
+
+        Arguments:
+            player_rect (pygame.Rect): The player's hitbox.
+        """
+        sprites, start_x, start_y = self.sprites, self.start_x, self.start_y
+        radius_squared, heading, turn_timer = self.radius_squared, self.heading, self.turn_timer
+        distance_squared, in_range = self.distance_squared, self.in_range
+        player_x, player_y = player_rect.x, player_rect.y
+        player_center_x, player_center_y = player_rect.center
+        aggro_squared = ENEMY_AGGRO_DISTANCE * ENEMY_AGGRO_DISTANCE
+        for slot in range(len(sprites)):
+            sprite = sprites[slot]
+            rect = sprite.rect
+            enemy_x, enemy_y = rect.x, rect.y
+            # Distances to the player, on squared values: between centers for the level of detail, between top-lefts for aggro
+            dx = player_center_x - rect.centerx
+            dy = player_center_y - rect.centery
+            distance_squared[slot] = dx * dx + dy * dy
+            dx = player_x - enemy_x
+            dy = player_y - enemy_y
+            in_range[slot] = dx * dx + dy * dy < aggro_squared
+            if sprite.plan_target is not None:
+                # Chasing the player: its plan decides where it goes
+                continue
+            turn_timer[slot] -= 1
+            if turn_timer[slot] <= 0:
+                heading[slot] = random.randrange(4)
+                turn_timer[slot] = ENEMY_PATROL_TURN_FRAMES
+            # Head back toward the start along the axis that's furthest from it, holding off random turns until back in range
+            home_x = start_x[slot] - enemy_x
+            home_y = start_y[slot] - enemy_y
+            if home_x * home_x + home_y * home_y > radius_squared[slot]:
+                if abs(home_x) > abs(home_y):
+                    heading[slot] = 1 if home_x > 0 else 0
+                else:
+                    heading[slot] = 3 if home_y > 0 else 2
+                turn_timer[slot] = ENEMY_PATROL_TURN_FRAMES
+
 # This class represent the various enemy sprites, and how they are updated throughout gameplay
 class Enemy(pygame.sprite.Sprite):
     """
@@ -934,9 +1042,8 @@ class Enemy(pygame.sprite.Sprite):
         """
         self.game = game
         self.stage_type = stage_type
-        self.threat_level = threat_level # 1 for simple enemies, 2 for elites. Numbers used for scalability.
         self._layer = ENEMY_LAYER # Control which layer on the screen the sprite is on
-        self.groups = self.game.all_sprites, self.game.enemies # Add sprite to the all_sprites and enemies groups
+        self.groups = self.game.all_sprites, self.game.active_sprites, self.game.enemies # Add sprite to the all_sprites, active_sprites and enemies groups
         pygame.sprite.Sprite.__init__(self,self.groups)
 
         # Sprite sizing relative to game's tile size
@@ -944,16 +1051,9 @@ class Enemy(pygame.sprite.Sprite):
         self.y = y * TILESIZE
         self.width = TILESIZE
         self.height = TILESIZE
-        self.current_path: List[GridNode] = []
         
-        # x/y change to record changes in coordinates upon moving. Added to the x/y variables upon update.
-        self.x_change = 0
-        self.y_change = 0
-
-        # controls the direction the sprite is facing on load. Defaults to a random direction between left or right.
-        self.facing = random.choice(['left', 'right'])
-        # controls the upcoming loop position of the sprite (e.g. in a 3-sprites loop, 2 is the third sprite). Defaults to 1 (second sprite).
-        self.animation_loop = 1
+        # The direction the sprite is facing on load. Defaults to a random direction between left or right.
+        facing = random.choice(['left', 'right'])
         # controls the movement loop (the patrolling behaviour) of the enemy.
         self.movement_loop = 0
 
@@ -973,27 +1073,92 @@ class Enemy(pygame.sprite.Sprite):
         self.rect.x = self.x
         self.rect.y = self.y
         self.speed = ENEMY_SPEED
+        # Frames covered by each update, set by the AI level of detail (see lod_tick); movement goes that many times further
+        self.lod_step = 1
         # Health variables
-        if threat_level >= 2:
-            self.health = ELITE_ENEMY_HP
-            self.max_health = ELITE_ENEMY_HP
-        else:
-            self.health = ENEMY_HP
-            self.max_health = ENEMY_HP
+        self.max_health = ELITE_ENEMY_HP if threat_level >= 2 else ENEMY_HP
         self.health_bar_visible = False
-        # Invincibility frames
-        self.invincible = False
-        self.invincible_timer = 0
+        # Invincibility frames flicker
         self.flicker_timer = 0
-        self.last_move_time = time.time()
-        # controls enemy travel 
-        self.max_travel_pixels = random.randint(7, 30) * TILESIZE  # can travel between between 7 and 30 pixels before returning to starting position
-        self.current_direction = random.choice(['up', 'down', 'left', 'right'])
-        self.patrol_step_timer = 0
-        self.patrol_step_limit = FPS # Change direction in accordance with our framerate.
-        # starting positions
-        self.start_x = self.rect.x 
-        self.start_y = self.rect.y
+        # Hot state (velocity, health, invincibility, facing, animation position, threat level) and patrol state live in the game's
+        # enemy store, read and written through the properties below. The x/y change (velocity) starts at 0, and the animation loop at 1 (second sprite).
+        # Can travel between ENEMY_PATROL_MIN_TILES and ENEMY_PATROL_MAX_TILES tiles before returning to its starting position.
+        travel_pixels = random.randint(ENEMY_PATROL_MIN_TILES, ENEMY_PATROL_MAX_TILES) * TILESIZE
+        self.store_slot = self.game.enemy_store.add(self, facing, threat_level, self.max_health, travel_pixels)
+        # Track the enemy in the spatial hash so other sprites can find it cheaply
+        self.game.spatial_hash.insert(self)
+        # Categorized collision candidates around the enemy, refreshed with one spatial hash query per frame
+        self.collision_hits = self.game.query_collisions(self.rect)
+        # Latest plan from the AI scheduler: whether the player is in aggro range, and the point to chase toward.
+        # Kept and followed until the next plan arrives.
+        self.aggro = False
+        self.plan_target: Optional[pygame.math.Vector2] = None
+        # On large maps: the latest path to the player from the path workers ([] while waiting, None if unreachable)
+        self.current_path: Optional[List[GridNode]] = []
+        # Frames since the enemy last updated, for the AI level of detail. Offset per enemy so mid-range ones don't all update on the same frame.
+        self.lod_counter = len(self.game.enemies) % AI_LOD_MID_INTERVAL
+
+    # x/y change to record changes in coordinates upon moving. Stored as the enemy's velocity in the enemy store.
+    @property
+    def x_change(self) -> float:
+        return self.game.enemy_store.vx[self.store_slot]
+
+    @x_change.setter
+    def x_change(self, value: float):
+        self.game.enemy_store.vx[self.store_slot] = value
+
+    @property
+    def y_change(self) -> float:
+        return self.game.enemy_store.vy[self.store_slot]
+
+    @y_change.setter
+    def y_change(self, value: float):
+        self.game.enemy_store.vy[self.store_slot] = value
+
+    # Enemy health, stored in the enemy store
+    @property
+    def health(self) -> int:
+        return self.game.enemy_store.health[self.store_slot]
+
+    @health.setter
+    def health(self, value: int):
+        self.game.enemy_store.health[self.store_slot] = value
+
+    # 1 for simple enemies, 2 for elites. Numbers used for scalability.
+    @property
+    def threat_level(self) -> int:
+        return self.game.enemy_store.threat_level[self.store_slot]
+
+    # Whether the enemy has invincibility frames; the timer service ends them per enemy (see EnemyStore.end_iframes)
+    @property
+    def invincible(self) -> bool:
+        return self.game.enemy_store.invincible[self.store_slot] == 1
+
+    # The direction the sprite is facing, stored as a heading index in the enemy store
+    @property
+    def facing(self) -> str:
+        return EnemyStore.DIRECTIONS[self.game.enemy_store.heading[self.store_slot]]
+
+    @facing.setter
+    def facing(self, value: str):
+        self.game.enemy_store.heading[self.store_slot] = EnemyStore.HEADINGS[value]
+
+    # controls the upcoming loop position of the sprite (e.g. in a 3-sprites loop, 2 is the third sprite). Stored in the enemy store.
+    @property
+    def animation_loop(self) -> float:
+        return self.game.enemy_store.animation[self.store_slot]
+
+    @animation_loop.setter
+    def animation_loop(self, value: float):
+        self.game.enemy_store.animation[self.store_slot] = value
+
+    # Removes the enemy from all groups and from the spatial hash
+    def kill(self):
+        """Removes the enemy from all of its groups, stops tracking it in the spatial hash and the enemy store, and frees the cells it reserved."""
+        self.game.spatial_hash.remove(self)
+        self.game.reservations.release(self)
+        self.game.enemy_store.remove(self)
+        super().kill()
 
     # Gets the current pixel the enemy is on and converts it to a grid node.
     def get_current_node(self) -> GridNode:
@@ -1022,6 +1187,39 @@ class Enemy(pygame.sprite.Sprite):
         y = int(player_pos.y // TILESIZE)
         return (x, y)
 
+    # Whether the enemy is too far from the player to update at all (the AI level of detail's sleeping tier)
+    def is_asleep(self) -> bool:
+        """
+        Checks the enemy's distance to the player, measured at the start of the frame by the enemy store.
+
+        Returns:
+            bool: True if the enemy is at least AI_LOD_FAR_DISTANCE away from the player, False otherwise.
+        """
+        return self.game.enemy_store.distance_squared[self.store_slot] >= AI_LOD_FAR_DISTANCE * AI_LOD_FAR_DISTANCE
+
+    # Decides whether the enemy updates this frame, depending on how far it is from the player
+    def lod_tick(self) -> bool:
+        """
+        Applies the AI level of detail tiers. Enemies near the player update every frame,
+        mid-range ones every AI_LOD_MID_INTERVAL frames (moving that many times further to
+        keep the same pace), and far-away ones sleep until the player comes closer.
+
+        Returns:
+            bool: True if the enemy should update this frame, False otherwise.
+        """
+        if self.is_asleep():
+            return False
+        # Measured for every enemy at the start of the frame by the enemy store
+        distance_squared = self.game.enemy_store.distance_squared[self.store_slot]
+        step = 1 if distance_squared < AI_LOD_NEAR_DISTANCE * AI_LOD_NEAR_DISTANCE else AI_LOD_MID_INTERVAL
+        self.lod_counter += 1
+        if self.lod_counter < step:
+            return False
+        self.lod_counter = 0
+        # Cover the frames skipped since the last update by moving further in this one
+        self.lod_step = step
+        return True
+
     # Method for updating the game after an action, e.g. movement or attacking
     def update(self):
         """
@@ -1030,18 +1228,16 @@ class Enemy(pygame.sprite.Sprite):
         """
         # Only continue running enemy's update function while player is still alive.
         if not self.game.player.is_dead:
+            # AI level of detail: skip this frame if the enemy is too far from the player to need it
+            if not self.lod_tick():
+                return
             self.animate() # Call the animate method to change sprites for animation effect.
-            # Handle invincibility timer
-            now = pygame.time.get_ticks()
-            if self.invincible and now - self.invincible_timer > ENEMY_IFRAME_TIME:
-                self.invincible = False
-                self.image.set_alpha(255) # Make the sprite fully visible again
-            # Reflect any change in coordinates, correct for collision, then reset the change values.
-            self.collide_enemies()
-            self.rect.x += self.x_change
-            self.collide_obstacles('x')
-            self.rect.y += self.y_change
-            self.collide_obstacles('y')
+            # (Invincibility frames end per enemy, when the timer service runs EnemyStore.end_iframes.)
+            # One broadphase lookup per frame: everything the enemy could touch while moving this frame, sorted by category
+            self.collision_hits = self.game.query_collisions(self.rect)
+            # Start this frame's change in coordinates from 0: the movement methods below move the rect once and record the
+            # change, which collide_obstacles reads to know which way to correct.
+            # (Enemy-to-enemy separation runs once per frame for all enemies, in Game.update.)
             self.x_change = 0
             self.y_change = 0
 
@@ -1056,142 +1252,190 @@ class Enemy(pygame.sprite.Sprite):
                 self.image.set_alpha(255)
                 self.flicker_timer = 0   
 
-            # Aggro setting: calculate distance to player and check for aggro. If less than 3 tiles, become aggro.
-            player_pos = pygame.math.Vector2(self.game.player.rect.x, self.game.player.rect.y)
-            enemy_pos = pygame.math.Vector2(self.rect.x, self.rect.y)
-            distance_to_player = enemy_pos.distance_to(player_pos)
-            
-            if distance_to_player < ENEMY_AGGRO_DISTANCE:
-                self.aggro = True
-            else:
-                self.aggro = False
-
+            # Aggro state comes from the enemy's latest plan (see plan), refreshed by the game's AI scheduler
             if self.aggro and self.threat_level == 2:
-                # If elite enemies, move towards the player
-                #self.movement_aggro(player_pos, enemy_pos)        
-                self.movement()  
+                # If elite enemies, move towards the player along the planned route
+                self.movement_aggro()
             else:
                 self.movement() # Call the movement method to capture any coordinate changes.
+            # Re-bucket the enemy in the spatial hash now that it has moved this frame
+            self.game.spatial_hash.move(self)
 
     # Method for sprite movement. 
     def movement(self):
         """
-        Handles randomized patrol movement for the enemy. Includes boundary checks 
-        to prevent wandering too far and immediate direction changes upon hitting 
-        an obstacle.
+        Handles patrol movement for the enemy along the facing picked by the game's enemy
+        store (random turns, and heading back once too far from the start), with
+        immediate direction changes upon nearing or hitting an obstacle.
         """
-        current_time = time.time()
-        if current_time - self.last_move_time > 1: # Change direction every second
-            self.facing = random.choice(['left', 'right', 'up', 'down'])
-            self.last_move_time = current_time
-        
-        # Force direction toward start if out of bounds
-        current_pos = pygame.math.Vector2(self.rect.x, self.rect.y)
-        start_pos = pygame.math.Vector2(self.start_x, self.start_y)
-        distance_from_start = current_pos.distance_to(start_pos)
-
-        if distance_from_start > self.max_travel_pixels:
-            # Determine axis that's furthest from the start
-            if abs(self.start_x - self.rect.x) > abs(self.start_y - self.rect.y):
-                # Move horizontally back toward start
-                self.current_direction = 'left' if self.rect.x > self.start_x else 'right'
-            else:
-                # Move vertically back toward start
-                self.current_direction = 'up' if self.rect.y > self.start_y else 'down'
-            # Reset timer to immediately apply new direction
-            self.patrol_step_timer = self.patrol_step_limit
+        # Turn before walking into an obstacle instead of bumping into it and backing off
+        if self.is_blocked_ahead(self.facing):
+            open_facings = [facing for facing in ('left', 'right', 'up', 'down') if not self.is_blocked_ahead(facing)]
+            if open_facings:
+                # Prefer the way that leads furthest from nearby obstacles
+                gradient_x, gradient_y = self.game.clearance.get_gradient(self.get_current_node())
+                self.facing = max(open_facings, key=lambda facing: FACING_STEPS[facing][0] * gradient_x + FACING_STEPS[facing][1] * gradient_y)
 
+        # How far to move this frame (further when the AI level of detail skipped frames)
+        distance = self.speed * self.lod_step
         correction_factor = 1.3
         if self.facing == 'left':
-            self.rect.x -= self.speed
-            self.x_change -= self.speed
+            self.rect.x -= distance
+            self.x_change -= distance
             if self.collide_obstacles("x"): 
-                self.rect.x += self.speed * correction_factor
-                self.x_change += self.speed * correction_factor
+                self.rect.x += distance * correction_factor
+                self.x_change += distance * correction_factor
                 self.facing == 'right'
         elif self.facing == 'right':
-            self.rect.x += self.speed
-            self.x_change += self.speed
+            self.rect.x += distance
+            self.x_change += distance
             if self.collide_obstacles("x"): 
-                self.rect.x -= self.speed * correction_factor
-                self.x_change -= self.speed * correction_factor
+                self.rect.x -= distance * correction_factor
+                self.x_change -= distance * correction_factor
                 self.facing == 'left'        
         elif self.facing == 'up':
-            self.rect.y -= self.speed
-            self.y_change -= self.speed
+            self.rect.y -= distance
+            self.y_change -= distance
             if self.collide_obstacles("y"): 
-                self.rect.y += self.speed * correction_factor
-                self.y_change += self.speed * correction_factor
+                self.rect.y += distance * correction_factor
+                self.y_change += distance * correction_factor
                 self.facing == 'down'
         elif self.facing == 'down':
-            self.rect.y += self.speed
-            self.y_change += self.speed
+            self.rect.y += distance
+            self.y_change += distance
             if self.collide_obstacles("y"): 
-                self.rect.y -= self.speed * correction_factor
-                self.y_change -= self.speed * correction_factor
+                self.rect.y -= distance * correction_factor
+                self.y_change -= distance * correction_factor
                 self.facing == 'up'
 
-    # Method for sprite movement when aggro. Calculates a path to player and moves along it using TileMap.
-    def movement_aggro(self, player_pos: pygame.math.Vector2, enemy_pos: pygame.math.Vector2):
+    # Method the AI scheduler runs to refresh the enemy's decisions. Reads the shared flow field for the next step toward the player.
+    def plan(self):
         """
-        Calculates the shortest path to the player using BFS pathfinding and 
-        moves the enemy along the calculated path nodes.
-
-        Arguments:
-            player_pos (pygame.math.Vector2): The player's current pixel position.
-            enemy_pos (pygame.math.Vector2): The enemy's current pixel position.
+        Decides whether the enemy is aggro (player within ENEMY_AGGRO_DISTANCE) and, for aggro
+        elites, where to head next: the center of the next cell of a short plan that steers
+        around the other chasers' reserved moves (see cooperative_astar), or the player itself
+        once sharing a cell. Run by the game's AI scheduler a few times a second rather than
+        every frame; the enemy follows the plan in between.
         """
+        # Aggro setting: calculate distance to player and check for aggro. If less than 4 tiles, become aggro.
+        # (The distances of all enemies are checked together, once per frame, by the game's enemy store.)
+        self.aggro = self.game.enemy_store.in_range[self.store_slot] == 1
+        self.plan_target = None
+        if not (self.aggro and self.threat_level == 2):
+            return
+
+        '''Path Finding: Pick the next cell toward the player.'''
+        player_center = pygame.math.Vector2(self.game.player.rect.center)
         enemy_node = self.get_current_node()
-        player_node = self.get_player_node(player_pos)
-
-        '''Path Finding: Search for a new path (if the current one is finished).'''
-        # Check if the player is in the last node of current path (to avoid recalculation).
-        if not self.current_path or self.current_path[-1] != player_node:
-            # Start search.
-            new_path = find_path(
-                self.game.tilemap, 
-                enemy_node, 
-                player_node         
-            )
-
-            # Path found.
-            if new_path:
-                # Discard the first node (which is the enemy's current position)
-                self.current_path = new_path[1:]
+        player_node = self.get_player_node(player_center)
+        if not self.game.tilemap.is_reachable(enemy_node, player_node):
+            # Player is cut off from this enemy (e.g. across holes or lava): patrol right away, without searching
+            return
+        if self.game.path_pool is not None and not self.game.path_pool.closed:
+            # Large maps: search on a worker, and keep following the last path until the new one is back
+            self.game.path_pool.request(self, enemy_node, player_node, self.receive_path)
+            next_node = self.get_next_path_node(enemy_node)
+        else:
+            # Plan a few steps ahead around the moves other chasers reserved, guided by the true
+            # distance to the player: from the stage's route table if it's up to date, else the flow field
+            oracle = self.game.path_oracle
+            if oracle is not None and oracle.is_valid():
+                heuristic = lambda node: oracle.get_distance(node, player_node)
             else:
-                # No path found, run default movement.
-                self.movement()
-                return
+                heuristic = lambda node: self.game.flow_field.get_distance(node, player_node)
+            reservations = self.game.reservations
+            reservations.release(self)
+            path = cooperative_astar(self.game.tilemap, enemy_node, player_node, reservations, self, heuristic)
+            reservations.reserve(self, path)
+            next_node = path[1] if len(path) > 1 else enemy_node
+        if next_node is None:
+            # Player can't be reached from here: patrol instead
+            return
+        if enemy_node == player_node:
+            self.plan_target = player_center
+        else:
+            next_node_x, next_node_y = next_node
+            self.plan_target = pygame.math.Vector2(next_node_x * TILESIZE + TILESIZE // 2, next_node_y * TILESIZE + TILESIZE // 2)
 
-        '''Movement: Move towards the next node in the path'''
-        # Get the pixel position of the next target node's center
-        if self.current_path:
-            next_node_x, next_node_y = self.current_path[0]
-            target_pixel_x = next_node_x * TILESIZE + TILESIZE // 2
-            target_pixel_y = next_node_y * TILESIZE + TILESIZE // 2
-            
-            # Calculate the direction vector towards the center of the next tile
-            direction_vector = pygame.math.Vector2(target_pixel_x, target_pixel_y) - enemy_pos
-            
-            # Check if we are close enough to the target node's center
-            if direction_vector.length_squared() < (self.speed * self.speed * 2): # Small buffer
-                # We've reached the current path node, remove it
-                self.rect.center = (target_pixel_x, target_pixel_y) # Snap to center
-                self.current_path.pop(0) 
-                return # Stop and wait for the next update cycle
-            
-            # Normalize the vector and move (using your original movement method logic)
-            direction_vector.normalize_ip()
-            self.x_change = direction_vector.x * self.speed
-            self.y_change = direction_vector.y * self.speed
-            
-            self.rect.x += self.x_change
-            self.rect.y += self.y_change
-            
-            # Apply collision logic
-            self.collide_obstacles("x")
-            self.collide_obstacles("y")
-            self.collide_enemies()
+    # Called by the game's path workers with a freshly searched path to the player
+    def receive_path(self, path: Optional[List[GridNode]]):
+        """
+        Stores a path from the path workers, to be followed by the next plans.
+
+        Arguments:
+            path (Optional[List[GridNode]]): The path from the enemy's cell to the player's, or None if there is none.
+        """
+        self.current_path = path
+
+    # Finds where the enemy is on its current path and returns the cell after it
+    def get_next_path_node(self, enemy_node: GridNode) -> Optional[GridNode]:
+        """
+        Reads the next cell to step onto from the enemy's current path.
+
+        Arguments:
+            enemy_node (GridNode): The enemy's current (x, y) grid position.
+
+        Returns:
+            Optional[GridNode]: The next cell, the enemy's own cell if the path is used up or still on its way, or None if the player can't be reached.
+        """
+        if self.current_path is None:
+            return None
+        if enemy_node in self.current_path:
+            # Drop the part of the path already walked
+            self.current_path = self.current_path[self.current_path.index(enemy_node) + 1:]
+        return self.current_path[0] if self.current_path else enemy_node
+
+    # Checks the obstacle distance field just ahead of the enemy
+    def is_blocked_ahead(self, facing: str) -> bool:
+        """
+        Checks whether the cell the enemy's leading edge would move into is blocked.
+
+        Arguments:
+            facing (str): The direction to look in ('left', 'right', 'up' or 'down').
+
+        Returns:
+            bool: True if there is an obstacle right ahead, False otherwise.
+        """
+        step_x, step_y = FACING_STEPS[facing]
+        distance = self.speed * self.lod_step
+        ahead_x = self.rect.centerx + step_x * (self.rect.width // 2 + distance)
+        ahead_y = self.rect.centery + step_y * (self.rect.height // 2 + distance)
+        return self.game.clearance.get_clearance((ahead_x // TILESIZE, ahead_y // TILESIZE)) == 0.0
+
+    # Method for sprite movement when aggro. Follows the latest plan toward the player.
+    def movement_aggro(self):
+        """
+        Moves the enemy toward its planned target (see plan). Falls back to patrolling if
+        the player can't be reached, and waits on the target until the next plan arrives.
+        """
+        if self.plan_target is None:
+            # No route to the player, run default movement.
+            self.movement()
+            return
+
+        # Calculate the direction vector towards the target
+        direction_vector = self.plan_target - pygame.math.Vector2(self.rect.center)
+        # Already on the target: stop and wait for the next plan
+        if direction_vector.length_squared() < 1:
+            return
+
+        # Normalize the vector and move (using your original movement method logic)
+        direction_vector.normalize_ip()
+        # If the enemy's body reaches a wall, lean away from it so it doesn't grind along it
+        enemy_node = self.get_current_node()
+        if not self.game.clearance.has_clearance(enemy_node, max(self.rect.width, self.rect.height) / 2):
+            gradient_x, gradient_y = self.game.clearance.get_gradient(enemy_node)
+            direction_vector += pygame.math.Vector2(gradient_x, gradient_y) * CLEARANCE_STEER_WEIGHT
+            if direction_vector.length_squared() > 0:
+                direction_vector.normalize_ip()
+        self.x_change = direction_vector.x * self.speed * self.lod_step
+        self.y_change = direction_vector.y * self.speed * self.lod_step
+
+        # Move and correct one axis at a time, so a correction only ever undoes that axis' movement
+        self.rect.x += self.x_change
+        self.collide_obstacles("x")
+        self.rect.y += self.y_change
+        self.collide_obstacles("y")
 
     # Method for sprite's collision detection w/ obstacle (e.g. block), depending on direction of collision. Returns True if collision occured, else False.
     def collide_obstacles(self, direction: str) -> bool:
@@ -1205,11 +1449,12 @@ class Enemy(pygame.sprite.Sprite):
         Returns:
             bool: True if a collision with a non-walkable sprite occurred, False otherwise.
         """
-        # checks if rectangle of one sprite is colliding with rectangle of another: in this case, player's and all game blocks
-        hits_block = pygame.sprite.spritecollide(self, self.game.blocks, False)
-        hits_holes = pygame.sprite.spritecollide(self, self.game.holes, False)
-        geos_hits = pygame.sprite.spritecollide(self, self.game.ice_blocks, False)     
-        waters_hits = pygame.sprite.spritecollide(self, self.game.waters, False) 
+        # checks if rectangle of one sprite is colliding with rectangle of another, narrowing down this frame's candidates.
+        hits = self.collision_hits
+        hits_block = overlapping(self.rect, hits['solid'])
+        hits_holes = overlapping(self.rect, hits['hole'])
+        geos_hits = overlapping(self.rect, hits['ice'])
+        waters_hits = overlapping(self.rect, hits['water'])
 
         if direction == "x":              
             if hits_block:
@@ -1297,26 +1542,6 @@ class Enemy(pygame.sprite.Sprite):
                     return True
             return False
 
-    # Method for sprite's collision detection w/ enemy, depending on direction of collision
-    def collide_enemies(self):
-        """
-        Handles enemy-to-enemy collision detection, applying a push vector 
-        to prevent enemies from overlapping and getting stuck.
-        """
-        # checks if rectangle of one sprite is colliding with rectangle of another: in this case, player's and all game blocks
-        hits_enemy = pygame.sprite.spritecollide(self, self.game.enemies, False)
-        
-        for hit in hits_enemy:
-            # Make sure sprite is not itself
-            if hit != self:
-                # Calculate vector from this enemy to the other enemy
-                push_vector = pygame.math.Vector2(self.rect.x - hit.rect.x, self.rect.y - hit.rect.y)
-                # Ensure consistent push
-                if push_vector.length() > 0:
-                    push_vector.normalize_ip()
-                # Push this enemy away from the other enemy
-                self.rect.x += push_vector.x * self.speed
-                self.rect.y += push_vector.y * self.speed
      # Method for sprite's animation
     
     # Method to get the right sprite for enemy
@@ -1556,9 +1781,9 @@ class Enemy(pygame.sprite.Sprite):
         # Health bar dimensions
         bar_width = TILESIZE
         bar_height = 5
-        # Position the health bar above the enemy
-        bar_x = self.rect.x
-        bar_y = self.rect.y - 10
+        # Position the health bar above the enemy, converting its world position to the screen
+        bar_x = self.rect.x + self.game.camera_x
+        bar_y = self.rect.y - 10 + self.game.camera_y
         
         # Border thickness
         border_thickness = 1
@@ -1570,138 +1795,6 @@ class Enemy(pygame.sprite.Sprite):
         # Draw the green health bar filling, inset by the border thickness
         pygame.draw.rect(self.game.screen, RED, (bar_x + border_thickness, bar_y + border_thickness, inner_width * health_ratio, inner_height))
 
-# This class is for a tile map's stage path finding, used with enemies
-class TileMap:
-    """
-    Utility class for parsing the string-array tilemap data into a grid. 
-    Provides methods for pathfinding algorithms to check tile type 
-    and connectivity.
-    """
-    def __init__(self, tilemap_data: tuple[str]):
-        """
-        Initializes the TileMap with map data and calculates grid dimensions.
-
-        Arguments:
-            tilemap_data (tuple[str]): The grid data.
-        """
-        self.data = tilemap_data
-        # Map dimensions based on provided tile map data
-        self.height = len(tilemap_data) 
-        self.width = len(tilemap_data[0]) if self.height > 0 else 0
-
-    def get_tile_char(self, x: int, y: int) -> Optional[str]:
-        """
-        Gets the character at the given grid coordinates.
-
-        Arguments:
-            x (int): The grid column index.
-            y (int): The grid row index.
-
-        Returns:
-            Optional[str]: The tile character ('W', 'P', '.') or None if out of bounds.
-        """
-        # Get the character at the given grid coordinates, or None if out of bounds.
-        if 0 <= y < self.height and 0 <= x < self.width:
-            return self.data[y][x]
-        return None
-
-    def is_walkable(self, x: int, y: int) -> bool:
-        """
-        Checks if a given grid coordinate is within bounds and not an obstacle 
-        based on the NON_WALKABLE_CHARS list in config.py.
-
-        Arguments:
-            x (int): The grid column index.
-            y (int): The grid row index.
-
-        Returns:
-            bool: True if the tile is safe to walk on, False if it is an obstacle or out of bounds.
-        """
-        # Check if a given grid coordinate is within bounds and not an obstacle.
-        char = self.get_tile_char(x, y)
-        # Check if coordinate is out of bound
-        if char is None:
-            return False 
-        
-        # Check coordinate against defined set of non-walkable characters
-        return char not in NON_WALKABLE_CHARS
-
-    # Gets valid neighboring grids (up, down, left, right) that are walkable
-    def get_neighbors(self, node: GridNode) -> List[GridNode]:
-        """
-        Returns a list of valid, walkable neighboring grid nodes (up, down, left, right).
-
-        Arguments:
-            node (GridNode): The starting (x, y) grid coordinates.
-
-        Returns:
-            List[GridNode]: A list of reachable neighbor coordinates.
-        """
-        x, y = node
-        potential_neighbors = [
-            (x + 1, y),  # Right
-            (x - 1, y),  # Left
-            (x, y + 1),  # Down
-            (x, y - 1)   # Up
-        ]
-        
-        # Filter out neighbors that are obstacles or out of bounds
-        return [
-            neighbor for neighbor in potential_neighbors 
-            if self.is_walkable(neighbor[0], neighbor[1])
-        ]
-
-# A recursive function for finding a path from the enemy grid to the player grid using the BFS (Breadth-First Search) method.
-def find_path(tilemap: TileMap, start_node: GridNode, end_node: GridNode) -> Optional[List[GridNode]]:  
-    """
-    Finds the shortest path between two grid nodes using BFS algorithm.
-
-    Arguments:
-        tilemap (TileMap): The map structure used to check walkability.
-        start_node (GridNode): The enemy's starting (x, y) grid position.
-        end_node (GridNode): The player's target (x, y) grid position.
-
-    Returns:
-        Optional[List[GridNode]]: The shortest path from start_node to end_node as a list of nodes, or None if no path exists.
-    """
-    if start_node == end_node:
-        return [start_node]
-        
-    if not tilemap.is_walkable(start_node[0], start_node[1]) or \
-       not tilemap.is_walkable(end_node[0], end_node[1]):
-        return None 
-
-    # Setup queue and history tracker
-    queue = deque([start_node]) # Initialize the BFS queue
-    # Creat dict to track the path: {current node: node we came from}
-    came_from: Dict[GridNode, Optional[GridNode]] = {start_node: None} # <- CHANGED: Used to reconstruct the shortest path
-
-    # Create a search loop
-    while queue:
-        current_node = queue.popleft() # Use FIFO (queue)
-
-        if current_node == end_node:
-            break
-
-        for next_node in tilemap.get_neighbors(current_node):
-            if next_node not in came_from:
-                # This is the shortest way to reach next_node, so record it
-                queue.append(next_node)
-                came_from[next_node] = current_node # Record path history
-    else:
-        # No path found
-        return None 
-
-    # 3. Path Reconstruction 
-    current = end_node
-    path: List[GridNode] = []
-    
-    while current is not None:
-        path.append(current)
-        current = came_from[current]
-        
-    return path[::-1] # <- CHANGED: Reverse path to go start -> end
-
 #This class represent obstacle block sprites, and how they are updated throughout gameplay
 class Wall(pygame.sprite.Sprite):
     """
@@ -1730,14 +1823,14 @@ class Wall(pygame.sprite.Sprite):
         self.width = TILESIZE
         self.height = TILESIZE
 
-        self.image = self.game.terrain_spritesheet.get_sprite(288, 480, 32, 32)
+        self.image = self.game.terrain_spritesheet.get_tile(288, 480, 32, 32)
 
         if self.stage_type == 1:
-            self.image = self.game.terrain_spritesheet.get_sprite(960, 448, self.width, self.height) # Borders/walls brown rock
+            self.image = self.game.terrain_spritesheet.get_tile(960, 448, self.width, self.height) # Borders/walls brown rock
         elif self.stage_type == 2:
-            self.image = self.game.terrain_spritesheet.get_sprite(928, 480, self.width, self.height) # Borders/walls ice rock
+            self.image = self.game.terrain_spritesheet.get_tile(928, 480, self.width, self.height) # Borders/walls ice rock
         elif self.stage_type == 3:
-            self.image = self.game.terrain_spritesheet.get_sprite(994, 546, self.width, self.height) # Borders/walls fire rock
+            self.image = self.game.terrain_spritesheet.get_tile(994, 546, self.width, self.height) # Borders/walls fire rock
         elif self.stage_type == 4:
             pass
         elif self.stage_type == 5:
@@ -1745,6 +1838,8 @@ class Wall(pygame.sprite.Sprite):
         self.rect = self.image.get_rect()
         self.rect.x = self.x
         self.rect.y = self.y
+        # Static obstacle: register it in the spatial hash once so collision queries can find it
+        self.game.spatial_hash.insert(self)
 
 #This class represent a normal obstacle block sprites, such as rocks, and how they are updated throughout gameplay
 class Block(pygame.sprite.Sprite):
@@ -1773,15 +1868,15 @@ class Block(pygame.sprite.Sprite):
         self.y = y * TILESIZE
         self.width = TILESIZE
         self.height = TILESIZE
-        self.image = pygame.transform.scale(self.game.terrain_spritesheet.get_sprite(224, 416, 32, 32), (BLOCK_SCALE, BLOCK_SCALE)) # Large brown rock
+        self.image = self.game.terrain_spritesheet.get_tile(224, 416, 32, 32, (BLOCK_SCALE, BLOCK_SCALE)) # Large brown rock
 
         # read the block sprite suitable for the given stage typed
         if self.stage_type == 1:
-            self.image = pygame.transform.scale(self.game.terrain_spritesheet.get_sprite(834, 628, 58, 41), (BLOCK_SCALE, BLOCK_SCALE)) # Large brown rock
+            self.image = self.game.terrain_spritesheet.get_tile(834, 628, 58, 41, (BLOCK_SCALE, BLOCK_SCALE)) # Large brown rock
         elif self.stage_type == 2:
-            self.image = self.game.terrain_spritesheet.get_sprite(960, 480, 32,32) # Small ice rocks
+            self.image = self.game.terrain_spritesheet.get_tile(960, 480, 32,32) # Small ice rocks
         elif self.stage_type == 3:
-            self.image = pygame.transform.scale(self.game.terrain_spritesheet.get_sprite(960, 576, 32, 32), (BLOCK_SCALE, BLOCK_SCALE)) # Large black rock
+            self.image = self.game.terrain_spritesheet.get_tile(960, 576, 32, 32, (BLOCK_SCALE, BLOCK_SCALE)) # Large black rock
         elif self.stage_type == 4:
             pass
         elif self.stage_type == 5:
@@ -1789,6 +1884,8 @@ class Block(pygame.sprite.Sprite):
         self.rect = self.image.get_rect()
         self.rect.x = self.x
         self.rect.y = self.y
+        # Static obstacle: register it in the spatial hash once so collision queries can find it
+        self.game.spatial_hash.insert(self)
 
 #This class represent a geological obstacle sprites, such as lava, lakes, etc. and how they are updated throughout gameplay
 class Geo(pygame.sprite.Sprite):
@@ -1822,7 +1919,8 @@ class Geo(pygame.sprite.Sprite):
         elif stage_type == 3 and geo_type == 1:
             self.groups = self.game.all_sprites, self.game.geos, self.game.blocks
         elif stage_type == 4 and geo_type == 1:
-            self.groups = self.game.all_sprites, self.game.geos, self.game.miasmas
+            # Miasma is the only animated geo: the only one that needs updating every frame
+            self.groups = self.game.all_sprites, self.game.active_sprites, self.game.geos, self.game.miasmas
         elif stage_type == 4 and geo_type == 3:
             self.groups = self.game.all_sprites, self.game.geos, self.game.waters
         else:
@@ -1836,44 +1934,49 @@ class Geo(pygame.sprite.Sprite):
         self.y = y * TILESIZE
         self.width = TILESIZE
         self.height = TILESIZE
-        self.image = pygame.transform.scale(self.game.terrain_spritesheet.get_sprite(352, 352, 32, 32), (32, 32)) # Grass
+        self.image = self.game.terrain_spritesheet.get_tile(352, 352, 32, 32, (32, 32)) # Grass
 
         # read the geo sprite suitable for the given stage typed
         if self.stage_type == 1:
             if geo_type == 0:
-                self.image = pygame.transform.scale(self.game.terrain_spritesheet.get_sprite(352, 352, 32, 32), (BLOCK_SCALE, BLOCK_SCALE)) # Grass
+                self.image = self.game.terrain_spritesheet.get_tile(352, 352, 32, 32, (BLOCK_SCALE, BLOCK_SCALE)) # Grass
             if geo_type == 1:
-                self.image = pygame.transform.scale(self.game.terrain_spritesheet.get_sprite(483, 546, 32, 32), (BLOCK_SCALE, BLOCK_SCALE)) # Water
+                self.image = self.game.terrain_spritesheet.get_tile(483, 546, 32, 32, (BLOCK_SCALE, BLOCK_SCALE)) # Water
                 # Consider this geo obstacle a hole
             if geo_type == 2:
-                self.image = pygame.transform.scale(self.game.terrain_spritesheet.get_sprite(354, 548, 32, 32), (BLOCK_SCALE, BLOCK_SCALE)) # Petals
+                self.image = self.game.terrain_spritesheet.get_tile(354, 548, 32, 32, (BLOCK_SCALE, BLOCK_SCALE)) # Petals
         elif self.stage_type == 2:
             if geo_type == 1:
-                self.image = pygame.transform.scale(self.game.terrain_spritesheet.get_sprite(483, 546, 32, 32), (32, 34)) # slippy ice
+                self.image = self.game.terrain_spritesheet.get_tile(483, 546, 32, 32, (32, 34)) # slippy ice
                 # Consider this geo obstacle a hole
             elif geo_type == 2:
-                self.image = pygame.transform.scale(self.game.ice_cube_spritesheet.get_sprite(0, 0, 32,32), (BLOCK_SCALE, BLOCK_SCALE)) # Small ice rocks
+                self.image = self.game.ice_cube_spritesheet.get_tile(0, 0, 32,32, (BLOCK_SCALE, BLOCK_SCALE)) # Small ice rocks
         elif self.stage_type == 3:
             if geo_type == 1:
-                self.image = pygame.transform.scale(self.game.terrain_spritesheet.get_sprite(480, 160, 20, 20), (BLOCK_SCALE, BLOCK_SCALE)) # Lava
+                self.image = self.game.terrain_spritesheet.get_tile(480, 160, 20, 20, (BLOCK_SCALE, BLOCK_SCALE)) # Lava
         elif self.stage_type == 4:
             if geo_type == 1:
-                self.geo_animations = [pygame.transform.scale(self.game.miasma_spritesheet.get_sprite(0, 4, 32, 124), (32, 32)),
-                           pygame.transform.scale(self.game.miasma_spritesheet.get_sprite(40, 8, 24, 120), (32, 32)),
-                           pygame.transform.scale(self.game.miasma_spritesheet.get_sprite(68, 4, 28, 124), (32, 32)),
-                           pygame.transform.scale(self.game.miasma_spritesheet.get_sprite(100, 8, 32, 120), (32, 32))]
-                self.image = pygame.transform.scale(self.game.miasma_spritesheet.get_sprite(132, 8, 28, 120), (32, 32)) # Miasma
+                self.geo_animations = [self.game.miasma_spritesheet.get_tile(0, 4, 32, 124, (32, 32)),
+                           self.game.miasma_spritesheet.get_tile(40, 8, 24, 120, (32, 32)),
+                           self.game.miasma_spritesheet.get_tile(68, 4, 28, 124, (32, 32)),
+                           self.game.miasma_spritesheet.get_tile(100, 8, 32, 120, (32, 32))]
+                self.image = self.game.miasma_spritesheet.get_tile(132, 8, 28, 120, (32, 32)) # Miasma
                 self.animation_loop = 0
                 self.animation_loop_max = 4
             elif geo_type == 2:
-                self.image = pygame.transform.scale(self.game.terrain_spritesheet.get_sprite(64, 160, 32, 32), (BLOCK_SCALE, BLOCK_SCALE)) #  temple ground, outside
+                self.image = self.game.terrain_spritesheet.get_tile(64, 160, 32, 32, (BLOCK_SCALE, BLOCK_SCALE)) #  temple ground, outside
             elif geo_type == 3:
-                self.image = pygame.transform.scale(self.game.terrain_spritesheet.get_sprite(483, 546, 32, 32), (32, 34)) # Water
+                self.image = self.game.terrain_spritesheet.get_tile(483, 546, 32, 32, (32, 34)) # Water
         elif self.stage_type == 5:
             pass
         self.rect = self.image.get_rect()
         self.rect.x = self.x
         self.rect.y = self.y
+        # Static terrain: register it in the spatial hash once so collision queries can find it
+        self.game.spatial_hash.insert(self)
+        # Ground tiles placed on this cell from now on are drawn over the geo, not under it
+        if geo_layer == GROUND_LAYER:
+            self.game.tiles.cover(x, y)
 
     def update(self):
         """
@@ -1881,6 +1984,18 @@ class Geo(pygame.sprite.Sprite):
         """
         self.animate() # Call the animate method to change sprites for animation effect
 
+    # Removes the geo from all groups and from the spatial hash (e.g. ice blocks melted by spells)
+    def kill(self):
+        """
+        Removes the geo from all of its groups and stops tracking it in the spatial hash.
+        A destroyed ice block also frees its cell on the path finding grid.
+        """
+        self.game.spatial_hash.remove(self)
+        if self in self.game.ice_blocks:
+            # Bumps the tile map version, so cached paths and flow fields are recomputed
+            self.game.tilemap.set_walkable(self.x // TILESIZE, self.y // TILESIZE, True)
+        super().kill()
+
     # Method for sprite's animation
     def animate(self):   
         """
@@ -1920,65 +2035,160 @@ class Hole(pygame.sprite.Sprite):
         self.y = y * TILESIZE
         self.width = TILESIZE
         self.height = TILESIZE
-        self.image = self.game.terrain_spritesheet.get_sprite(681, 70, self.width, self.height)
+        self.image = self.game.terrain_spritesheet.get_tile(681, 70, self.width, self.height)
 
         # read the hole sprite suitable for the given stage type
         if self.stage_type == 1:
-            self.image = pygame.transform.scale(self.game.terrain_spritesheet.get_sprite(681, 70, 82, 79), (HOLE_SCALE, HOLE_SCALE)) # plains hole
+            self.image = self.game.terrain_spritesheet.get_tile(681, 70, 82, 79, (HOLE_SCALE, HOLE_SCALE)) # plains hole
         elif self.stage_type == 2:
-            self.image = pygame.transform.scale(self.game.terrain_spritesheet.get_sprite(704, 544, 64, 64), (HOLE_SCALE, HOLE_SCALE)) # ice hole
+            self.image = self.game.terrain_spritesheet.get_tile(704, 544, 64, 64, (HOLE_SCALE, HOLE_SCALE)) # ice hole
         elif self.stage_type == 3:
-            self.image = pygame.transform.scale(self.game.terrain_spritesheet.get_sprite(489, 70, 81, 79), (HOLE_SCALE, HOLE_SCALE)) # fire hole
+            self.image = self.game.terrain_spritesheet.get_tile(489, 70, 81, 79, (HOLE_SCALE, HOLE_SCALE)) # fire hole
         elif self.stage_type == 4:
-            self.image = pygame.transform.scale(self.game.terrain_spritesheet.get_sprite(777, 70, 81, 79), (HOLE_SCALE, HOLE_SCALE)) # fire hole
+            self.image = self.game.terrain_spritesheet.get_tile(777, 70, 81, 79, (HOLE_SCALE, HOLE_SCALE)) # fire hole
         elif self.stage_type == 5:
             pass
         self.rect = self.image.get_rect()
         self.rect.x = self.x
         self.rect.y = self.y
+        # Static obstacle: register it in the spatial hash once so collision queries can find it
+        self.game.spatial_hash.insert(self)
         
-#This class represent ground sprites, sprites the player traverses, and how they are updated throughout gameplay
-class Ground(pygame.sprite.Sprite):
+#This class represent ground tiles, the tiles the player traverses. They are drawn by the game's tile layer rather than as sprites.
+class Ground:
     """
-    Represents the non-collidable background tile (floor) of a stage.
+    Represents the non-collidable background tile (floor) of a stage. A lightweight,
+    slotted record rather than a sprite: there is one on nearly every cell, and none of
+    them ever update, move or collide. Its image is shared with every other ground tile
+    of the stage.
     """
+    __slots__ = ('image', 'rect')
+
     def __init__(self, game: 'Game', x: int, y: int, stage_type: int):
         """
-        Initializes a Ground sprite.
+        Initializes a ground tile and places it on the game's tile layer.
 
         Arguments:
             game (Game): Reference to the main Game instance.
-            x (int): Starting grid column.
-            y (int): Starting grid row.
+            x (int): Grid column.
+            y (int): Grid row.
             stage_type (int): Used to select the correct visual asset (Grass, Ice, Fire, etc.).
         """
-        self.stage_type = stage_type
-        self.game = game
-        self._layer = GROUND_LAYER
-        self.groups = self.game.all_sprites
-        pygame.sprite.Sprite.__init__(self, self.groups)
-
-        self.x = x * TILESIZE
-        self.y = y * TILESIZE
-        self.width = TILESIZE
-        self.height = TILESIZE
-
-        self.image = self.game.terrain_spritesheet.get_sprite(256, 480, 32, 32)
-
+        sheet = game.terrain_spritesheet
         # read the ground sprite suitable for the given stage type
         if stage_type == 1:
-            self.image = self.game.terrain_spritesheet.get_sprite(58,544, self.width, self.height) # dark ground
-        elif stage_type ==2:
-            self.image = self.game.terrain_spritesheet.get_sprite(578,544, self.width, self.height) # ice ground
-        elif self.stage_type == 3:
-            self.image = self.game.terrain_spritesheet.get_sprite(417, 93, self.width, self.height) # fire ground
-        elif self.stage_type == 4:
-            self.image = pygame.transform.scale(self.game.terrain_spritesheet.get_sprite(928, 672, 64, 64), (BLOCK_SCALE, BLOCK_SCALE)) #  temple ground
+            self.image = sheet.get_tile(58, 544, TILESIZE, TILESIZE) # dark ground
+        elif stage_type == 2:
+            self.image = sheet.get_tile(578, 544, TILESIZE, TILESIZE) # ice ground
+        elif stage_type == 3:
+            self.image = sheet.get_tile(417, 93, TILESIZE, TILESIZE) # fire ground
+        elif stage_type == 4:
+            self.image = sheet.get_tile(928, 672, 64, 64, (BLOCK_SCALE, BLOCK_SCALE)) #  temple ground
         elif stage_type == 5:
-            self.image = self.game.terrain_spritesheet.get_sprite(64, 352, self.width, self.height) # grass ground
-        self.rect = self.image.get_rect()
-        self.rect.x = self.x
-        self.rect.y = self.y
+            self.image = sheet.get_tile(64, 352, TILESIZE, TILESIZE) # grass ground
+        else:
+            self.image = sheet.get_tile(256, 480, 32, 32)
+        self.rect = self.image.get_rect(topleft=(x * TILESIZE, y * TILESIZE))
+        game.tiles.add(self, x, y)
+
+# This class holds a stage's ground tiles in a grid, and draws the ones on screen
+class TileLayer:
+    """
+    Keeps every ground tile of the stage in a grid indexed by cell, so drawing only
+    visits the cells inside the camera's view instead of every tile of the stage.
+    Tiles are drawn beneath every sprite, except ground placed on a cell that already
+    has ground-layer terrain (e.g. the slippery ice under a stage 2 switch): those are
+    drawn over the ground-layer sprites, as they were placed on top of them.
+    """
+    def __init__(self):
+        """Initializes an empty tile layer."""
+        self.width = 0
+        self.height = 0
+        # One ground tile (or None) per cell, row by row
+        self.cells: List[Optional[Ground]] = []
+        # Cells holding a ground-layer sprite, and the ground tiles placed over one
+        self.covered = set()
+        self.overlays: List[Ground] = []
+
+    # Empties the layer for a new stage
+    def reset(self, width: int, height: int):
+        """
+        Removes every tile and resizes the grid.
+
+        Arguments:
+            width (int): The stage width, in tiles.
+            height (int): The stage height, in tiles.
+        """
+        self.width = width
+        self.height = height
+        self.cells = [None] * (width * height)
+        self.covered.clear()
+        self.overlays.clear()
+
+    # Marks a cell as holding a ground-layer sprite
+    def cover(self, x: int, y: int):
+        """
+        Records that a ground-layer sprite was placed on a cell, so ground placed there
+        afterwards is drawn over it.
+
+        Arguments:
+            x (int): The grid column index.
+            y (int): The grid row index.
+        """
+        self.covered.add((x, y))
+
+    # Places a ground tile on a cell
+    def add(self, tile: Ground, x: int, y: int):
+        """
+        Places a ground tile, replacing any ground already on the cell.
+
+        Arguments:
+            tile (Ground): The tile.
+            x (int): The grid column index.
+            y (int): The grid row index.
+        """
+        if (x, y) in self.covered:
+            self.overlays.append(tile)
+        else:
+            self.cells[y * self.width + x] = tile
+
+    # Draws the ground tiles inside the camera's view
+    def draw(self, screen: pygame.Surface, camera_x: int, camera_y: int):
+        """
+        Draws the tiles of the cells visible on screen.
+
+        Arguments:
+            screen (pygame.Surface): The surface to draw on.
+            camera_x (int): The camera's horizontal offset.
+            camera_y (int): The camera's vertical offset.
+        """
+        # Cells overlapping the window: the camera offset is the negated world position of the screen's top-left corner
+        first_x = max(0, -camera_x // TILESIZE)
+        first_y = max(0, -camera_y // TILESIZE)
+        last_x = min(self.width, (WIN_WIDTH - camera_x) // TILESIZE + 1)
+        last_y = min(self.height, (WIN_HEIGHT - camera_y) // TILESIZE + 1)
+        cells, width = self.cells, self.width
+        blit = screen.blit
+        for y in range(first_y, last_y):
+            row = y * width
+            screen_y = y * TILESIZE + camera_y
+            for x in range(first_x, last_x):
+                tile = cells[row + x]
+                if tile is not None:
+                    blit(tile.image, (x * TILESIZE + camera_x, screen_y))
+
+    # Draws the ground tiles placed over ground-layer sprites
+    def draw_overlays(self, screen: pygame.Surface, camera_x: int, camera_y: int):
+        """
+        Draws the ground tiles that go over the ground-layer sprites. There are only a few, so they are not culled.
+
+        Arguments:
+            screen (pygame.Surface): The surface to draw on.
+            camera_x (int): The camera's horizontal offset.
+            camera_y (int): The camera's vertical offset.
+        """
+        for tile in self.overlays:
+            screen.blit(tile.image, (tile.rect.x + camera_x, tile.rect.y + camera_y))
 
 #This class represent switch sprites (unlocks doors)
 class Switch(pygame.sprite.Sprite):
@@ -2016,8 +2226,11 @@ class Switch(pygame.sprite.Sprite):
 
         self.is_on = False
         self.switch_type = switch_type
-        self.last_hit_time = 0
+        self.reset_timer = None # a timed switch's pending reset on the game's timer service, TIMED_SWITCH_WINDOW after its last hit
+        self.coord = (x, y) # grid coordinate, as indexed in the game's switches_by_coord
         self.permanent_on = False
+        # Track the switch in the spatial hash so attacks and spells can find it cheaply
+        self.game.spatial_hash.insert(self)
 
     # update how the switch looks
     def update_image(self):
@@ -2047,9 +2260,13 @@ class Switch(pygame.sprite.Sprite):
             self.update_image()
             return True
         elif self.switch_type == 'timed' and not self.permanent_on:
-            self.last_hit_time = time.time()
+            # Stay on for exactly TIMED_SWITCH_WINDOW from this hit, replacing the reset of any earlier one
+            self.game.timers.cancel(self.reset_timer)
+            self.reset_timer = self.game.timers.schedule(TIMED_SWITCH_WINDOW, self.reset)
             self.is_on = True
             self.update_image()
+            # See whether this completes the timed switches of the doors it is linked to
+            self.game.timed_switches_check(self.game.doors_by_switch.get(self.coord, ()))
             return True
         return False
     
@@ -2057,23 +2274,30 @@ class Switch(pygame.sprite.Sprite):
     def reset(self):
         """
         Resets a timed switch to its original (unhit) state if it is not 
-        set to permanent_on.
+        set to permanent_on. Run by the timer service when a timed hit runs out.
         """
+        self.reset_timer = None
         if not self.permanent_on:
             self.is_on = False
-            self.last_hit_time = 0
             self.update_image()
         
     # set switch status as permanently on
     def set_permanent_on(self):
         """
         Sets the switch to a permanently ON state, typically used for normal switches 
-        or when timed switches are successfully combined.
+        or when timed switches are successfully combined. Does nothing if it already is.
         """
+        # Each switch counts once towards opening its doors
+        if self.permanent_on:
+            return
+        self.game.timers.cancel(self.reset_timer)
+        self.reset_timer = None
         self.permanent_on = True
         self.is_on = True
         self.game.player.all_open == True
         self.update_image()
+        # Let the doors linked to this switch check whether they can open
+        self.game.event_bus.publish(SWITCH_ACTIVATED, self)
 
 #This class represent door sprites (unlocked by switches)
 class Door(pygame.sprite.Sprite):
@@ -2081,7 +2305,7 @@ class Door(pygame.sprite.Sprite):
     Represents a stage exit door, which acts as a block until its linked switches 
     are all activated.
     """
-    def __init__(self, game: 'Game', x: int, y: int, linked_switches: list[Switch]):
+    def __init__(self, game: 'Game', x: int, y: int, linked_switches: List[GridNode]):
         """
         Initializes a Door sprite.
 
@@ -2089,7 +2313,7 @@ class Door(pygame.sprite.Sprite):
             game (Game): Reference to the main Game instance.
             x (int): Starting grid column.
             y (int): Starting grid row.
-            linked_switches (list[Switch]): List of Switch objects required to unlock the door.
+            linked_switches (List[GridNode]): Grid coordinates of the switches required to unlock the door.
         """
         self._layer = BLOCK_LAYER
         self.game = game
@@ -2115,24 +2339,40 @@ class Door(pygame.sprite.Sprite):
         self.animation_loop = 0
         self.linked_switches = linked_switches
         self.locked = True
+        # Static obstacle: register it in the spatial hash once so collision queries can find it
+        self.game.spatial_hash.insert(self)
+        # Link the door into the stage's switch graph: the game tells it when one of its switches turns on
+        switches = [self.game.switches_by_coord[coord] for coord in linked_switches]
+        for coord in linked_switches:
+            self.game.doors_by_switch.setdefault(coord, []).append(self)
+        # The timed switches, which must all be hit within TIMED_SWITCH_WINDOW (see Game.timed_switches_check)
+        self.timed_switches = [switch for switch in switches if switch.switch_type == 'timed']
+        # Number of linked switches still off; the door opens when it reaches 0
+        self.remaining = sum(1 for switch in switches if not switch.permanent_on)
+        # A door without switches opens right away
+        if self.remaining == 0:
+            self.unlock()
+
+    # Called by the game whenever one of the door's switches is turned on for good
+    def on_switch_activated(self):
+        """
+        Counts down the switches still needed, and unlocks the door when none are left.
+        """
+        if self.locked:
+            self.remaining -= 1
+            if self.remaining <= 0:
+                self.unlock()
 
-    def update(self):
+    # Unlocks the door
+    def unlock(self):
         """
-        Checks the status of linked switches every frame. If all are permanently ON, 
-        the door unlocks and plays its opening animation.
+        Unlocks the door, opens the way to clearing the stage through it and plays its opening animation.
         """
-        if self.locked:
-            # Check if all linked switches are permenantly on; unlock door if they are
-            all_on = True
-            for switch in self.linked_switches:
-                if not switch.permanent_on:
-                    all_on = False
-                    break
-            if all_on:
-                self.locked = False
-                self.game.player.all_open = True
-                self.game.sfxs['opened_all_switches'].play()
-                self.open_animate()
+        self.locked = False
+        # Only this door lets the player through; all_open (kept in the save file) is whether every door of the stage is open
+        self.game.player.all_open = not any(door.locked for door in self.game.doors)
+        self.game.sfxs['opened_all_switches'].play()
+        self.open_animate()
 
     # Method for sprite's door opening animation
     def open_animate(self):
@@ -2167,9 +2407,9 @@ class Portal(pygame.sprite.Sprite):
         self.game = game
         self.is_locked = is_locked
         self.stage_number = stage_number
-        self.groups = self.game.all_sprites, self.game.portals
+        self.groups = self.game.all_sprites, self.game.active_sprites, self.game.portals
         if self.is_locked:
-            self.groups = self.game.all_sprites, self.game.portals_locked
+            self.groups = self.game.all_sprites, self.game.active_sprites, self.game.portals_locked
         pygame.sprite.Sprite.__init__(self, self.groups)
 
         self.image = self.game.portal_spritesheet.get_sprite(0, 0, 32, 32)
@@ -2204,14 +2444,33 @@ class Portal(pygame.sprite.Sprite):
         self.rect.y = self.y
         # controls the upcoming loop position of the sprite.
         self.animation_loop = 0
+        # Unlocked portals check for the player only when it steps onto new cells, rather than every frame
+        if not self.is_locked:
+            self.game.event_bus.subscribe(PLAYER_ENTERED_TILE, self.on_player_entered_tile)
 
     def update(self):
         """
-        Updates the portal's animation and checks for collision with the player 
-        if the portal is unlocked.
+        Updates the portal's animation.
         """
         self.animate() # Call the animate method to change sprites for animation effect
-        if not self.is_locked:
+
+    # Removes the portal from all groups and from the event bus
+    def kill(self):
+        """Removes the portal from all of its groups and stops listening for the player."""
+        self.game.event_bus.unsubscribe(PLAYER_ENTERED_TILE, self.on_player_entered_tile)
+        super().kill()
+
+    # Called by the event bus whenever the player's hitbox moves onto different cells
+    def on_player_entered_tile(self, player: Player, span: Tuple[int, int, int, int]):
+        """
+        Checks for collision with the player if the player's hitbox now covers the portal's cell.
+
+        Arguments:
+            player (Player): The player.
+            span (Tuple[int, int, int, int]): The (first_x, first_y, last_x, last_y) cells the player's hitbox covers.
+        """
+        first_x, first_y, last_x, last_y = span
+        if first_x <= self.x // TILESIZE <= last_x and first_y <= self.y // TILESIZE <= last_y:
             self.collide_player() # Call the collide_player method to detect if player touched unlocked portal
 
     # Method for sprite's animation
@@ -2282,7 +2541,7 @@ class Attack(pygame.sprite.Sprite):
         """
         self.game = game
         self._layer = PLAYER_LAYER
-        self.groups = self.game.all_sprites, self.game.attacks
+        self.groups = self.game.all_sprites, self.game.active_sprites, self.game.attacks
         pygame.sprite.Sprite.__init__(self, self.groups)
 
         self.x = x
@@ -2299,6 +2558,7 @@ class Attack(pygame.sprite.Sprite):
         self.rect = self.image.get_rect()
         self.rect.x = self.x
         self.rect.y = self.y
+        self.game.spatial_hash.insert(self)
         self.game.sfxs['attack'].play()
 
         # Create lists of each animation, get and store its associated sprites within
@@ -2334,24 +2594,27 @@ class Attack(pygame.sprite.Sprite):
         self.collide() # Call the movement method to capture any coordinate changes.
         self.animate() # Call the animate method to change sprites for animation effect.
 
+    # Removes the attack from all groups and from the spatial hash
+    def kill(self):
+        """Removes the attack from all of its groups and stops tracking it in the spatial hash."""
+        self.game.spatial_hash.remove(self)
+        super().kill()
+
     # Method to check if attack collides with enemy
     def collide(self):
         """
         Checks for collision with enemies and switches. Deals damage and kills 
         enemies on hit. Triggers switches.
         """
-        # checks if rectangle of attack sprite is colliding with rectangle of enemy's.
-        enemy_hits = pygame.sprite.spritecollide(self, self.game.enemies, False)
-        switch_hits = pygame.sprite.spritecollide(self, self.game.switches, False)
+        # checks if rectangle of attack sprite is colliding with rectangle of enemy's, only looking at the nearby cells.
+        enemy_hits = self.game.spatial_hash.query(self.rect, self.game.enemies)
+        switch_hits = self.game.spatial_hash.query(self.rect, self.game.switches)
 
         if enemy_hits:
             for enemy in enemy_hits:
                 # When enemy is hit, reduce its health and give it invincibility frames for a time. If the hit reduced enemy health to 0, kill it.
-                if not enemy.invincible:
-                        enemy.health -= ATTACK_DAMAGE
+                if self.game.enemy_store.hit(enemy, ATTACK_DAMAGE):
                         self.game.sfxs['enemy_hit'].play()
-                        enemy.invincible = True
-                        enemy.invincible_timer = pygame.time.get_ticks()
                         # Restore mana when a normal attack hits
                         self.game.player.mana += SLASH_MANA_RESTORE
                         if self.game.player.mana > self.game.player.max_mana:
@@ -2359,8 +2622,7 @@ class Attack(pygame.sprite.Sprite):
                         # Make the enemy health bar visible
                         enemy.health_bar_visible = True
                         if enemy.health <= 0:
-                            self.game.sfxs['enemy_death'].play()
-                            enemy.kill()
+                            self.game.event_bus.publish(ENEMY_KILLED, enemy)
         if switch_hits:
             for switch in switch_hits:
                 self.game.sfxs['switch_hit'].play()
@@ -2405,335 +2667,215 @@ class Attack(pygame.sprite.Sprite):
             if self.animation_loop >= 5:
                 self.kill() 
 
-#This class represent a player's fireball spell
-class Fireball(pygame.sprite.Sprite):
+#This class represents every spell projectile in flight (fireballs, explosions and the fireball shards explosions burst into)
+class ProjectileSystem:
     """
-    Represents a ranged projectile spell. Moves in a fixed direction until collision.
+    Simulates all spell projectiles together. Instead of one sprite per projectile,
+    positions, velocities, lifetimes, kinds and animation frames are kept in
+    preallocated parallel arrays (struct of arrays), and one update() call moves
+    and collides all of them. Animation frames are loaded once and shared.
     """
-    def __init__(self, game: 'Game', x: int, y: int, direction: str, is_from_explosion: bool = False):
+    # Projectile kinds
+    FIREBALL = 0
+    EXPLOSION = 1
+    SHARD = 2 # small fireball spawned when an explosion bursts
+    # Directions a projectile can travel in, as indices into the animation lists
+    DIRECTIONS = ('up', 'down', 'left', 'right')
+    VELOCITIES = ((0, -FIREBALL_SPEED), (0, FIREBALL_SPEED), (-FIREBALL_SPEED, 0), (FIREBALL_SPEED, 0))
+
+    def __init__(self, game: 'Game', capacity: int = MAX_PROJECTILES):
         """
-        Initializes the Fireball projectile.
+        Initializes the projectile arrays and loads the shared animation frames.
 
         Arguments:
             game (Game): Reference to the main Game instance.
-            x (int): Starting pixel x-coordinate.
-            y (int): Starting pixel y-coordinate.
-            direction (str): The direction of travel ('up', 'down', 'left', 'right').
-            is_from_explosion (bool): Flag if the fireball originated from an Explosion (used for logic separation).
+            capacity (int): Maximum number of projectiles in flight at once.
         """
         self.game = game
-        self.direction = direction
-        self._layer = PLAYER_LAYER
-        self.is_from_explosion = is_from_explosion
-        self.groups = self.game.all_sprites, self.game.fireballs
-        pygame.sprite.Sprite.__init__(self, self.groups)
-
-        self.x = x
-        self.y = y
-        self.width = TILESIZE
-        self.height = TILESIZE
-
-        # controls the upcoming loop position of the sprite (e.g. in a 3-sprites loop, 2 is the third sprite). Defaults to 1 (second sprite).
-        self.animation_loop = 0
-        #the visual elements of the sprite itself: height, width, img used, etc.
-        self.image = self.game.fireball_spritesheet.get_sprite(0, 0, self.width, self.height)
-        self.image.set_colorkey(BLACK)
-        #sprite position/hitbox
-        self.rect = self.image.get_rect()
-        self.rect.x = self.x
-        self.rect.y = self.y
-        self.game.sfxs['fireball'].play()
+        self.capacity = capacity
+        # Active projectiles are kept packed in slots [0, count)
+        self.count = 0
+        self.x = array('f', [0.0]) * capacity
+        self.y = array('f', [0.0]) * capacity
+        self.vx = array('f', [0.0]) * capacity
+        self.vy = array('f', [0.0]) * capacity
+        self.life = array('i', [0]) * capacity # frames left before the projectile fizzles out
+        self.frame = array('f', [0.0]) * capacity # animation loop position
+        self.kind = array('b', [0]) * capacity
+        self.direction = array('b', [0]) * capacity # index into DIRECTIONS
+
+        # Shared animation frames: {kind: [up, down, left, right]}, each a list of 4 images
+        fireball_frames = self.load_frames(FIREBALL_SCALE)
+        self.frames = {
+            self.FIREBALL: fireball_frames,
+            self.EXPLOSION: self.load_frames(EXPLOSION_SCALE),
+            self.SHARD: fireball_frames,
+        }
+        # Reused hitbox for collision queries
+        self.hitbox = pygame.Rect(0, 0, TILESIZE, TILESIZE)
+
+    # Cuts and scales the spell animation frames from the fireball spritesheet
+    def load_frames(self, scale: int) -> List[List[pygame.Surface]]:
+        """
+        Loads the 4-frame spell animation for each direction.
 
-        # Create lists of each animation, get and store its associated sprites within
-        self.right_animations = [pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(3, 8, 13, 4), (FIREBALL_SCALE, FIREBALL_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(23, 8, 15, 4), (FIREBALL_SCALE, FIREBALL_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(44, 8, 14, 4), (FIREBALL_SCALE, FIREBALL_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(61, 8, 17, 4), (FIREBALL_SCALE, FIREBALL_SCALE))]
-
-        self.down_animations = [pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(8, 62, 4, 12), (FIREBALL_SCALE, FIREBALL_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(28, 65, 4, 14), (FIREBALL_SCALE, FIREBALL_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(48, 64, 4, 15), (FIREBALL_SCALE, FIREBALL_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(67, 68, 4, 12), (FIREBALL_SCALE, FIREBALL_SCALE))]
-
-        self.left_animations = [pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(3, 28, 17, 4), (FIREBALL_SCALE, FIREBALL_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(23, 28, 14, 4), (FIREBALL_SCALE, FIREBALL_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(41, 28, 15, 4), (FIREBALL_SCALE, FIREBALL_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(66, 28, 12, 4), (FIREBALL_SCALE, FIREBALL_SCALE))]
-
-        self.up_animations = [pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(8, 42, 4, 12), (FIREBALL_SCALE, FIREBALL_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(28, 42, 4, 15), (FIREBALL_SCALE, FIREBALL_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(48, 42, 4, 14), (FIREBALL_SCALE, FIREBALL_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(68, 42, 4, 17), (FIREBALL_SCALE, FIREBALL_SCALE))]
-
-    # Method for updating the game after an action, e.g. movement or attacking
-    def update(self):
-        """
-        Updates the fireball state: checks collision, advances animation, and moves the projectile.
-        """
-        self.collide() # Call the movement method to capture any coordinate changes.
-        self.animate() # Call the animate method to change sprites for animation effect.
-
-        if self.direction == 'up':
-            self.rect.y -= FIREBALL_SPEED
-        if self.direction == 'down':
-            self.rect.y += FIREBALL_SPEED
-        if self.direction == 'left':
-            self.rect.x -= FIREBALL_SPEED
-        if self.direction == 'right':
-            self.rect.x += FIREBALL_SPEED
-
-    # Method to heck if fireball collides with enemy
-    def collide(self):
-        """
-        Checks for collision with enemies, blocks, and switches. Deals damage to 
-        enemies, kills itself on any obstacle hit, and may destroy certain Geo blocks (ice).
-        """
-        # checks if rectangle of fireball sprite is colliding with rectangle of enemy's.
-        hits_enemy = pygame.sprite.spritecollide(self, self.game.enemies, False)
-        switch_hits = pygame.sprite.spritecollide(self, self.game.switches, False)
-        geos_hits = pygame.sprite.spritecollide(self, self.game.ice_blocks, False)
-
-        if switch_hits:
-            for switch in switch_hits:
-                self.game.sfxs['switch_hit'].play()
-                switch.on_hit()
-        if hits_enemy:
-            for enemy in hits_enemy:
-                # When enemy is hit, reduce its health and give it invincibility frames for a time. If the hit reduced enemy health to 0, kill it.
-                if not enemy.invincible:
-                    enemy.health -= FIREBALL_DAMAGE
-                    self.game.sfxs['fireball_impact'].play()
-                    enemy.invincible = True
-                    enemy.invincible_timer = pygame.time.get_ticks()
-                    # Make the enemy health bar visible
-                    enemy.health_bar_visible = True
-                    if enemy.health <= 0:
-                        self.game.sfxs['enemy_death'].play()
-                        enemy.kill()
-                    self.kill()
-        # checks if rectangle of fireball sprite is colliding with a block.
-        hits_block = pygame.sprite.spritecollide(self, self.game.blocks, False)
-        # When the spell hits a block, kill the sprite
-        if hits_block:
-            self.kill()
-        # When the spell hits an ice block, kill the block along with the sprite
-        if geos_hits:
-            if geos_hits[0].geo_type == 2 and self.game.player.current_stage == 2:
-                geos_hits[0].kill()
-                self.kill()
+        Arguments:
+            scale (int): The width and height to scale each frame to.
 
-    # Method for attack sprite's animation
-    def animate(self):
-        """
-        Cycles through the fireball animation frames corresponding to its direction of travel.
+        Returns:
+            List[List[pygame.Surface]]: Frame lists in DIRECTIONS order (up, down, left, right).
         """
-        direction = self.game.player.facing # get the player's current direction to control the sprite choice
+        sheet = self.game.fireball_spritesheet
+        cutouts = {
+            'up': [(8, 42, 4, 12), (28, 42, 4, 15), (48, 42, 4, 14), (68, 42, 4, 17)],
+            'down': [(8, 62, 4, 12), (28, 65, 4, 14), (48, 64, 4, 15), (67, 68, 4, 12)],
+            'left': [(3, 28, 17, 4), (23, 28, 14, 4), (41, 28, 15, 4), (66, 28, 12, 4)],
+            'right': [(3, 8, 13, 4), (23, 8, 15, 4), (44, 8, 14, 4), (61, 8, 17, 4)],
+        }
+        return [[pygame.transform.scale(sheet.get_sprite(*cutout), (scale, scale)) for cutout in cutouts[direction]]
+                for direction in self.DIRECTIONS]
 
-        # Use an animation sprites list depending on the direction player sprite is facing while moving: down, up, left, or right.
-        # self.animation_loop: using 0.1 and math.floor allows us to move to the next sprite in the list every 10 frames (incrementing 0.1 [per frame), looping at the end of the list to create an animation.
-        if direction == "down":
-            # If player is facing up, use the up-facing images for animation
-            self.image = self.down_animations[math.floor(self.animation_loop)]
-            # using 0.5 and floor allows us to change the animation every 2 frames
-            self.animation_loop += FIREBALL_FRAME_INCREMENT
-            if self.animation_loop >= FIREBALL_FRAME_LIMIT:
-                self.animation_loop = 0      
-        if direction == "up":
-            # If player is facing up, use the up-facing images for animation
-            self.image = self.up_animations[math.floor(self.animation_loop)]
-            # using 0.5 and floor allows us to change the animation every 2 frames
-            self.animation_loop += FIREBALL_FRAME_INCREMENT
-            if self.animation_loop >= FIREBALL_FRAME_LIMIT:
-                self.animation_loop = 0 
-        if direction == "left":
-            # If player is facing up, use the up-facing images for animation
-            self.image = self.left_animations[math.floor(self.animation_loop)]
-            # using 0.5 and floor allows us to change the animation every 2 frames
-            self.animation_loop += FIREBALL_FRAME_INCREMENT
-            if self.animation_loop >= FIREBALL_FRAME_LIMIT:
-                self.animation_loop = 0
-        if direction == "right":
-            # If player is facing up, use the up-facing images for animation
-            self.image = self.right_animations[math.floor(self.animation_loop)]
-            # using 0.5 and floor allows us to change the animation every 2 frames
-            self.animation_loop += FIREBALL_FRAME_INCREMENT
-            if self.animation_loop >= FIREBALL_FRAME_LIMIT:
-                self.animation_loop = 0 
+    # Removes every projectile, e.g. when a new stage is loaded
+    def clear(self):
+        """Removes all projectiles in flight."""
+        self.count = 0
 
-#This class represent a player's Explosion spell
-class Explosion(pygame.sprite.Sprite):
-    """
-    Represents the class for the Explosion 
-    spell. It is a projectile that deals damage, 
-    and spawns four Fireball projectiles in 4 
-    cardinal directions upon collision.
-    """
-    def __init__(self, game: 'Game', x: int, y: int):
+    # Launches a new projectile
+    def spawn(self, kind: int, x: float, y: float, direction: str) -> int:
         """
-        Initializes the Explosion spell.
+        Adds a projectile travelling in a fixed direction.
 
         Arguments:
-            game (Game): Reference to the main Game instance.
-            x (int): Starting pixel x-coordinate.
-            y (int): Starting pixel y-coordinate.
-        """
-        self.game = game
-        self._layer = PLAYER_LAYER
-        self.groups = self.game.all_sprites, self.game.explosions
-        pygame.sprite.Sprite.__init__(self, self.groups)
-
-        self.x = x
-        self.y = y
-        self.width = TILESIZE
-        self.height = TILESIZE
-
-        # controls the upcoming loop position of the sprite (e.g. in a 3-sprites loop, 2 is the third sprite). Defaults to 1 (second sprite).
-        self.animation_loop = 0
-        #the visual elements of the sprite itself: height, width, img used, etc.
-        self.image = self.game.fireball_spritesheet.get_sprite(0, 0, self.width, self.height)
-        self.image.set_colorkey(BLACK)
-        #sprite position/hitbox
-        self.rect = self.image.get_rect()
-        self.rect.x = self.x
-        self.rect.y = self.y
-        self.game.sfxs['explosion'].play(maxtime=2000)
+            kind (int): FIREBALL, EXPLOSION or SHARD.
+            x (float): Starting world x-coordinate of the hitbox.
+            y (float): Starting world y-coordinate of the hitbox.
+            direction (str): The direction of travel ('up', 'down', 'left', 'right').
 
-        # Create lists of each animation, get and store its associated sprites within
-        self.right_animations = [pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(3, 8, 13, 4), (EXPLOSION_SCALE, EXPLOSION_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(23, 8, 15, 4), (EXPLOSION_SCALE, EXPLOSION_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(44, 8, 14, 4), (EXPLOSION_SCALE, EXPLOSION_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(61, 8, 17, 4), (EXPLOSION_SCALE, EXPLOSION_SCALE))]
-
-        self.down_animations = [pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(8, 62, 4, 12), (EXPLOSION_SCALE, EXPLOSION_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(28, 65, 4, 14), (EXPLOSION_SCALE, EXPLOSION_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(48, 64, 4, 15), (EXPLOSION_SCALE, EXPLOSION_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(67, 68, 4, 12), (EXPLOSION_SCALE, EXPLOSION_SCALE))]
-
-        self.left_animations = [pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(3, 28, 17, 4), (EXPLOSION_SCALE, EXPLOSION_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(23, 28, 14, 4), (EXPLOSION_SCALE, EXPLOSION_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(41, 28, 15, 4), (EXPLOSION_SCALE, EXPLOSION_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(66, 28, 12, 4), (EXPLOSION_SCALE, EXPLOSION_SCALE))]
-
-        self.up_animations = [pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(8, 42, 4, 12), (EXPLOSION_SCALE, EXPLOSION_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(28, 42, 4, 15), (EXPLOSION_SCALE, EXPLOSION_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(48, 42, 4, 14), (EXPLOSION_SCALE, EXPLOSION_SCALE)),
-                           pygame.transform.scale(self.game.fireball_spritesheet.get_sprite(68, 42, 4, 17), (EXPLOSION_SCALE, EXPLOSION_SCALE))]
+        Returns:
+            int: The slot used, or -1 if the maximum number of projectiles is already in flight.
+        """
+        if self.count >= self.capacity:
+            return -1
+        slot = self.count
+        self.count += 1
+        direction_index = self.DIRECTIONS.index(direction)
+        self.x[slot] = x
+        self.y[slot] = y
+        self.vx[slot], self.vy[slot] = self.VELOCITIES[direction_index]
+        self.life[slot] = PROJECTILE_LIFETIME
+        self.frame[slot] = 0
+        self.kind[slot] = kind
+        self.direction[slot] = direction_index
+        return slot
+
+    # Removes a projectile by moving the last active one into its slot
+    def remove(self, slot: int):
+        """
+        Removes the projectile in a slot, keeping active projectiles packed.
 
-    # Method for updating the game after an action, e.g. movement or attacking
+        Arguments:
+            slot (int): The slot to free.
+        """
+        last = self.count - 1
+        if slot != last:
+            self.x[slot] = self.x[last]
+            self.y[slot] = self.y[last]
+            self.vx[slot] = self.vx[last]
+            self.vy[slot] = self.vy[last]
+            self.life[slot] = self.life[last]
+            self.frame[slot] = self.frame[last]
+            self.kind[slot] = self.kind[last]
+            self.direction[slot] = self.direction[last]
+        self.count = last
+
+    # Moves, animates and collides every projectile in flight
     def update(self):
         """
-        Updates the explosion state: checks collision, advances animation, and determines 
-        if the spell should expire and spawn Fireballs.
-        """
-        self.collide() # Call the movement method to capture any coordinate changes.
-        self.animate() # Call the animate method to change sprites for animation effect.
-
-        self.direction = self.game.player.facing
-
-        if self.direction == 'up':
-            self.rect.y -= FIREBALL_SPEED
-        if self.direction == 'down':
-            self.rect.y += FIREBALL_SPEED
-        if self.direction == 'left':
-            self.rect.x -= FIREBALL_SPEED
-        if self.direction == 'right':
-            self.rect.x += FIREBALL_SPEED
-
-    # Method to heck if fireball collides with enemy
-    def collide(self):
-        """
-        Checks for collision with targets. Deals damage, spawns 4 Fireballs 
-        in cardinal directions, and kills itself.
-        """
-        # checks if rectangle of fireball sprite is colliding with rectangle of enemy's.
-        hits_enemy = pygame.sprite.spritecollide(self, self.game.enemies, False)
-        switch_hits = pygame.sprite.spritecollide(self, self.game.switches, False)
-        geos_hits = pygame.sprite.spritecollide(self, self.game.ice_blocks, False)
+        Updates all projectiles: each one collides at its current position, advances its
+        animation, then moves. Projectiles that hit something or run out of lifetime are removed.
+        Projectiles spawned during the update (explosion shards) start moving next frame.
+        """
+        x, y, vx, vy, life, frame = self.x, self.y, self.vx, self.vy, self.life, self.frame
+        # Walk backwards so removing a slot (which pulls in the last one) never skips an unprocessed projectile
+        for slot in range(self.count - 1, -1, -1):
+            if self.collide(slot):
+                self.remove(slot)
+                continue
+            # Animation loop, changing frame every 2 updates
+            frame[slot] += FIREBALL_FRAME_INCREMENT
+            if frame[slot] >= FIREBALL_FRAME_LIMIT:
+                frame[slot] = 0
+            # Movement and lifetime
+            x[slot] += vx[slot]
+            y[slot] += vy[slot]
+            life[slot] -= 1
+            if life[slot] <= 0:
+                self.remove(slot)
+
+    # Checks one projectile against enemies, switches and obstacles. Returns True if it should be removed.
+    def collide(self, slot: int) -> bool:
+        """
+        Resolves a projectile's hits using one spatial hash query. Deals damage to enemies,
+        triggers switches, melts ice and stops on solid obstacles. Explosions burst into
+        four shards (once) when they hit anything.
 
-        if switch_hits:
-            for switch in switch_hits:
-                self.game.sfxs['switch_hit'].play()
-                switch.on_hit()
-        if hits_enemy:
-            for enemy in hits_enemy:
-                # When enemy is hit, reduce its health and give it invincibility frames for a time. If the hit reduced enemy health to 0, kill it.
-                if not enemy.invincible:
-                    enemy.health -= EXPLOSION_DAMAGE
-                    self.game.sfxs['fireball_impact'].play()
-                    enemy.invincible = True
-                    enemy.invincible_timer = pygame.time.get_ticks()
-                    # Make the enemy health bar visible
-                    enemy.health_bar_visible = True
-                    if enemy.health <= 0:
-                        enemy.kill()
-                    self.game.sfxs['fireball_impact'].play()
-                    # After hit, explode into 4 fireballs
-                    Fireball(self.game, self.rect.x, self.rect.y, 'up')
-                    Fireball(self.game, self.rect.x, self.rect.y, 'down')
-                    Fireball(self.game, self.rect.x, self.rect.y, 'left')
-                    Fireball(self.game, self.rect.x, self.rect.y, 'right')
-                    self.kill()
-        # checks if rectangle of fireball sprite is colliding with a block.
-        hits_block = pygame.sprite.spritecollide(self, self.game.blocks, False)
-        hits_wall = pygame.sprite.spritecollide(self, self.game.blocks, False)
-        # When the spell hits a block, kill the sprite
-        if hits_block:
-            # After hit, explode into 4 fireballs
-            Fireball(self.game, self.rect.x, self.rect.y, 'up')
-            Fireball(self.game, self.rect.x, self.rect.y, 'down')
-            Fireball(self.game, self.rect.x, self.rect.y, 'left')
-            Fireball(self.game, self.rect.x, self.rect.y, 'right')
-            self.kill()
-        if hits_wall:
-            # After hit, explode into 4 fireballs
-            Fireball(self.game, self.rect.x, self.rect.y, 'up')
-            Fireball(self.game, self.rect.x, self.rect.y, 'down')
-            Fireball(self.game, self.rect.x, self.rect.y, 'left')
-            Fireball(self.game, self.rect.x, self.rect.y, 'right')
-            self.kill()
-        if geos_hits:
-            geos_hits[0].kill()
-            # After hit, explode into 4 fireballs
-            Fireball(self.game, self.rect.x, self.rect.y, 'up')
-            Fireball(self.game, self.rect.x, self.rect.y, 'down')
-            Fireball(self.game, self.rect.x, self.rect.y, 'left')
-            Fireball(self.game, self.rect.x, self.rect.y, 'right')
-            self.kill()
+        Arguments:
+            slot (int): The projectile's slot.
 
-    # Method for attack sprite's animation
-    def animate(self):
-        """
-        Cycles through the explosion animation frames.
-        """
-        direction = self.game.player.facing # get the player's current direction to control the sprite choice
+        Returns:
+            bool: True if the projectile hit something and should be removed.
+        """
+        game = self.game
+        kind = self.kind[slot]
+        hitbox = self.hitbox
+        hitbox.x = int(self.x[slot])
+        hitbox.y = int(self.y[slot])
+        hits = query_categories(game.spatial_hash, hitbox, game.collision_categories)
+        hit_something = False
+
+        # Trigger any switches hit
+        for switch in hits['switch']:
+            game.sfxs['switch_hit'].play()
+            switch.on_hit()
+        # When enemy is hit, reduce its health and give it invincibility frames for a time. If the hit reduced enemy health to 0, kill it.
+        damage = EXPLOSION_DAMAGE if kind == self.EXPLOSION else FIREBALL_DAMAGE
+        for enemy in hits['enemy']:
+            if game.enemy_store.hit(enemy, damage):
+                game.sfxs['fireball_impact'].play()
+                # Make the enemy health bar visible
+                enemy.health_bar_visible = True
+                if enemy.health <= 0:
+                    game.event_bus.publish(ENEMY_KILLED, enemy)
+                hit_something = True
+        # When the spell hits a block, it stops
+        if hits['solid']:
+            hit_something = True
+        # Fire melts ice: explosions melt any ice block, fireballs only the ice cubes of stage 2
+        if hits['ice']:
+            ice = hits['ice'][0]
+            if kind == self.EXPLOSION or (ice.geo_type == 2 and game.player.current_stage == 2):
+                ice.kill()
+                hit_something = True
+
+        # After a hit, an explosion bursts into 4 fireball shards
+        if hit_something and kind == self.EXPLOSION:
+            for direction in self.DIRECTIONS:
+                self.spawn(self.SHARD, self.x[slot], self.y[slot], direction)
+            game.sfxs['fireball'].play()
+        return hit_something
+
+    # Draws every projectile in flight
+    def draw(self, screen: pygame.Surface, camera_x: int, camera_y: int):
+        """
+        Draws all projectiles at their world position offset by the camera.
 
-        # Use an animation sprites list depending on the direction player sprite is facing while moving: down, up, left, or right.
-        # self.animation_loop: using 0.1 and math.floor allows us to move to the next sprite in the list every 10 frames (incrementing 0.1 [per frame), looping at the end of the list to create an animation.
-        if direction == "down":
-            # If player is facing up, use the up-facing images for animation
-            self.image = self.down_animations[math.floor(self.animation_loop)]
-            # using 0.5 and floor allows us to change the animation every 2 frames
-            self.animation_loop += FIREBALL_FRAME_INCREMENT
-            if self.animation_loop >= FIREBALL_FRAME_LIMIT:
-                self.animation_loop = 0      
-        if direction == "up":
-            # If player is facing up, use the up-facing images for animation
-            self.image = self.up_animations[math.floor(self.animation_loop)]
-            # using 0.5 and floor allows us to change the animation every 2 frames
-            self.animation_loop += FIREBALL_FRAME_INCREMENT
-            if self.animation_loop >= FIREBALL_FRAME_LIMIT:
-                self.animation_loop = 0 
-        if direction == "left":
-            # If player is facing up, use the up-facing images for animation
-            self.image = self.left_animations[math.floor(self.animation_loop)]
-            # using 0.5 and floor allows us to change the animation every 2 frames
-            self.animation_loop += FIREBALL_FRAME_INCREMENT
-            if self.animation_loop >= FIREBALL_FRAME_LIMIT:
-                self.animation_loop = 0
-        if direction == "right":
-            # If player is facing up, use the up-facing images for animation
-            self.image = self.right_animations[math.floor(self.animation_loop)]
-            # using 0.5 and floor allows us to change the animation every 2 frames
-            self.animation_loop += FIREBALL_FRAME_INCREMENT
-            if self.animation_loop >= FIREBALL_FRAME_LIMIT:
-                self.animation_loop = 0 
+        Arguments:
+            screen (pygame.Surface): The surface to draw on.
+            camera_x (int): The camera's horizontal offset.
+            camera_y (int): The camera's vertical offset.
+        """
+        frames, kind, direction, frame, x, y = self.frames, self.kind, self.direction, self.frame, self.x, self.y
+        blit = screen.blit
+        for slot in range(self.count):
+            image = frames[kind[slot]][direction[slot]][int(frame[slot])]
+            blit(image, (int(x[slot]) + camera_x, int(y[slot]) + camera_y))
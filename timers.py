@@ -0,0 +1,83 @@
+### This file contains the timer service that runs gameplay callbacks when their deadlines come up, instead of components comparing timestamps every frame.
+
+## Imports
+import heapq # used to keep the pending timers ordered by deadline, as a min-heap.
+import itertools # used to number timers, so timers with the same deadline run in the order they were scheduled.
+from typing import Callable, List, Optional # used for more efficient type hinting
+
+# This class is for running callbacks at set times on the simulation clock
+class TimerService:
+    """
+    A min-heap of deadlines on the simulation clock, in ticks (ms). Components schedule a
+    callback for the moment something should end ("end iframes at t", "reset the timed
+    switch at t + TIMED_SWITCH_WINDOW"), and the game advances the clock once per frame,
+    which runs the callbacks that came due in deadline order. Only the timers that expire
+    in a frame cost anything in it. Cancelled timers stay in the heap and are skipped when
+    they come up.
+    """
+    def __init__(self, now: int = 0):
+        """
+        Initializes a service with no timers.
+
+        Arguments:
+            now (int): The starting time on the simulation clock, in ticks (ms).
+        """
+        self.now = now # the simulation clock, as of the last advance
+        # Pending timers, as [deadline, sequence number, callback, args]; the callback is None once cancelled
+        self.heap: List[list] = []
+        self.sequence = itertools.count()
+
+    # Drops every pending timer, e.g. when a new stage is loaded
+    def clear(self, now: int):
+        """
+        Cancels all pending timers and sets the clock.
+
+        Arguments:
+            now (int): The current time on the simulation clock, in ticks (ms).
+        """
+        self.heap.clear()
+        self.now = now
+
+    # Runs a callback once some time has passed
+    def schedule(self, delay: int, callback: Callable[..., None], *args) -> list:
+        """
+        Schedules a callback to run once the clock reaches now + delay.
+
+        Arguments:
+            delay (int): How long from now to wait, in ticks (ms).
+            callback (Callable[..., None]): Called with args when the timer expires.
+            *args: The arguments passed on to the callback.
+
+        Returns:
+            list: The timer, which can be passed to cancel().
+        """
+        timer = [self.now + delay, next(self.sequence), callback, args]
+        heapq.heappush(self.heap, timer)
+        return timer
+
+    # Stops a timer from running
+    def cancel(self, timer: Optional[list]):
+        """
+        Cancels a pending timer. Does nothing if it is None or has already run.
+
+        Arguments:
+            timer (Optional[list]): A timer returned by schedule().
+        """
+        if timer is not None:
+            timer[2] = None # skipped when it reaches the top of the heap
+            timer[3] = ()
+
+    # Moves the clock forward, running the timers that came due
+    def advance(self, now: int):
+        """
+        Sets the clock and runs, in deadline order, every callback whose deadline has been reached.
+
+        Arguments:
+            now (int): The current time on the simulation clock, in ticks (ms).
+        """
+        self.now = now
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            _, _, callback, args = heapq.heappop(heap)
+            if callback is not None:
+                callback(*args)